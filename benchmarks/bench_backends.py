@@ -0,0 +1,81 @@
+"""
+Image Converter Pro — Benchmark: thread vs process batch backend.
+
+Generates a synthetic corpus and runs the same effects-heavy batch with
+both BatchProcessor backends for each worker count.
+
+Usage:
+    python -m benchmarks.bench_backends --images 64 --workers 4 8 16
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from PIL import Image
+
+from core.batch_processor import BatchProcessor
+
+
+SETTINGS = {
+    "format": "JPEG",
+    "width": 1600,
+    "height": 1200,
+    "quality": 85,
+    "contrast": 1.2,
+    "sepia": True,
+    "vignette": True,
+}
+
+
+def make_corpus(directory, count, size):
+    """Write count noisy JPEG images of the given size."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        data = rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+        path = os.path.join(directory, f"src_{i:04d}.jpg")
+        Image.fromarray(data, "RGB").save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def run(paths, backend, workers):
+    """Run one batch and return elapsed seconds."""
+    with tempfile.TemporaryDirectory() as out_dir:
+        processor = BatchProcessor(max_workers=workers, backend=backend)
+        start = time.perf_counter()
+        results = processor.process_batch(paths, SETTINGS, out_dir)
+        elapsed = time.perf_counter() - start
+    if results["failed"]:
+        raise RuntimeError(results["errors"][:3])
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--size", type=int, nargs=2, default=(3000, 2000))
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as src_dir:
+        paths = make_corpus(src_dir, args.images, tuple(args.size))
+
+        print(f"{'workers':>8} {'thread (s)':>12} {'process (s)':>12} {'speedup':>8}")
+        for workers in args.workers:
+            t_thread = run(paths, "thread", workers)
+            t_process = run(paths, "process", workers)
+            print(f"{workers:>8} {t_thread:>12.2f} {t_process:>12.2f} "
+                  f"{t_thread / t_process:>7.2f}x")
+
+    print(f"(cpu count: {os.cpu_count()})")
+
+
+if __name__ == "__main__":
+    main()
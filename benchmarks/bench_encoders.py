@@ -0,0 +1,126 @@
+"""
+Image Converter Pro — Benchmark: encoder effort profiles.
+
+Encodes a reference corpus with every effort profile and prints encode
+time versus output size per format. The built-in corpus has three
+synthetic images (photo-like, flat graphic, screenshot-like); pass
+--corpus to use a folder of real images instead.
+
+Usage:
+    python -m benchmarks.bench_encoders --size 2000 1500 --repeat 3
+    python -m benchmarks.bench_encoders --corpus ~/Pictures/reference
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from config.constants import ENCODER_EFFORTS
+from core.converter import ImageConverter
+from utils.ingest import ImageIngestor
+
+
+def synthetic_corpus(width, height):
+    """Build the built-in reference corpus.
+
+    Returns:
+        list: [(name, PIL Image)]
+    """
+    rng = np.random.default_rng(0)
+
+    # Photo-like: smooth gradients plus sensor noise
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([
+        128 + 100 * np.sin(x / width * 3.1),
+        128 + 100 * np.cos(y / height * 2.3),
+        128 + 60 * np.sin((x + y) / (width + height) * 5.0),
+    ], axis=-1)
+    photo = np.clip(base + rng.normal(0, 8, base.shape), 0, 255).astype(np.uint8)
+
+    # Flat graphic: few colors, large uniform areas
+    graphic = Image.new("RGB", (width, height), (240, 240, 235))
+    draw = ImageDraw.Draw(graphic)
+    for _ in range(40):
+        x0, y0 = rng.integers(0, width), rng.integers(0, height)
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        draw.rectangle([x0, y0, x0 + width // 6, y0 + height // 8], fill=color)
+
+    # Screenshot-like: text rows on a light background
+    screenshot = Image.new("RGB", (width, height), (250, 250, 250))
+    draw = ImageDraw.Draw(screenshot)
+    for row in range(0, height, 18):
+        draw.text((10, row), "Image Converter Pro 0123456789 " * (width // 200), fill=(30, 30, 30))
+
+    return [
+        ("photo", Image.fromarray(photo, "RGB")),
+        ("graphic", graphic),
+        ("screenshot", screenshot),
+    ]
+
+
+def load_corpus(directory, max_side):
+    """Load a folder of images, downscaled to at most max_side."""
+    corpus = []
+    for path in ImageIngestor(directory):
+        img = ImageConverter.load(path)
+        img.thumbnail((max_side, max_side))
+        corpus.append((os.path.basename(path), img.convert("RGB")))
+    return corpus
+
+
+def encode(img, fmt, effort, quality):
+    """Encode once and return (seconds, bytes)."""
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    ImageConverter.save(img, buffer, fmt, quality, effort=effort)
+    return time.perf_counter() - start, buffer.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, nargs=2, default=(2000, 1500))
+    parser.add_argument("--corpus", help="Folder of reference images")
+    parser.add_argument("--formats", nargs="+", default=["JPEG", "PNG", "WEBP"])
+    parser.add_argument("--quality", type=int, default=85)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus, max(args.size))
+    else:
+        corpus = synthetic_corpus(*args.size)
+    if not corpus:
+        print("No images in corpus.")
+        return
+
+    pixels = sum(img.width * img.height for _, img in corpus)
+    print(f"Corpus: {len(corpus)} image(s), {pixels / 1e6:.1f} MP total, "
+          f"quality {args.quality}, best of {args.repeat}")
+    print(f"{'Format':<8}{'Effort':<10}{'Encode ms':>11}{'MP/s':>8}{'Size KB':>10}{'vs balanced':>13}")
+
+    for fmt in args.formats:
+        images = [ImageConverter.convert_format(img, fmt) for _, img in corpus]
+        rows = {}
+        for effort in ENCODER_EFFORTS:
+            total_time, total_size = 0.0, 0
+            for img in images:
+                runs = [encode(img, fmt, effort, args.quality) for _ in range(args.repeat)]
+                total_time += min(seconds for seconds, _ in runs)
+                total_size += runs[0][1]
+            rows[effort] = (total_time, total_size)
+
+        base_size = rows["balanced"][1]
+        for effort, (seconds, size) in rows.items():
+            print(f"{fmt:<8}{effort:<10}{seconds * 1000:>11.1f}{pixels / 1e6 / seconds:>8.1f}"
+                  f"{size / 1024:>10.1f}{(size / base_size - 1) * 100:>+12.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Image Converter Pro — Benchmark: region-limited watermark compositing.
+
+Compares a full-frame watermark (RGBA conversion, full-size text layer,
+alpha_composite over the whole image) with WatermarkEngine, which pastes
+a cached stamp sprite into its bounding box only.
+
+Usage:
+    python -m benchmarks.bench_watermark --size 8000 6000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from core.watermark import WatermarkEngine
+
+
+def best_of(func, repeat):
+    """Return the best wall time of repeat runs."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, nargs=2, default=(8000, 6000))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--text", default="© Image Converter Pro")
+    parser.add_argument("--opacity", type=float, default=0.5)
+    args = parser.parse_args()
+
+    w, h = args.size
+    rng = np.random.default_rng(0)
+    img = Image.fromarray(rng.integers(0, 256, (h, w, 3), dtype=np.uint8), "RGB")
+    engine = WatermarkEngine()
+    text, opacity = args.text, args.opacity
+
+    def full_frame():
+        base = img.convert("RGBA")
+        layer = Image.new("RGBA", base.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+        font = WatermarkEngine._load_font(24)
+        bbox = draw.textbbox((0, 0), text, font=font)
+        x, y = engine._calculate_position(base.size, (bbox[2] - bbox[0], bbox[3] - bbox[1]),
+                                          "bottom-right")
+        draw.text((x + 2, y + 2), text, fill=(0, 0, 0, int(128 * opacity)), font=font)
+        draw.text((x, y), text, fill=(255, 255, 255, int(255 * opacity)), font=font)
+        return Image.alpha_composite(base, layer).convert("RGB")
+
+    def region():
+        return engine.add_text_watermark(img, text, opacity=opacity)
+
+    def region_in_place():
+        return engine.add_text_watermark(target, text, opacity=opacity, in_place=True)
+
+    target = img.copy()
+    diff = np.abs(np.asarray(full_frame(), dtype=int) - np.asarray(region(), dtype=int))
+    t_full = best_of(full_frame, args.repeat)
+    t_region = best_of(region, args.repeat)
+    t_in_place = best_of(region_in_place, args.repeat)
+
+    print(f"Image: {w}x{h} ({w * h / 1e6:.1f} MP)")
+    print(f"Full-frame composite:  {t_full * 1000:8.1f} ms")
+    print(f"Region (copy):         {t_region * 1000:8.1f} ms")
+    print(f"Region (in place):     {t_in_place * 1000:8.3f} ms")
+    print(f"Speedup (in place): {t_full / t_in_place:.0f}x | max diff: {diff.max()}")
+    print(f"Stamp cache: {WatermarkEngine.cache_info()['stamps']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Image Converter Pro — Headless command-line interface.
+Runs batch conversions without Tk (no display required).
+"""
+
+from cli.main import main
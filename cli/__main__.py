@@ -0,0 +1,9 @@
+"""
+Image Converter Pro — `python -m cli` entry point.
+"""
+
+import sys
+
+from cli.main import main
+
+sys.exit(main())
@@ -0,0 +1,494 @@
+"""
+Image Converter Pro — Command-line batch conversion.
+Streams one JSON line per processed file to stdout.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import signal
+import sys
+import threading
+
+from config.constants import (
+    APP_NAME, APP_VERSION, MAX_WORKERS, WATCH_POLL_INTERVAL, WATCH_SETTLE_TIME,
+    SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_QUEUE, ENCODER_EFFORTS,
+)
+from core.admission import read_header
+from core.batch_processor import BatchProcessor
+from core.journal import BatchJournal
+from core.plan import compile_plan, REFERENCE_SIZE
+from core.preset_manager import PresetManager
+from core.variants import parse_variants
+from core.watcher import FolderWatcher
+from service.server import ConversionService
+from utils.ingest import ImageIngestor
+from utils.validators import (
+    validate_format, validate_quality, validate_effort, validate_max_bytes,
+    validate_dimensions, ValidationError
+)
+
+
+# Exit codes
+EXIT_OK = 0            # Every input converted (or skipped as up to date)
+EXIT_FAILURES = 1      # Some inputs failed
+EXIT_USAGE = 2         # Bad arguments, settings or preset
+EXIT_ALL_FAILED = 3    # Every input failed
+EXIT_NO_INPUT = 4      # Nothing matched the inputs
+EXIT_INTERRUPTED = 130
+
+
+def build_parser():
+    """Build the argument parser.
+
+    Returns:
+        argparse.ArgumentParser: Parser with the convert, watch and serve subcommands
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description=f"{APP_NAME} — headless batch conversion",
+    )
+    parser.add_argument("--version", action="version", version=f"{APP_NAME} {APP_VERSION}")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser(
+        "convert", help="Convert images in batch",
+        description="Convert images and print one JSON line per file.",
+    )
+    convert.add_argument("inputs", nargs="+",
+                         help="Image files, glob patterns or directories")
+    convert.add_argument("-o", "--output", required=True, help="Output directory")
+    add_input_arguments(convert)
+    add_settings_arguments(convert)
+    add_processing_arguments(convert)
+    convert.add_argument("--incremental", action="store_true",
+                         help="Skip inputs whose output is up to date")
+    convert.add_argument("--resume", action="store_true",
+                         help="Resume an interrupted batch from the journal in the "
+                              "output directory (every convert run keeps one)")
+    convert.add_argument("--profile", action="store_true",
+                         help="Include per-stage timings in the summary")
+    convert.add_argument("--explain", action="store_true",
+                         help="Print the compiled processing plan and exit")
+    convert.add_argument("-q", "--quiet", action="store_true",
+                         help="Do not print the summary to stderr")
+    convert.set_defaults(handler=run_convert)
+
+    watch = commands.add_parser(
+        "watch", help="Convert images dropped into a folder, continuously",
+        description="Watch a folder and print one JSON line per converted file.",
+    )
+    watch.add_argument("folder", help="Folder to watch")
+    watch.add_argument("-o", "--output", required=True, help="Output directory")
+    watch.add_argument("-r", "--recursive", action="store_true",
+                       help="Also watch subdirectories")
+    watch.add_argument("--interval", type=float, default=WATCH_POLL_INTERVAL,
+                       help=f"Seconds between folder snapshots (default: {WATCH_POLL_INTERVAL})")
+    watch.add_argument("--settle", type=float, default=WATCH_SETTLE_TIME,
+                       help=f"Seconds a file must stop changing before conversion "
+                            f"(default: {WATCH_SETTLE_TIME})")
+    watch.add_argument("--stats-interval", type=float, default=0,
+                       help="Print backlog/latency counters every N seconds (0 = off)")
+    add_settings_arguments(watch)
+    add_processing_arguments(watch)
+    watch.add_argument("-q", "--quiet", action="store_true",
+                       help="Do not print the summary to stderr")
+    watch.set_defaults(handler=run_watch)
+
+    serve = commands.add_parser(
+        "serve", help="Run the local HTTP conversion service",
+        description="Serve POST /convert, GET /metrics and GET /health.",
+    )
+    serve.add_argument("--host", default=SERVICE_HOST,
+                       help=f"Interface to listen on (default: {SERVICE_HOST})")
+    serve.add_argument("--port", type=int, default=SERVICE_PORT,
+                       help=f"TCP port (default: {SERVICE_PORT})")
+    serve.add_argument("--max-queue", type=int, default=SERVICE_MAX_QUEUE,
+                       help=f"Requests that may wait for a worker before 429 "
+                            f"(default: {SERVICE_MAX_QUEUE})")
+    add_settings_arguments(serve)
+    add_processing_arguments(serve)
+    serve.set_defaults(handler=run_serve)
+
+    return parser
+
+
+def add_input_arguments(parser):
+    """Add directory ingestion options to a parser."""
+    group = parser.add_argument_group("inputs")
+    group.add_argument("-r", "--recursive", action="store_true",
+                       help="Descend into subdirectories of input directories")
+    group.add_argument("--include", action="append", default=[], metavar="GLOB",
+                       help="Only take files matching GLOB (repeatable)")
+    group.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                       help="Skip files and directories matching GLOB (repeatable)")
+    group.add_argument("--follow-symlinks", action="store_true",
+                       help="Follow symlinked directories")
+
+
+def add_settings_arguments(parser):
+    """Add preset and inline settings options to a parser."""
+    group = parser.add_argument_group("settings")
+    group.add_argument("-p", "--preset", help="Preset name to start from")
+    group.add_argument("--presets-dir", help="Preset directory (default: ./presets)")
+    group.add_argument("-f", "--format", help="Output format (JPEG, PNG, WEBP, ...)")
+    group.add_argument("--width", type=int, help="Target width")
+    group.add_argument("--height", type=int, help="Target height")
+    group.add_argument("--quality", type=int, help="Output quality (1-100)")
+    group.add_argument("--effort", choices=ENCODER_EFFORTS,
+                       help="Encoder effort: speed vs. output size")
+    group.add_argument("--max-size", dest="max_bytes", metavar="SIZE",
+                       help="Output size budget, e.g. 150K; quality is lowered to fit")
+    group.add_argument("--fit-downscale", action="store_true", default=None,
+                       help="Also shrink images that do not fit --max-size at low quality")
+    group.add_argument("--set", dest="overrides", action="append", default=[],
+                       metavar="KEY=VALUE",
+                       help="Override a setting (value parsed as JSON, e.g. sepia=true)")
+
+
+def add_processing_arguments(parser):
+    """Add worker pool options to a parser."""
+    group = parser.add_argument_group("processing")
+    group.add_argument("-j", "--workers", type=int, default=MAX_WORKERS,
+                       help=f"Parallel workers (default: {MAX_WORKERS})")
+    group.add_argument("--backend", choices=BatchProcessor.BACKENDS, default="thread",
+                       help="Worker pool type (default: thread)")
+
+
+def parse_override(text):
+    """Parse a KEY=VALUE override.
+
+    The value is decoded as JSON when possible (numbers, true/false),
+    otherwise kept as a string.
+
+    Returns:
+        tuple: (key, value)
+
+    Raises:
+        ValidationError: If the override is malformed or the key is unknown
+    """
+    key, sep, raw = text.partition("=")
+    key = key.strip()
+    if not sep or not key:
+        raise ValidationError(f"Invalid setting override (expected KEY=VALUE): {text}")
+    if key not in PresetManager.DEFAULTS:
+        raise ValidationError(
+            f"Unknown setting: {key}. Supported: {', '.join(PresetManager.DEFAULTS)}"
+        )
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    return key, value
+
+
+def resolve_settings(args):
+    """Build the batch settings from a preset and inline options.
+
+    Precedence: defaults < preset < --set < dedicated options.
+
+    Returns:
+        dict: Validated settings
+
+    Raises:
+        ValidationError: If a setting is invalid
+        FileNotFoundError: If the preset does not exist
+    """
+    if args.preset:
+        settings = PresetManager(args.presets_dir).load(args.preset)
+    else:
+        settings = PresetManager.DEFAULTS.copy()
+
+    for text in args.overrides:
+        key, value = parse_override(text)
+        settings[key] = value
+
+    for key in ("format", "width", "height", "quality", "effort", "max_bytes", "fit_downscale"):
+        value = getattr(args, key)
+        if value is not None:
+            settings[key] = value
+
+    settings["format"] = validate_format(str(settings["format"]))
+    settings["quality"] = validate_quality(settings["quality"])
+    settings["effort"] = validate_effort(settings["effort"])
+    settings["max_bytes"] = validate_max_bytes(settings.get("max_bytes"))
+    parse_variants(settings)
+    if settings.get("width") and settings.get("height"):
+        validate_dimensions(settings["width"], settings["height"])
+    return settings
+
+
+def expand_inputs(patterns, unmatched=None, **ingest_options):
+    """Lazily expand files, glob patterns and directories into image paths.
+
+    Paths are streamed by ImageIngestor, so images are identified by
+    magic bytes and large directory trees start yielding immediately.
+    Glob patterns support ** for recursion.
+
+    Args:
+        patterns: Input arguments
+        unmatched: Optional list collecting patterns that yielded no image
+        **ingest_options: ImageIngestor options (recursive, include,
+            exclude, follow_symlinks)
+
+    Yields:
+        str: Image file path
+    """
+    ingest_options.setdefault("recursive", False)
+    for pattern in patterns:
+        if os.path.exists(pattern):
+            roots = [pattern]
+        else:
+            roots = sorted(glob.glob(pattern, recursive=True))
+
+        found = False
+        for path in ImageIngestor(roots, **ingest_options):
+            found = True
+            yield path
+
+        if not found and unmatched is not None:
+            unmatched.append(pattern)
+
+
+def result_record(item):
+    """Convert a BatchItemResult to a JSON-serializable record."""
+    record = {"type": "result"}
+    record.update(item.as_dict())
+    return record
+
+
+def exit_code(stats):
+    """Map batch statistics to a process exit code."""
+    if stats.processed == 0:
+        return EXIT_NO_INPUT
+    if stats.failed == 0:
+        return EXIT_OK
+    if stats.success == 0 and stats.skipped == 0:
+        return EXIT_ALL_FAILED
+    return EXIT_FAILURES
+
+
+_emit_lock = threading.Lock()
+
+
+def emit(record, stream=None):
+    """Write one JSON line and flush, so consumers see results live."""
+    stream = stream or sys.stdout
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _emit_lock:
+        stream.write(line)
+        stream.flush()
+
+
+def prepare_settings(args):
+    """Resolve settings and check worker options, reporting errors to stderr.
+
+    Returns:
+        dict or None: Settings, None on a usage error
+    """
+    try:
+        settings = resolve_settings(args)
+    except (ValidationError, FileNotFoundError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return None
+
+    if args.workers < 1:
+        print(f"error: --workers must be at least 1: {args.workers}", file=sys.stderr)
+        return None
+    return settings
+
+
+def explain_plan(settings, inputs, stream=None):
+    """Print the compiled processing plan for settings.
+
+    Costs are estimated for the first readable input (a 12 MP RGB frame
+    if there is none).
+
+    Returns:
+        int: Exit code
+    """
+    try:
+        plan = compile_plan(settings)
+    except ValidationError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    size, mode = REFERENCE_SIZE, "RGB"
+    for path in inputs:
+        header = read_header(path)
+        if header:
+            size, mode = header[0], header[1]
+            break
+    print(plan.describe(size, mode), file=stream or sys.stdout)
+    return EXIT_OK
+
+
+def run_convert(args):
+    """Run the convert subcommand.
+
+    Returns:
+        int: Exit code
+    """
+    settings = prepare_settings(args)
+    if settings is None:
+        return EXIT_USAGE
+
+    if args.explain:
+        inputs = expand_inputs(
+            args.inputs, recursive=args.recursive, include=args.include,
+            exclude=args.exclude, follow_symlinks=args.follow_symlinks,
+        )
+        return explain_plan(settings, inputs)
+
+    if args.resume and not os.path.exists(os.path.join(args.output, BatchJournal.FILENAME)):
+        print(f"error: no batch journal to resume in {args.output}", file=sys.stderr)
+        return EXIT_USAGE
+
+    os.makedirs(args.output, exist_ok=True)
+
+    # Always journal, so any interrupted run can be continued with --resume
+    processor = BatchProcessor(
+        max_workers=args.workers, backend=args.backend, profile=args.profile,
+        incremental=args.incremental, journal=True,
+    )
+    unmatched = []
+    inputs = expand_inputs(
+        args.inputs, unmatched,
+        recursive=args.recursive, include=args.include, exclude=args.exclude,
+        follow_symlinks=args.follow_symlinks,
+    )
+
+    try:
+        for item in processor.iter_batch(inputs, settings, args.output, resume=args.resume):
+            emit(result_record(item))
+    except KeyboardInterrupt:
+        processor.cancel()
+        print("Interrupted.", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except ValueError as e:  # Resume with different settings
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    stats = processor.stats
+    summary = stats.summary()
+    summary["type"] = "summary"
+    emit(summary)
+
+    if not args.quiet:
+        for pattern in unmatched:
+            print(f"warning: no images matched: {pattern}", file=sys.stderr)
+        print(stats.summary_text(), file=sys.stderr)
+
+    return exit_code(stats)
+
+
+def run_watch(args):
+    """Run the watch subcommand until interrupted (Ctrl+C or SIGTERM).
+
+    Returns:
+        int: Exit code
+    """
+    settings = prepare_settings(args)
+    if settings is None:
+        return EXIT_USAGE
+    if not os.path.isdir(args.folder):
+        print(f"error: not a directory: {args.folder}", file=sys.stderr)
+        return EXIT_USAGE
+
+    processor = BatchProcessor(max_workers=args.workers, backend=args.backend)
+    try:
+        watcher = FolderWatcher(
+            processor, settings, args.folder, args.output,
+            interval=args.interval, settle_time=args.settle, recursive=args.recursive,
+        )
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    def report_counters():
+        while not watcher.stop_event.wait(args.stats_interval):
+            counters = watcher.counters()
+            counters["type"] = "counters"
+            emit(counters)
+
+    if args.stats_interval > 0:
+        threading.Thread(target=report_counters, daemon=True).start()
+
+    def on_result(item):
+        record = result_record(item)
+        if "latency" in item.metrics:
+            record["latency_ms"] = round(item.metrics["latency"] * 1000, 1)
+        emit(record)
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+
+    try:
+        watcher.run(on_result)
+    except KeyboardInterrupt:
+        watcher.stop()
+
+    summary = processor.stats.summary()
+    summary.update(watcher.counters())
+    summary["type"] = "summary"
+    emit(summary)
+    if not args.quiet:
+        print(processor.stats.summary_text(), file=sys.stderr)
+
+    return EXIT_FAILURES if processor.stats.failed else EXIT_OK
+
+
+def run_serve(args):
+    """Run the serve subcommand until interrupted (Ctrl+C or SIGTERM).
+
+    Returns:
+        int: Exit code
+    """
+    settings = prepare_settings(args)
+    if settings is None:
+        return EXIT_USAGE
+
+    service = ConversionService(
+        settings, max_workers=args.workers, backend=args.backend,
+        host=args.host, port=args.port, max_queue=max(0, args.max_queue),
+    )
+
+    async def serve():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+
+        await service.start()
+        print(f"Listening on http://{service.host}:{service.port}", file=sys.stderr)
+        try:
+            await stop.wait()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:  # Port in use, bad interface
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    return EXIT_OK
+
+
+def main(argv=None):
+    """Run the command-line interface.
+
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+
+    Returns:
+        int: Exit code
+    """
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
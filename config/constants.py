@@ -20,6 +20,9 @@ DEFAULT_QUALITY = 85
 MAX_QUALITY = 100
 MIN_QUALITY = 1
 MAX_IMAGE_DIMENSION = 20000  # Maximum image dimension (px)
+# Decoder limit (Pillow's default rejects inputs above ~179 MP as decompression
+# bombs); sized for a full MAX_IMAGE_DIMENSION square, which runs tiled
+MAX_IMAGE_PIXELS = MAX_IMAGE_DIMENSION ** 2
 
 # Supported formats
 SUPPORTED_FORMATS = ["JPEG", "PNG", "BMP", "GIF", "TIFF", "WEBP", "ICO"]
@@ -37,6 +40,38 @@ FORMAT_EXTENSIONS = {
     "ICO": ".ico",
 }
 
+# Encoder effort profiles: extra save() parameters per output format.
+# "balanced" keeps the old JPEG output but drops PNG optimize, which
+# often dominated batch time.
+ENCODER_EFFORTS = ["fastest", "balanced", "smallest"]
+DEFAULT_EFFORT = "balanced"
+ENCODER_PROFILES = {
+    "fastest": {
+        "JPEG": {"optimize": False},
+        "PNG": {"compress_level": 1},
+        "WEBP": {"method": 0},
+    },
+    "balanced": {
+        "JPEG": {"optimize": True},
+        "PNG": {"compress_level": 6},
+        "WEBP": {"method": 4},
+    },
+    "smallest": {
+        "JPEG": {"optimize": True, "progressive": True},
+        "PNG": {"optimize": True},  # compress_level 9 plus filter search
+        "WEBP": {"method": 6},
+        "GIF": {"optimize": True},
+        "TIFF": {"compression": "tiff_adobe_deflate"},
+    },
+}
+
+# Target-size encoding: lowest quality tried, and how close (in quality
+# points) to the best fitting quality the search has to get.
+FIT_MIN_QUALITY = 10
+FIT_QUALITY_TOLERANCE = 2
+FIT_MAX_DOWNSCALES = 8
+FIT_MIN_SIDE = 16
+
 # Rotation presets
 ROTATION_ANGLES = ["0", "90", "180", "270", "Custom"]
 
@@ -61,7 +96,23 @@ RENAME_PLACEHOLDERS = {
 
 # Batch processing
 MAX_WORKERS = 4
+IN_FLIGHT_PER_WORKER = 4  # Bounded submission window (tasks per worker)
 BATCH_TIMEOUT = 300  # Max time per image (seconds)
+MANIFEST_SAVE_INTERVAL = 5.0  # Seconds between incremental manifest saves
+
+# Tiled processing (very large images)
+TILED_PROCESSING_PIXELS = 64_000_000  # Images at least this large run tiled
+TILE_MEMORY_CAP = 64 * 1024 * 1024  # Byte budget for per-tile temporaries
+
+# Watch folder
+WATCH_POLL_INTERVAL = 0.25  # Seconds between directory snapshots
+WATCH_SETTLE_TIME = 0.5  # A file must keep its size/mtime this long before processing
+
+# HTTP conversion service
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_MAX_QUEUE = 16  # Requests waiting for a worker before answering 429
+SERVICE_MAX_BODY = 64 * 1024 * 1024  # Largest accepted upload (bytes)
 
 # History (Undo/Redo)
 MAX_HISTORY_STEPS = 20
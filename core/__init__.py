@@ -8,3 +8,11 @@ from core.history import HistoryManager
 from core.metadata import MetadataReader
 from core.dpi_manager import DPIManager
 from core.stats import ProcessingStats
+from core.profiler import StageProfiler
+from core.tiles import TileEngine
+from core.admission import MemoryBudget
+from core.manifest import BatchManifest
+from core.journal import BatchJournal
+from core.watcher import FolderWatcher
+from core.variants import OutputVariant, parse_variants
+from core.plan import ExecutionPlan, compile_plan
@@ -0,0 +1,162 @@
+"""
+Image Converter Pro — Memory-budget admission control.
+Estimates per-image working set from the file header and limits
+concurrent batch work to a byte budget.
+"""
+
+import threading
+
+from PIL import Image
+
+from config.constants import TILED_PROCESSING_PIXELS
+from core.converter import ImageConverter
+from core.tiles import TileEngine
+from core.variants import parse_variants, decode_size
+from utils.validators import validate_dimensions, ValidationError
+
+
+def read_header(image_path):
+    """Read image size, mode and format without decoding pixel data.
+
+    Args:
+        image_path: Image file path
+
+    Returns:
+        tuple or None: ((width, height), mode, format), None if unreadable
+    """
+    try:
+        with Image.open(image_path) as img:
+            return img.size, img.mode, img.format
+    except Exception:
+        return None
+
+
+def _draft_scale(src_size, box):
+    """Power-of-two scale JPEG draft mode will pick for a decode box."""
+    scale = 1
+    while (scale < 8 and src_size[0] // (scale * 2) >= box[0]
+           and src_size[1] // (scale * 2) >= box[1]):
+        scale *= 2
+    return scale
+
+
+def estimate_peak_bytes(size, mode, fmt, settings):
+    """Estimate the peak working set of one image through the pipeline.
+
+    The model follows BatchProcessor._process_single: decode (at reduced
+    scale for JPEG draft mode), resize, then effects, watermark and
+    format conversion on the resized frame, each keeping an input and an
+    output copy alive.
+
+    Args:
+        size: (width, height) from the file header
+        mode: PIL mode from the file header
+        fmt: PIL format from the file header
+        settings: Processing settings (dict)
+
+    Returns:
+        int: Estimated peak bytes
+    """
+    src_w, src_h = size
+    bands = Image.getmodebands(mode)
+
+    target = None
+    if settings.get("variants"):
+        try:
+            target = decode_size(parse_variants(settings))  # Largest variant
+        except ValidationError:
+            pass
+    elif settings.get("width") and settings.get("height"):
+        try:
+            target = validate_dimensions(settings["width"], settings["height"])
+        except ValidationError:
+            pass
+    maintain_ratio = settings.get("maintain_ratio", True)
+
+    # Decode
+    decoded_px = src_w * src_h
+    out_w, out_h = src_w, src_h
+    if target:
+        box = ImageConverter._decode_box(size, target, maintain_ratio)
+        if box and fmt == "JPEG":
+            scale = _draft_scale(size, box)
+            decoded_px = -(-src_w // scale) * -(-src_h // scale)
+        if maintain_ratio:
+            ratio = min(1.0, target[0] / src_w, target[1] / src_h)
+            out_w, out_h = max(1, round(src_w * ratio)), max(1, round(src_h * ratio))
+        else:
+            out_w, out_h = target
+    out_px = out_w * out_h
+    decode_bytes = decoded_px * bands + out_px * bands
+
+    # Effects / conversion on the resized frame (the watermark only blends
+    # its own region, in the frame's mode)
+    work_bands = 4 if "A" in mode else max(bands, 3)
+    if out_px >= TILED_PROCESSING_PIXELS:
+        pipeline_bytes = TileEngine().estimate_peak_bytes((out_w, out_h), "RGBA")
+    else:
+        pipeline_bytes = out_px * work_bands * 2
+        if settings.get("vignette"):
+            pipeline_bytes += out_px * 4  # float32 mask
+    pipeline_bytes += out_px * work_bands  # format conversion copy
+
+    return max(decode_bytes, pipeline_bytes)
+
+
+class MemoryBudget:
+    """Admits batch tasks while their estimated working set fits a budget.
+
+    A task larger than the whole budget is still admitted when nothing
+    else is running, so oversized images serialize instead of failing.
+
+    Attributes:
+        budget_bytes: Byte budget for concurrently running tasks
+        in_use: Bytes reserved by admitted, unfinished tasks
+        peak: Highest in_use seen
+    """
+
+    def __init__(self, budget_bytes):
+        """Create MemoryBudget.
+
+        Args:
+            budget_bytes: Byte budget for concurrently running tasks
+
+        Raises:
+            ValueError: If budget_bytes is not positive
+        """
+        if budget_bytes <= 0:
+            raise ValueError(f"Memory budget must be positive: {budget_bytes}")
+        self.budget_bytes = budget_bytes
+        self.in_use = 0
+        self.peak = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate(image_path, settings):
+        """Estimate the peak bytes of an image from its header (0 if unreadable)."""
+        header = read_header(image_path)
+        if header is None:
+            return 0  # The worker will report the error
+        size, mode, fmt = header
+        return estimate_peak_bytes(size, mode, fmt, settings)
+
+    def try_acquire(self, cost):
+        """Reserve cost bytes if they fit (or if nothing else is running).
+
+        Returns:
+            bool: True if the task was admitted
+        """
+        with self._lock:
+            if self._running and self.in_use + cost > self.budget_bytes:
+                return False
+            self.in_use += cost
+            self._running += 1
+            self.peak = max(self.peak, self.in_use)
+            return True
+
+    def release(self, cost):
+        """Release a reservation made by try_acquire()."""
+        with self._lock:
+            self.in_use -= cost
+            self._running -= 1
@@ -1,32 +1,141 @@
 """
 Image Converter Pro — Parallel batch processing module.
-Fast batch processing with ThreadPoolExecutor.
+Fast batch processing with ThreadPoolExecutor or ProcessPoolExecutor.
 """
 
+import asyncio
+import io
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+)
+from dataclasses import dataclass, field
+from typing import Optional
 from PIL import Image
 
+from config.constants import IN_FLIGHT_PER_WORKER, DEFAULT_EFFORT, MANIFEST_SAVE_INTERVAL
 from core.converter import ImageConverter
 from core.effects import EffectsEngine
 from core.watermark import WatermarkEngine
-from utils.file_utils import generate_output_filename
+from core.profiler import StageProfiler, StageTimer
+from core.stats import ProcessingStats
+from core.admission import MemoryBudget
+from core.manifest import BatchManifest, settings_hash, content_hash
+from core.journal import BatchJournal
+from core.variants import parse_variants, decode_size, variant_outputs
+from core.plan import compile_plan
+from utils.file_utils import (
+    generate_output_filename, OutputNameIndex, make_temp_output, remove_temp_outputs
+)
+
+
+@dataclass
+class BatchItemResult:
+    """Result of processing a single image in a batch.
+
+    Attributes:
+        index: Zero-based position of the input
+        path: Input file path
+        output_path: Saved file path (None on failure)
+        error: Error message (None on success)
+        metrics: Input format, megapixels and stage timings (success only)
+        skipped: True if the input was unchanged (or already done by a
+            resumed batch) and not reprocessed
+    """
+    index: int
+    path: str
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+    metrics: dict = field(default_factory=dict)
+    skipped: bool = False
+
+    @property
+    def ok(self):
+        """Whether the image was processed successfully."""
+        return self.error is None
+
+    @property
+    def status(self):
+        """"ok", "failed" or "skipped"."""
+        if self.skipped:
+            return "skipped"
+        return "ok" if self.ok else "failed"
+
+    def as_dict(self):
+        """Plain (JSON-serializable) record of the result.
+
+        Returns:
+            dict: {"index", "path", "output", "status", "error", "bytes_in",
+            "bytes_out", "stages", "encode", "variants"} with stages as
+            {stage: [wall, cpu]}, encode the target-size search result (None
+            without a budget) and variants the fan-out outputs (None without
+            variants)
+        """
+        return {
+            "index": self.index,
+            "path": self.path,
+            "output": self.output_path,
+            "status": self.status,
+            "error": self.error,
+            "bytes_in": self.metrics.get("bytes_in", 0),
+            "bytes_out": self.metrics.get("bytes_out", 0),
+            "stages": {name: list(times) for name, times in self.metrics.get("stages", {}).items()},
+            "encode": self.metrics.get("encode"),
+            "variants": self.metrics.get("variants"),
+        }
 
 
 class BatchProcessor:
     """Parallel batch image processing.
 
-    Uses ThreadPoolExecutor to process multiple images simultaneously.
+    Uses ThreadPoolExecutor (or ProcessPoolExecutor with backend="process")
+    to process multiple images simultaneously.
+    Inputs are streamed through a bounded window of in-flight tasks.
     Error-tolerant: continues processing if a single image fails.
     """
 
-    def __init__(self, max_workers=4):
+    BACKENDS = ("thread", "process")
+
+    def __init__(self, max_workers=4, backend="thread", profile=False,
+                 memory_budget=None, incremental=False, content_hash=False,
+                 journal=False):
         """Create BatchProcessor.
 
         Args:
             max_workers: Number of parallel workers
+            backend: "thread" (default) or "process". The process backend
+                sidesteps the GIL for NumPy/Python-heavy effects; only the
+                paths and the settings dict are sent to the workers.
+            profile: Time every pipeline stage and aggregate the results
+                in self.profiler (StageProfiler)
+            memory_budget: Optional byte budget. Each image's peak working
+                set is estimated from its header and tasks are only started
+                while the total fits, so large images serialize and small
+                ones run on all max_workers.
+            incremental: Skip inputs whose output in save_dir is up to date
+                (see BatchManifest)
+            content_hash: In incremental mode, also compare input contents
+            journal: Log finished items to a BatchJournal in save_dir so an
+                interrupted batch can be resumed (see iter_batch(resume=True))
+
+        Raises:
+            ValueError: If backend is unknown
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(
+                f"Unknown backend: {backend}. Supported: {', '.join(self.BACKENDS)}"
+            )
+
         self.max_workers = max_workers
+        self.backend = backend
+        self.profiler = StageProfiler() if profile else None
+        self.stats = ProcessingStats()
+        self.memory_budget = memory_budget
+        self.admission = None
+        self.incremental = incremental
+        self.content_hash = content_hash
+        self.journal = journal
         self.converter = ImageConverter()
         self.effects = EffectsEngine()
         self.watermark = WatermarkEngine()
@@ -40,76 +149,254 @@ class BatchProcessor:
         """Reset cancellation state."""
         self._cancelled = False
 
-    def process_batch(self, image_paths, settings, save_dir, progress_callback=None):
+    def process_batch(self, image_paths, settings, save_dir, progress_callback=None,
+                      max_in_flight=None, resume=False):
         """Process multiple images in batch.
 
         Args:
-            image_paths: List of image file paths
+            image_paths: Iterable of image file paths (list, generator, ...)
             settings: Processing settings (dict)
             save_dir: Output directory
-            progress_callback: Progress function (index, total, filename, status)
+            progress_callback: Progress function (index, total, filename, status).
+                total is None when image_paths has no length. Live counters
+                are available from self.stats while the batch runs.
+            max_in_flight: Maximum number of submitted, unfinished tasks
+                (default: max_workers * IN_FLIGHT_PER_WORKER)
+            resume: Continue an interrupted batch from its journal
 
         Returns:
-            dict: {"success": int, "failed": int, "errors": list}
+            dict: {"success": int, "failed": int, "skipped": int, "errors": list},
+            plus "profile" (StageProfiler.report()) when profiling is enabled
         """
-        self.reset()
-        total = len(image_paths)
-        results = {"success": 0, "failed": 0, "errors": []}
+        results = {"success": 0, "failed": 0, "skipped": 0, "errors": []}
+
+        for item in self.iter_batch(image_paths, settings, save_dir, max_in_flight,
+                                    resume=resume):
+            total = self.stats.total or None
+            filename = os.path.basename(item.path)
+
+            if item.skipped:
+                results["skipped"] += 1
+
+                if progress_callback:
+                    progress_callback(
+                        item.index, total, filename,
+                        f"⏭️ Unchanged: {filename}"
+                    )
+            elif item.ok:
+                results["success"] += 1
+
+                if progress_callback:
+                    progress_callback(
+                        item.index, total, filename,
+                        f"✅ Saved: {os.path.basename(item.output_path)}"
+                    )
+            else:
+                results["failed"] += 1
+                error_msg = f"{filename}: {item.error}"
+                results["errors"].append(error_msg)
+
+                if progress_callback:
+                    progress_callback(
+                        item.index, total, filename,
+                        f"❌ Error: {filename} - {item.error}"
+                    )
+
+        if self.stats.profile is not None:
+            results["profile"] = self.stats.profile
+
+        return results
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {}
+    def iter_batch(self, image_paths, settings, save_dir, max_in_flight=None,
+                   resume=False):
+        """Process images and yield results as they complete.
 
-            for i, path in enumerate(image_paths):
-                if self._cancelled:
+        Paths are pulled from image_paths lazily and at most max_in_flight
+        tasks are submitted at any time, so memory stays flat no matter
+        how large the input is. Cancelling stops submission and drops all
+        queued (not yet started) tasks.
+
+        Outputs are written to a temp file and renamed into place once
+        complete, so an interrupted batch never leaves a truncated image.
+        With resume, items the journal records as done are yielded as
+        skipped and the rest are processed with their original numbering;
+        image_paths must list the same inputs in the same order.
+
+        Args:
+            image_paths: Iterable of image file paths
+            settings: Processing settings (dict)
+            save_dir: Output directory
+            max_in_flight: Maximum number of submitted, unfinished tasks
+                (default: max_workers * IN_FLIGHT_PER_WORKER, or max_workers
+                with a memory budget so that admitted tasks are running)
+            resume: Continue an interrupted batch from its journal
+                (implies journaling)
+
+        Yields:
+            BatchItemResult: One result per processed image, in completion order
+
+        Raises:
+            ValueError: If resuming a journal written with other settings
+        """
+        run = _BatchRun(self, image_paths, settings, save_dir, max_in_flight, resume)
+
+        with run.executor:
+            try:
+                while True:
+                    yield from run.top_up()
+                    if not run.pending:
+                        break
+
+                    self._update_queue(len(run.pending))
+                    done, _ = wait(run.pending, return_when=FIRST_COMPLETED)
+                    self._update_queue(len(run.pending) - len(done))
+
+                    for future in done:
+                        item = run.collect(future)
+                        if item is not None:
+                            yield item
+
+                    if self._cancelled:
+                        break
+            finally:
+                run.close()
+
+    async def aiter_batch(self, image_paths, settings, save_dir, max_in_flight=None,
+                          resume=False):
+        """Asyncio version of iter_batch().
+
+        Results are awaited on the event loop (no bridging thread); the
+        work itself runs on the worker pool as usual. Cancelling the
+        consuming task, or leaving the async for loop early, stops
+        submission and drops queued tasks; tasks already running are
+        awaited and recorded, but not yielded.
+
+        Submitting tasks reads input headers/stats on the event loop, so
+        image_paths should be a regular (non-blocking) iterable.
+
+        Args:
+            image_paths: Iterable of image file paths
+            settings: Processing settings (dict)
+            save_dir: Output directory
+            max_in_flight: As for iter_batch()
+            resume: As for iter_batch()
+
+        Yields:
+            BatchItemResult: One result per processed image, in completion
+            order (see BatchItemResult.as_dict() for a plain record)
+
+        Raises:
+            ValueError: If resuming a journal written with other settings
+        """
+        run = _BatchRun(self, image_paths, settings, save_dir, max_in_flight, resume)
+        waiters = {}  # asyncio future -> concurrent future
+        wrapped = set()
+        completed = False
+
+        try:
+            while True:
+                for item in run.top_up():
+                    yield item
+                if not run.pending:
+                    completed = True
                     break
 
-                future = executor.submit(
-                    self._process_single,
-                    path, settings, save_dir, i + 1
-                )
-                futures[future] = (i, path)
+                for future in run.pending:
+                    if future not in wrapped:
+                        wrapped.add(future)
+                        waiters[asyncio.wrap_future(future)] = future
+
+                self._update_queue(len(run.pending))
+                done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                self._update_queue(len(run.pending) - len(done))
+
+                for waiter in done:
+                    future = waiters.pop(waiter)
+                    wrapped.discard(future)
+                    item = run.collect(future)
+                    if item is not None:
+                        yield item
 
-            for future in as_completed(futures):
                 if self._cancelled:
                     break
+        finally:
+            if not completed:
+                self.cancel()  # Tasks still queued in the pool bail out when they start
+            running = run.drop_queued()
+            if running:
+                # Let running tasks finish without blocking the event loop
+                await asyncio.wait([asyncio.wrap_future(future) for future in running])
+            run.close()
+            for waiter in waiters:
+                waiter.cancel()
+            run.executor.shutdown(wait=False, cancel_futures=True)
+
+    def create_executor(self, in_memory=False):
+        """Create a worker pool for this processor's backend.
 
-                idx, path = futures[future]
-                filename = os.path.basename(path)
-
-                try:
-                    output_path = future.result()
-                    results["success"] += 1
+        Args:
+            in_memory: Return the task for process_bytes() instead
 
-                    if progress_callback:
-                        progress_callback(
-                            idx, total, filename,
-                            f"✅ Saved: {os.path.basename(output_path)}"
-                        )
+        Returns:
+            tuple: (executor, task) where task(image_path, settings, save_dir,
+            num, profile=False, output_path=None) processes one image and
+            returns (output_path, metrics), like _process_single(); with
+            in_memory, task(data, settings, profile=False) is process_bytes()
+        """
+        if self.backend == "process":
+            executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker
+            )
+            return executor, _process_bytes_in_worker if in_memory else _process_in_worker
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return executor, self.process_bytes if in_memory else self._process_single
 
-                except Exception as e:
-                    results["failed"] += 1
-                    error_msg = f"{filename}: {str(e)}"
-                    results["errors"].append(error_msg)
+    @staticmethod
+    def _stat(path):
+        """os.stat() of an input, or None if it is not accessible."""
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
 
-                    if progress_callback:
-                        progress_callback(
-                            idx, total, filename,
-                            f"❌ Error: {filename} - {str(e)}"
-                        )
+    @staticmethod
+    def _hash(path):
+        """content_hash() of an input, or None if it is not readable."""
+        try:
+            return content_hash(path)
+        except OSError:
+            return None
 
-        return results
+    def _update_queue(self, in_flight):
+        """Publish in-flight and queued task counts to the live stats."""
+        self.stats.update_queue(in_flight, max(0, in_flight - self.max_workers))
 
-    def _process_single(self, image_path, settings, save_dir, num):
-        """Process a single image (runs inside worker thread).
+    def _process_single(self, image_path, settings, save_dir, num, profile=False,
+                        output_path=None, hash_input=False, expected_hash=None):
+        """Process a single image (runs inside a worker thread or process).
 
         Args:
             image_path: Input file path
             settings: Settings dictionary
             save_dir: Output directory
             num: Sequential number
+            profile: Whether to time each stage
+            output_path: Existing output to overwrite (incremental mode),
+                or one per variant; a new unique name is generated when None
+            hash_input: Also hash the input for the manifest
+                (metrics["content_hash"]), here rather than on the thread
+                that collects the results
+            expected_hash: Manifest hash of a touched input
+                (BatchManifest.check()); if the contents still match,
+                nothing is processed
 
         Returns:
-            str: Output file path
+            tuple: (output_path, metrics) where metrics is a dict with
+            "format", "megapixels", "bytes_in", "bytes_out" and "stages"
+            ({stage: (wall, cpu)}, empty unless profile is set). With
+            settings["variants"], see _process_variants(). An input
+            matching expected_hash returns its existing (first) output
+            and {"unchanged": True, "content_hash": ...}.
 
         Raises:
             Exception: If processing fails
@@ -117,54 +404,509 @@ class BatchProcessor:
         if self._cancelled:
             raise Exception("Cancelled")
 
-        # 1. Load image ONLY ONCE
-        img = ImageConverter.load(image_path)
+        input_hash = self._hash(image_path) if hash_input or expected_hash else None
+        if expected_hash and input_hash == expected_hash:
+            if isinstance(output_path, list):
+                output_path = output_path[0]
+            return output_path, {"unchanged": True, "content_hash": input_hash}
+
+        timer = StageTimer(enabled=profile)
+        variants = parse_variants(settings)
+        if variants:
+            output_path, metrics = self._process_variants(image_path, settings, variants,
+                                                          save_dir, num, timer, output_path)
+            metrics["content_hash"] = input_hash
+            return output_path, metrics
+
+        if isinstance(output_path, list):
+            output_path = output_path[0]  # Previously a fan-out batch
+
+        # 1-6. Load, resize, rotate, effects, watermark, format conversion
+        img, fmt, metrics = self._render(image_path, settings, timer)
+
+        # 7. Save to a temp file
+        with timer.stage("save"):
+            temp_path, metrics["bytes_out"] = self._save_temp(img, fmt, settings, metrics, save_dir)
+
+        # 8. Publish under the output filename (atomic rename)
+        with timer.stage("filename"):
+            output_path = self._publish(temp_path, image_path, num, save_dir, fmt, settings,
+                                        img.size, output_path)
+
+        metrics["content_hash"] = input_hash
+        return output_path, metrics
+
+    def _process_variants(self, image_path, settings, variants, save_dir, num, timer,
+                          previous=None):
+        """Render one source into every output variant (fan-out).
+
+        The source is decoded once, at the smallest scale that covers the
+        largest variant, and rotation, effects and watermark run once on
+        that frame. Variants are then resized largest first, each from
+        the smallest frame rendered so far that still covers it, and
+        encoded to temp files. Outputs are published together once every
+        variant has been encoded.
+
+        Args:
+            image_path: Input file path
+            settings: Settings dictionary
+            variants: OutputVariant list (see parse_variants)
+            save_dir: Output directory
+            num: Sequential number
+            timer: StageTimer (repeated stages add up)
+            previous: Earlier outputs to overwrite, one path per variant;
+                new names are generated when the list does not line up
 
-        # 2. Resize
-        width = settings.get("width")
-        height = settings.get("height")
-        if width and height:
+        Returns:
+            tuple: (output path of the first variant, metrics) where
+            metrics["variants"] lists {"output", "format", "size", "bytes",
+            "encode"} per variant in declared order and "bytes_out" is
+            their total
+        """
+        maintain_ratio = settings.get("maintain_ratio", True)
+        plan = compile_plan(settings)  # Rotate, effects and watermark only
+
+        img, metrics = self._load(image_path, decode_size(variants, plan.rotates),
+                                  maintain_ratio, timer)
+        metrics["conversions_avoided"] = plan.conversions(img.mode)[1]
+        img = plan.run(img, self.effects, self.watermark, timer, owned=True)
+
+        # Variants that all need the same mode share one conversion
+        modes = {ImageConverter.target_mode(img.mode, v.format) for v in variants}
+        if len(modes) == 1 and img.mode not in modes:
+            with timer.stage("convert"):
+                img = ImageConverter.convert_format(img, variants[0].format)
+            metrics["conversions_avoided"] += len(variants) - 1
+
+        def area(size):
+            return size[0] * size[1]
+
+        frames = [img]
+        rendered = {}  # variant index -> (size, temp path, bytes, encode report)
+        try:
+            for variant in sorted(variants, reverse=True,
+                                  key=lambda v: area(v.target_size(img.size, maintain_ratio))):
+                with timer.stage("resize"):
+                    frame = img
+                    if variant.size:
+                        target = variant.target_size(img.size, maintain_ratio)
+                        source = min(
+                            (f for f in frames if f.width >= target[0] and f.height >= target[1]),
+                            key=lambda f: area(f.size), default=img,
+                        )
+                        frame = ImageConverter.resize(source, *variant.size,
+                                                      maintain_ratio=maintain_ratio)
+                        frames.append(frame)
+
+                with timer.stage("convert"):
+                    out = ImageConverter.convert_format(frame, variant.format)
+
+                with timer.stage("save"):
+                    report = {}
+                    temp_path, size = self._save_temp(out, variant.format, variant.settings,
+                                                      report, save_dir)
+                    rendered[variant.index] = (out.size, temp_path, size, report.get("encode"))
+        except Exception:
+            for _, temp_path, _, _ in rendered.values():
+                _remove_quietly(temp_path)
+            raise
+        del frames
+
+        if not (isinstance(previous, list) and len(previous) == len(variants)):
+            previous = [None] * len(variants)
+
+        records = []
+        with timer.stage("filename"):
             try:
-                img = ImageConverter.resize(
-                    img, width, height,
-                    maintain_ratio=settings.get("maintain_ratio", True)
-                )
+                for variant in variants:
+                    size, temp_path, nbytes, encode = rendered.pop(variant.index)
+                    output = self._publish(temp_path, image_path, num, save_dir, variant.format,
+                                           variant.settings, size, previous[variant.index],
+                                           variant.suffix)
+                    records.append({"output": output, "format": variant.format,
+                                    "size": list(size), "bytes": nbytes, "encode": encode,
+                                    "new": previous[variant.index] is None})
             except Exception:
-                pass  # Invalid dimensions — skip resize
+                for _, temp_path, _, _ in rendered.values():
+                    _remove_quietly(temp_path)
+                # Unpublish the new names too: a retry would otherwise
+                # get _N duplicates of a partial set
+                index = OutputNameIndex.for_dir(save_dir)
+                for record in records:
+                    if record["new"]:
+                        _remove_quietly(record["output"])
+                        index.release(record["output"])
+                raise
+            for record in records:
+                del record["new"]
+
+        metrics["bytes_out"] = sum(record["bytes"] for record in records)
+        metrics["variants"] = records
+        return records[0]["output"], metrics
+
+    def _save_temp(self, img, fmt, settings, metrics, save_dir):
+        """Encode img into a new temp file in save_dir.
 
-        # 3. Rotate
-        angle = settings.get("angle", 0)
+        Returns:
+            tuple: (temp path, bytes written)
+        """
+        f, temp_path = make_temp_output(save_dir)
         try:
-            if angle and float(angle) != 0:
-                img = ImageConverter.rotate(img, angle)
-        except (ValueError, TypeError):
-            pass  # Invalid angle — skip rotate
-
-        # 4. Effects (brightness, contrast, filters)
-        img = self.effects.apply_all(img, settings)
-
-        # 5. Watermark
-        if settings.get("watermark", False) and settings.get("watermark_text"):
-            img = self.watermark.add_text_watermark(
-                img,
-                text=settings["watermark_text"],
-                position=settings.get("watermark_position", "bottom-right"),
-                opacity=settings.get("watermark_opacity", 0.5),
-            )
+            with f:
+                self._save(img, f, fmt, settings, metrics)
+                return temp_path, f.tell()
+        except Exception:
+            # Don't leave a truncated file behind
+            _remove_quietly(temp_path)
+            raise
+
+    @staticmethod
+    def _publish(temp_path, image_path, num, save_dir, fmt, settings, size,
+                 output_path=None, suffix=""):
+        """Move a finished temp file to its output name (atomic rename).
+
+        Args:
+            output_path: Existing output to overwrite; a new unique name
+                is generated when None
+            suffix: Appended to the generated name
+
+        Returns:
+            str: Output path
+        """
+        try:
+            if output_path is None:
+                return generate_output_filename(
+                    image_path, num, save_dir, fmt,
+                    rename=settings.get("rename", False),
+                    pattern=settings.get("rename_pattern", ""),
+                    size=size,
+                    temp_path=temp_path,
+                    suffix=suffix,
+                )
+            os.replace(temp_path, output_path)
+            return output_path
+        except Exception:
+            _remove_quietly(temp_path)
+            raise
+
+    def process_bytes(self, data, settings, profile=False):
+        """Process an encoded image held in memory.
+
+        Runs the same pipeline as batch processing, without touching
+        the filesystem. Fan-out variants are not applied: the base
+        settings produce the one output.
+
+        Args:
+            data: Encoded input image (bytes)
+            settings: Settings dictionary
+            profile: Whether to time each stage
+
+        Returns:
+            tuple: (encoded output bytes, output format, metrics) with
+            metrics as for _process_single()
+
+        Raises:
+            Exception: If processing fails
+        """
+        timer = StageTimer(enabled=profile)
+        img, fmt, metrics = self._render(io.BytesIO(data), settings, timer)
+        metrics["bytes_in"] = len(data)
+
+        with timer.stage("save"):
+            buffer = io.BytesIO()
+            self._save(img, buffer, fmt, settings, metrics)
+            output = buffer.getvalue()
+            metrics["bytes_out"] = len(output)
 
-        # 6. Format conversion (RGBA -> RGB etc.)
-        fmt = settings.get("format", "JPEG")
-        img = ImageConverter.convert_format(img, fmt)
+        return output, fmt, metrics
 
-        # 7. Generate output filename
-        output_path = generate_output_filename(
-            image_path, num, save_dir, fmt,
-            rename=settings.get("rename", False),
-            pattern=settings.get("rename_pattern", ""),
+    @staticmethod
+    def _save(img, f, fmt, settings, metrics):
+        """Encode img into f with the settings' encoder options.
+
+        With a "max_bytes" budget, metrics["encode"] receives the
+        target-size search result (quality, scale, size, iterations).
+        """
+        report = {} if settings.get("max_bytes") else None
+        ImageConverter.save(
+            img, f, fmt, settings.get("quality", 85),
+            effort=settings.get("effort", DEFAULT_EFFORT),
+            lossless=settings.get("lossless", False),
+            max_bytes=settings.get("max_bytes"),
+            downscale=settings.get("fit_downscale", False),
+            report=report,
         )
+        if report:
+            metrics["encode"] = report
+
+    def _render(self, source, settings, timer):
+        """Load an image and apply every pipeline step before saving.
+
+        Args:
+            source: File path or binary file object
+            settings: Settings dictionary
+            timer: StageTimer collecting the stage timings
+
+        Returns:
+            tuple: (PIL Image ready to save, output format, metrics)
+        """
+        plan = compile_plan(settings)
+
+        # 1. Load image ONLY ONCE (decoded at reduced scale when downscaling)
+        img, metrics = self._load(source, plan.decode_size, plan.maintain_ratio, timer)
+        metrics["conversions_avoided"] = plan.conversions(img.mode)[1]
+
+        # 2-6. Resize, rotate, effects, watermark, format conversion
+        img = plan.run(img, self.effects, self.watermark, timer, owned=True)
+
+        return img, plan.format, metrics
+
+    @staticmethod
+    def _load(source, target_size, maintain_ratio, timer):
+        """Decode a source image (at reduced scale for a target box).
+
+        Returns:
+            tuple: (PIL Image, metrics with the source format, megapixels,
+            bytes_in and the stage timings)
+        """
+        with timer.stage("load"):
+            img = ImageConverter.load(source, target_size, maintain_ratio)
+
+        src_w, src_h = img.info.get("source_size", img.size)
+        metrics = {
+            "format": img.format,
+            "megapixels": src_w * src_h / 1e6,
+            "bytes_in": img.info.get("source_bytes", 0),
+            "bytes_out": 0,
+            "conversions_avoided": 0,
+            "stages": timer.stages,
+        }
+        return img, metrics
+
+
+class _BatchRun:
+    """Submission and bookkeeping of one batch run.
+
+    Shared by iter_batch() and aiter_batch(), which only differ in how
+    they wait for the pending futures.
+    """
+
+    def __init__(self, processor, image_paths, settings, save_dir, max_in_flight, resume):
+        processor.reset()
+        self.processor = processor
+        self.settings = settings
+        self.save_dir = save_dir
+
+        self.journal = None
+        if processor.journal or resume:
+            self.journal = BatchJournal(save_dir, settings_hash(settings), resume=resume)
+            if resume:
+                remove_temp_outputs(save_dir)  # Partial writes of the crashed run
+
+        try:
+            total = len(image_paths)
+        except TypeError:
+            total = None  # Generator or other lazy iterable
+        self.stats = processor.stats
+        self.stats.start(total)
+
+        # Fresh name index per batch: one scandir of the output directory
+        OutputNameIndex.reset(save_dir)
+
+        self.manifest = None
+        if processor.incremental:
+            self.manifest = BatchManifest(save_dir, use_content_hash=processor.content_hash)
+            self.digest = settings_hash(settings)
+            self.last_save = time.monotonic()
+
+        self.profiler = processor.profiler
+        if self.profiler is not None:
+            self.profiler.start()
+
+        self.admission = None
+        if processor.memory_budget:
+            self.admission = MemoryBudget(processor.memory_budget)
+            window = max_in_flight or processor.max_workers
+        else:
+            window = max_in_flight or processor.max_workers * IN_FLIGHT_PER_WORKER
+        self.window = max(1, int(window))
+        processor.admission = self.admission
+
+        self.paths = enumerate(image_paths)
+        self.exhausted = False
+        self.held = None  # Next task, waiting for memory to be admitted
+        self.pending = {}  # future -> (index, path, cost, input stat)
+
+        self.executor, self.task = processor.create_executor()
+
+    def top_up(self):
+        """Submit tasks while the window has room.
+
+        Yields:
+            BatchItemResult: Skipped inputs (already done or unchanged)
+        """
+        journal, manifest, admission = self.journal, self.manifest, self.admission
+        while (not self.exhausted and not self.processor._cancelled
+               and len(self.pending) < self.window):
+            if self.held is None:
+                try:
+                    i, path = next(self.paths)
+                except StopIteration:
+                    self.exhausted = True
+                    break
+
+                if journal is not None:
+                    finished = journal.completed(i, path)
+                    if finished:
+                        self.stats.record_skipped()
+                        yield BatchItemResult(i, path, output_path=finished, skipped=True)
+                        continue
+
+                previous = expected_hash = None
+                if manifest is not None:
+                    # Touched inputs are hashed by the worker, not here
+                    unchanged, previous, expected_hash = manifest.check(path, self.digest)
+                    if unchanged:
+                        self.stats.record_skipped()
+                        yield BatchItemResult(i, path, output_path=unchanged, skipped=True)
+                        continue
+
+                cost = admission.estimate(path, self.settings) if admission else 0
+                self.held = (i, path, cost, previous, expected_hash)
+
+            i, path, cost, previous, expected_hash = self.held
+            if admission and not admission.try_acquire(cost):
+                break  # Wait for running tasks to free memory
+            self.held = None
+
+            in_stat = self.processor._stat(path) if manifest is not None else None
+            future = self.executor.submit(
+                self.task, path, self.settings, self.save_dir, i + 1,
+                self.profiler is not None, previous,
+                manifest is not None and manifest.use_content_hash, expected_hash
+            )
+            self.pending[future] = (i, path, cost, in_stat)
+
+    def collect(self, future):
+        """Record a finished future.
+
+        Returns:
+            BatchItemResult or None: None when the batch was cancelled
+        """
+        idx, path, cost, in_stat = self.pending.pop(future)
+        if self.admission:
+            self.admission.release(cost)
+
+        # A task finishing after cancel() has still published its output:
+        # record it like any other, only leave it out of the results
+        cancelled = self.processor._cancelled
+
+        try:
+            output_path, metrics = future.result()
+        except Exception as e:
+            if cancelled:
+                return None  # Bailed out (or failed) without an output
+            self.stats.record_failure(f"{os.path.basename(path)}: {e}")
+            if self.journal is not None:
+                self.journal.record(idx, path, error=str(e))
+            return BatchItemResult(idx, path, error=str(e))
+
+        if metrics.get("unchanged"):  # Touched, but the content hash matched
+            self.stats.record_skipped()
+            if cancelled:
+                return None
+            return BatchItemResult(idx, path, output_path=output_path, skipped=True)
+
+        self.stats.record_success(metrics["bytes_in"], metrics["bytes_out"],
+                                  metrics.get("conversions_avoided", 0))
+        if self.journal is not None:
+            self.journal.record(idx, path, output_path=output_path)
+        if self.manifest is not None and in_stat:
+            self.manifest.record(path, in_stat, self.digest, output_path,
+                                 outputs=variant_outputs(metrics),
+                                 input_hash=metrics.get("content_hash"))
+            if time.monotonic() - self.last_save >= MANIFEST_SAVE_INTERVAL:
+                self.manifest.save()  # Keep the incremental state if the run dies
+                self.last_save = time.monotonic()
+
+        if self.profiler is not None:
+            self.profiler.record(metrics["stages"], metrics["format"], metrics["megapixels"])
+        if cancelled:
+            return None
+        return BatchItemResult(idx, path, output_path=output_path, metrics=metrics)
+
+    def drop_queued(self):
+        """Cancel tasks that have not started.
+
+        Returns:
+            list: Futures of the tasks already running
+        """
+        running = []
+        for future in list(self.pending):
+            if future.cancel():
+                _, _, cost, _ = self.pending.pop(future)
+                if self.admission:
+                    self.admission.release(cost)
+            else:
+                running.append(future)
+        return running
+
+    def close(self):
+        """Drop queued work, record running tasks and flush the batch state.
+
+        Tasks already running on cancel or early generator close are
+        waited for and recorded (journal, manifest, stats), so a resumed
+        or incremental run does not process their inputs again.
+        """
+        running = self.drop_queued()
+        if running:
+            wait(running)
+        for future in running:
+            self.collect(future)
+        self.processor._update_queue(0)
+        if self.manifest is not None:
+            self.manifest.save()
+        if self.journal is not None:
+            self.journal.close()
+        self.stats.finish()
+        if self.profiler is not None:
+            self.profiler.finish()
+            self.stats.profile = self.profiler.report()
+
+
+def _remove_quietly(path):
+    """Delete a file, ignoring errors."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ========== Process backend ==========
+
+# Per-process BatchProcessor, created once by the pool initializer so the
+# engines stay warm across all tasks handled by that worker.
+_worker_processor = None
+
+
+def _init_worker():
+    """Initialize a process pool worker."""
+    global _worker_processor
+    _worker_processor = BatchProcessor(max_workers=1)
+
+
+def _process_in_worker(image_path, settings, save_dir, num, profile=False,
+                       output_path=None, hash_input=False, expected_hash=None):
+    """Process a single image inside a process pool worker.
+
+    Module-level so it can be pickled by ProcessPoolExecutor.
+    """
+    return _worker_processor._process_single(
+        image_path, settings, save_dir, num, profile, output_path, hash_input,
+        expected_hash
+    )
 
-        # 8. Save
-        quality = settings.get("quality", 85)
-        ImageConverter.save(img, output_path, fmt, quality)
 
-        return output_path
+def _process_bytes_in_worker(data, settings, profile=False):
+    """Process an in-memory image inside a process pool worker."""
+    return _worker_processor.process_bytes(data, settings, profile)
@@ -3,8 +3,28 @@ Image Converter Pro — Core image conversion module.
 Format conversion, resize, and rotate operations.
 """
 
+import io
+import math
+import os
 from PIL import Image
-from utils.validators import validate_dimensions, validate_angle, validate_quality, validate_format
+from config.constants import (
+    DEFAULT_EFFORT, ENCODER_PROFILES, MAX_IMAGE_PIXELS,
+    FIT_MIN_QUALITY, FIT_QUALITY_TOLERANCE, FIT_MAX_DOWNSCALES, FIT_MIN_SIDE,
+)
+from utils.cache import LRUCache
+from utils.validators import (
+    validate_dimensions, validate_angle, validate_quality, validate_format, validate_effort,
+    validate_max_bytes,
+)
+
+
+# Accept very large inputs (the tile engine bounds the effects' working set);
+# set on import so process pool workers get it too. Pillow warns above
+# this and raises DecompressionBombError above twice it.
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+# Winning quality per image class, used to seed the next target-size search
+_fit_seeds = LRUCache(max_entries=256)
 
 
 class ImageConverter:
@@ -14,6 +34,13 @@ class ImageConverter:
     no Tkinter variables are used directly.
     """
 
+    # Decoded image is kept at least this many times larger than the
+    # target box, so the final LANCZOS pass still has detail to work with.
+    REDUCING_GAP = 2.0
+
+    # Modes supported by Image.reduce()
+    REDUCIBLE_MODES = ("L", "LA", "RGB", "RGBA", "CMYK", "I", "F")
+
     @staticmethod
     def resize(img, width, height, maintain_ratio=True):
         """Resize an image.
@@ -56,7 +83,8 @@ class ImageConverter:
     def convert_format(img, target_format):
         """Prepare image for format conversion.
 
-        Handles mode conversions (RGBA->RGB, P->RGB, etc.)
+        Handles mode conversions (RGBA->RGB, P->RGB, etc.) with at most
+        one conversion; RGBA is flattened onto white in a single paste.
 
         Args:
             img: PIL Image
@@ -66,68 +94,306 @@ class ImageConverter:
             PIL Image: Image ready for saving in target format
         """
         fmt = validate_format(target_format)
+        mode = ImageConverter.target_mode(img.mode, fmt)
+        if mode == img.mode:
+            return img
 
-        # RGBA -> RGB (for JPEG/WEBP/BMP)
-        if fmt in ("JPEG", "WEBP", "BMP") and img.mode == "RGBA":
+        # RGBA -> RGB: composite onto white, using the image as its own mask
+        if img.mode == "RGBA":
             background = Image.new("RGB", img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[3])
+            background.paste(img, mask=img)
             return background
 
-        # P mode -> RGB (for JPEG)
-        if fmt == "JPEG" and img.mode == "P":
-            return img.convert("RGB")
+        return img.convert(mode)
+
+    @staticmethod
+    def target_mode(mode, fmt):
+        """Mode convert_format() gives an image of the given mode.
 
-        # Other modes -> RGB (for JPEG)
-        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
-            return img.convert("RGB")
+        Args:
+            mode: PIL mode of the image
+            fmt: Validated target format
 
-        return img
+        Returns:
+            str: PIL mode ready for saving
+        """
+        # RGBA -> RGB (for JPEG/WEBP/BMP)
+        if fmt in ("JPEG", "WEBP", "BMP") and mode == "RGBA":
+            return "RGB"
+
+        # P and other modes -> RGB (for JPEG)
+        if fmt == "JPEG" and mode not in ("RGB", "L"):
+            return "RGB"
+
+        return mode
 
     @staticmethod
-    def save(img, output_path, fmt, quality=85):
+    def save(img, output_path, fmt, quality=85, effort=DEFAULT_EFFORT, lossless=False,
+             max_bytes=None, downscale=False, report=None):
         """Save image to file.
 
+        With max_bytes, the image is encoded in memory by encode_to_size()
+        and the winning buffer is written once; quality is then the
+        highest quality the search may pick.
+
         Args:
             img: PIL Image
             output_path: Output file path
             fmt: Format ("JPEG", "PNG", etc.)
             quality: Quality (1-100, JPEG/WEBP only)
+            effort: Encoder effort profile ("fastest", "balanced",
+                "smallest"), see ENCODER_PROFILES
+            lossless: Encode WEBP losslessly
+            max_bytes: Optional output size budget (bytes or e.g. "150K")
+            downscale: Allow shrinking the image to meet max_bytes
+            report: Optional dict, updated with the encode_to_size() info
 
         Returns:
             str: Saved file path
+
+        Raises:
+            ValueError: If the image cannot be encoded within max_bytes
         """
         fmt = validate_format(fmt)
         quality = validate_quality(quality)
-
-        save_options = {}
+        effort = validate_effort(effort)
+        max_bytes = validate_max_bytes(max_bytes)
+
+        if max_bytes:
+            data, info = ImageConverter.encode_to_size(
+                img, fmt, max_bytes, quality, effort, lossless, downscale
+            )
+            if report is not None:
+                report.update(info)
+            if hasattr(output_path, "write"):
+                output_path.write(data)
+            else:
+                with open(output_path, "wb") as f:
+                    f.write(data)
+            return output_path
+
+        save_options = dict(ENCODER_PROFILES[effort].get(fmt, {}))
 
         if fmt in ("JPEG", "WEBP"):
             save_options["quality"] = quality
 
-        if fmt == "JPEG":
-            save_options["optimize"] = True
-
-        if fmt == "PNG":
-            save_options["optimize"] = True
+        if fmt == "WEBP" and lossless:
+            save_options["lossless"] = True
 
         img.save(output_path, format=fmt, **save_options)
         return output_path
 
     @staticmethod
-    def load(image_path):
+    def encode_to_size(img, fmt, max_bytes, quality=85, effort=DEFAULT_EFFORT,
+                       lossless=False, downscale=False):
+        """Encode an image in memory so that it fits a byte budget.
+
+        JPEG and lossy WEBP bisect quality between FIT_MIN_QUALITY and
+        quality for the highest setting that fits, stopping within
+        FIT_QUALITY_TOLERANCE points of it. The first probe is the
+        quality that won last time for the same image class (format,
+        effort, mode, pixel count and budget per pixel), so similar
+        images usually settle in two encodes. Formats without a quality
+        setting can only fit by downscaling.
+
+        If the lowest quality is still too large and downscale is set,
+        the image is shrunk by the estimated area ratio (at least 10%)
+        and the search repeats, up to FIT_MAX_DOWNSCALES times.
+
+        Args:
+            img: PIL Image, already prepared for fmt
+            fmt: Format ("JPEG", "PNG", etc.)
+            max_bytes: Size budget in bytes
+            quality: Highest quality to consider
+            effort: Encoder effort profile
+            lossless: Encode WEBP losslessly
+            downscale: Allow shrinking the image
+
+        Returns:
+            tuple: (bytes, info) with info {"quality" (None for formats
+            without one), "scale", "size", "iterations"}
+
+        Raises:
+            ValueError: If the image cannot be encoded within max_bytes
+        """
+        fmt = validate_format(fmt)
+        quality = validate_quality(quality)
+        effort = validate_effort(effort)
+        tunable = fmt in ("JPEG", "WEBP") and not (fmt == "WEBP" and lossless)
+        floor = min(quality, FIT_MIN_QUALITY)
+        iterations = 0
+
+        def encode(image, q):
+            nonlocal iterations
+            iterations += 1
+            buffer = io.BytesIO()
+            ImageConverter.save(image, buffer, fmt, q, effort=effort, lossless=lossless)
+            return buffer.getvalue()
+
+        key = ImageConverter._fit_class(img, fmt, effort, max_bytes)
+        seed = _fit_seeds.get(key) if tunable else None
+        scaled, scale = img, 1.0
+
+        for _ in range(FIT_MAX_DOWNSCALES + 1):
+            if tunable:
+                best, data, smallest = ImageConverter._search_quality(
+                    lambda q: encode(scaled, q), max_bytes, floor, quality, seed
+                )
+            else:
+                data = encode(scaled, quality)
+                best, smallest = None, len(data)
+                if smallest > max_bytes:
+                    data = None
+
+            if data is not None:
+                if tunable and scale == 1.0:
+                    _fit_seeds.put(key, best)
+                return data, {"quality": best, "scale": scale,
+                              "size": len(data), "iterations": iterations}
+
+            if not downscale:
+                break
+            scale *= min(0.9, math.sqrt(max_bytes / smallest) * 0.95)
+            size = (round(img.width * scale), round(img.height * scale))
+            if min(size) < FIT_MIN_SIDE:
+                break
+            scaled = img.resize(size, Image.Resampling.LANCZOS)
+            seed = None
+
+        raise ValueError(
+            f"Cannot encode {fmt} within {max_bytes} bytes "
+            f"(smallest attempt: {smallest} bytes after {iterations} encodes)"
+        )
+
+    @staticmethod
+    def _search_quality(encode, max_bytes, lo, hi, seed=None):
+        """Find the highest quality in [lo, hi] whose encoding fits max_bytes.
+
+        Starts at seed (or hi), steps FIT_QUALITY_TOLERANCE away from a
+        seed to bracket it, then bisects.
+
+        Args:
+            encode: Function quality -> bytes
+            max_bytes: Size budget in bytes
+            lo: Lowest quality to try
+            hi: Highest quality to try
+            seed: Optional first guess
+
+        Returns:
+            tuple: (quality, bytes, smallest size seen); quality and bytes
+            are None if nothing fits
+        """
+        best, best_data, smallest = None, None, None
+        q = hi if seed is None else min(max(seed, lo), hi)
+        first = True
+
+        while lo <= hi:
+            data = encode(q)
+            if len(data) <= max_bytes:
+                best, best_data = q, data
+                lo = q + 1
+            else:
+                smallest = len(data) if smallest is None else min(smallest, len(data))
+                hi = q - 1
+
+            if best is not None and hi - best < FIT_QUALITY_TOLERANCE:
+                break
+            if first and seed is not None:
+                q = q + FIT_QUALITY_TOLERANCE if best == q else q - FIT_QUALITY_TOLERANCE
+                q = min(max(q, lo), hi)
+            else:
+                q = (lo + hi + 1) // 2
+            first = False
+
+        return best, best_data, smallest
+
+    @staticmethod
+    def _fit_class(img, fmt, effort, max_bytes):
+        """Image class for seeding target-size searches.
+
+        Pixel count and budget per pixel are bucketed in half-octaves, so
+        images that compress alike at a given budget share a class.
+        """
+        pixels = max(1, img.width * img.height)
+        return (
+            fmt, effort, img.mode,
+            round(2 * math.log2(pixels)),
+            round(2 * math.log2(max_bytes * 8 / pixels)),
+        )
+
+    @staticmethod
+    def _decode_box(src_size, target_size, maintain_ratio=True):
+        """Calculate the smallest size worth decoding for a target box.
+
+        Args:
+            src_size: (width, height) of the source image
+            target_size: (width, height) of the final resize
+            maintain_ratio: Whether the final resize keeps aspect ratio
+
+        Returns:
+            tuple or None: (width, height) to decode at, or None if the
+            image should be decoded at full resolution
+        """
+        src_w, src_h = src_size
+        w, h = target_size
+
+        if maintain_ratio:
+            scale = min(w / src_w, h / src_h)
+            if scale >= 1:
+                return None
+            w = max(1, round(src_w * scale))
+            h = max(1, round(src_h * scale))
+
+        gap = ImageConverter.REDUCING_GAP
+        return int(w * gap), int(h * gap)
+
+    @staticmethod
+    def load(image_path, target_size=None, maintain_ratio=True):
         """Load image from file.
 
+        When target_size is given, the image is decoded at reduced scale:
+        JPEG files use DCT-domain scaling (draft mode), other formats are
+        shrunk with Image.reduce() right after decoding. The result stays
+        at least REDUCING_GAP times larger than the target, so the final
+        resize() produces the same output at a fraction of the cost.
+
         Args:
             image_path: File path
+            target_size: Optional (width, height) the image will be resized to
+            maintain_ratio: Whether that resize keeps aspect ratio
 
         Returns:
-            PIL Image: Loaded image
+            PIL Image: Loaded image. img.info["source_size"] holds the
+            original (width, height) from the file header and
+            img.info["source_bytes"] the file size.
 
         Raises:
             IOError: If file cannot be opened
         """
         img = Image.open(image_path)
+        source_size = img.size
+        try:
+            source_bytes = os.fstat(img.fp.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            source_bytes = 0
+
+        box = None
+        if target_size:
+            box = ImageConverter._decode_box(img.size, target_size, maintain_ratio)
+            if box:
+                img.draft(img.mode, box)  # No-op for non-JPEG formats
+
         img.load()  # Force full loading (not lazy)
+
+        if box and img.mode in ImageConverter.REDUCIBLE_MODES:
+            factor = min(img.width // box[0], img.height // box[1])
+            if factor >= 2:
+                fmt = img.format
+                img = img.reduce(factor)
+                img.format = fmt  # reduce() returns a plain Image
+
+        img.info["source_size"] = source_size
+        img.info["source_bytes"] = source_bytes
         return img
 
     def process(self, image_path, settings):
@@ -145,22 +411,16 @@ class ImageConverter:
         Returns:
             PIL Image: Processed image
         """
-        img = self.load(image_path)
+        from core.plan import compile_plan
 
-        # Resize
         width = settings.get("width")
         height = settings.get("height")
         if width and height:
-            maintain = settings.get("maintain_ratio", True)
-            img = self.resize(img, width, height, maintain)
-
-        # Rotate
-        angle = settings.get("angle", 0)
-        if angle and float(angle) != 0:
-            img = self.rotate(img, angle)
+            validate_dimensions(width, height)
 
-        # Format conversion prep
-        fmt = settings.get("format", "JPEG")
-        img = self.convert_format(img, fmt)
+        # Compiled plan: no-op steps dropped, right-angle rotations transposed
+        keys = ("width", "height", "maintain_ratio", "angle", "format")
+        plan = compile_plan({key: settings[key] for key in keys if key in settings})
 
-        return img
+        img = self.load(image_path, plan.decode_size, plan.maintain_ratio)
+        return plan.run(img)
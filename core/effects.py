@@ -6,6 +6,14 @@ Brightness, contrast, filters, and artistic effects.
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 from utils.validators import validate_effect_value
+from utils.cache import LRUCache
+from config.constants import TILED_PROCESSING_PIXELS, TILE_MEMORY_CAP
+
+
+# Vignette masks shared by all EffectsEngine instances (LRU, max 256 MB)
+_vignette_masks = LRUCache(
+    max_entries=8, max_bytes=256 * 1024 * 1024, sizeof=lambda mask: mask.nbytes
+)
 
 
 class EffectsEngine:
@@ -15,6 +23,18 @@ class EffectsEngine:
     Thread-safe: all methods accept parameters as arguments.
     """
 
+    def __init__(self, tile_threshold=TILED_PROCESSING_PIXELS,
+                 tile_memory=TILE_MEMORY_CAP):
+        """Create EffectsEngine.
+
+        Args:
+            tile_threshold: Pixel count from which apply_all() processes
+                the image in tiles (TileEngine)
+            tile_memory: Byte budget for per-tile temporaries
+        """
+        self.tile_threshold = tile_threshold
+        self.tile_memory = tile_memory
+
     # ========== Adjustments ==========
 
     @staticmethod
@@ -81,6 +101,134 @@ class EffectsEngine:
             return img
         return ImageEnhance.Sharpness(img).enhance(factor)
 
+    # Modes handled by the fused adjust_color() kernel
+    FUSED_MODES = ("L", "RGB", "RGBA")
+
+    # ITU-R 601-2 luma weights (same as Image.convert("L"))
+    LUMA_WEIGHTS = (0.299, 0.587, 0.114)
+
+    @staticmethod
+    def _brightness_contrast_lut(img, brightness, contrast, histogram=None):
+        """Build a 256-entry LUT for brightness followed by contrast.
+
+        Matches ImageEnhance: each step blends towards a degenerate image
+        and truncates to uint8. The contrast mean is taken from the
+        brightness-adjusted image, computed from the per-band histograms
+        instead of a full-size grayscale copy.
+
+        Args:
+            img: PIL Image
+            brightness: Brightness factor
+            contrast: Contrast factor
+            histogram: Histogram to use instead of img.histogram(), e.g.
+                one summed over the tiles of an intermediate result
+
+        Returns:
+            list: 256 output levels
+        """
+        def clip(value):
+            return 0 if value <= 0 else 255 if value >= 255 else int(value)
+
+        lut = [clip(v * brightness) for v in range(256)]
+
+        if contrast != 1.0:
+            if histogram is None:
+                histogram = img.histogram()
+            bands = 1 if len(histogram) == 256 else 3
+            means = []
+            for band in range(bands):
+                counts = histogram[band * 256:(band + 1) * 256]
+                pixels = sum(counts) or 1
+                means.append(sum(lut[v] * n for v, n in enumerate(counts)) / pixels)
+            if bands == 1:
+                luma_mean = means[0]
+            else:
+                luma_mean = sum(w * m for w, m in zip(EffectsEngine.LUMA_WEIGHTS, means))
+            mean = int(luma_mean + 0.5)
+            lut = [clip(mean + contrast * (v - mean)) for v in lut]
+
+        return lut
+
+    @staticmethod
+    def adjust_color(img, brightness=1.0, contrast=1.0, saturation=1.0):
+        """Adjust brightness, contrast and saturation in a fused kernel.
+
+        Brightness and contrast are per-channel point operations and are
+        folded into one 256-entry LUT; saturation is a 3x3 color matrix.
+        Both run as single native passes (Image.point / Image.convert)
+        without the full-size degenerate images ImageEnhance allocates.
+        Output matches the sequential adjust_* calls within ~1 level.
+
+        Args:
+            img: PIL Image
+            brightness: Brightness factor (1=original)
+            contrast: Contrast factor (1=original)
+            saturation: Saturation factor (1=original)
+
+        Returns:
+            PIL Image: Adjusted image
+        """
+        brightness = validate_effect_value(brightness, "Brightness")
+        contrast = validate_effect_value(contrast, "Contrast")
+        saturation = validate_effect_value(saturation, "Saturation")
+
+        if img.mode not in EffectsEngine.FUSED_MODES:
+            # Fallback: sequential ImageEnhance passes
+            img = EffectsEngine.adjust_brightness(img, brightness)
+            img = EffectsEngine.adjust_contrast(img, contrast)
+            return EffectsEngine.adjust_saturation(img, saturation)
+
+        lut, matrix = EffectsEngine._color_tables(img, brightness, contrast, saturation)
+        return EffectsEngine._apply_color_tables(img, lut, matrix)
+
+    @staticmethod
+    def _color_tables(img, brightness, contrast, saturation, histogram=None):
+        """Build the LUT and color matrix used by adjust_color().
+
+        Only needs the histogram of img, so the tables can be computed
+        once for a large image and applied tile by tile.
+
+        Args:
+            histogram: Histogram to use instead of img.histogram()
+
+        Returns:
+            tuple: (lut or None, matrix or None)
+        """
+        lut = None
+        if brightness != 1.0 or contrast != 1.0:
+            lut = EffectsEngine._brightness_contrast_lut(img, brightness, contrast, histogram)
+
+        matrix = None
+        if saturation != 1.0 and img.mode != "L":
+            grey = [(1 - saturation) * w for w in EffectsEngine.LUMA_WEIGHTS]
+            matrix = []
+            for channel in range(3):
+                row = list(grey)
+                row[channel] += saturation
+                matrix.extend(row + [0])
+            matrix = tuple(matrix)
+
+        return lut, matrix
+
+    @staticmethod
+    def _apply_color_tables(img, lut, matrix):
+        """Apply tables from _color_tables() to an L/RGB/RGBA image."""
+        alpha = None
+        if img.mode == "RGBA":
+            alpha = img.getchannel("A")
+            img = img.convert("RGB")
+
+        if lut is not None:
+            img = img.point(lut * len(img.getbands()))
+
+        if matrix is not None and img.mode != "L":
+            img = img.convert("RGB", matrix)
+
+        if alpha is not None:
+            img.putalpha(alpha)
+
+        return img
+
     # ========== Filters ==========
 
     @staticmethod
@@ -113,68 +261,136 @@ class EffectsEngine:
         """Convert image to grayscale."""
         return img.convert("L")
 
+    # Sepia transformation matrix (Image.convert 12-tuple: 3 rows of r, g, b, offset)
+    SEPIA_MATRIX = (
+        0.393, 0.769, 0.189, 0,
+        0.349, 0.686, 0.168, 0,
+        0.272, 0.534, 0.131, 0,
+    )
+
     @staticmethod
     def apply_sepia(img):
         """Apply sepia tone effect.
 
         Converts image to warm brownish tones.
         Preserves alpha channel if present.
+
+        Uses Pillow's native matrix conversion: one uint8 pass with no
+        float intermediates (the output is within 1 level of a float
+        matmul, as Pillow rounds instead of truncating).
         """
-        has_alpha = img.mode == "RGBA"
+        has_alpha = img.mode in ("RGBA", "LA")
         alpha = None
 
         if has_alpha:
-            alpha = img.split()[3]
-            img = img.convert("RGB")
+            alpha = img.getchannel("A")
 
-        img_array = np.array(img, dtype=np.float64)
-
-        # Sepia transformation matrix
-        sepia_matrix = np.array([
-            [0.393, 0.769, 0.189],
-            [0.349, 0.686, 0.168],
-            [0.272, 0.534, 0.131]
-        ])
-
-        sepia_array = img_array @ sepia_matrix.T
-        sepia_array = np.clip(sepia_array, 0, 255).astype(np.uint8)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
 
-        result = Image.fromarray(sepia_array, "RGB")
+        result = img.convert("RGB", EffectsEngine.SEPIA_MATRIX)
 
         if has_alpha and alpha:
             result.putalpha(alpha)
 
         return result
 
+    @staticmethod
+    def apply_gray_sepia(img):
+        """Apply grayscale followed by sepia in one matrix pass.
+
+        Same result as apply_grayscale() then apply_sepia() within 1 level
+        (RGB output, alpha dropped): each sepia row is applied to the luma
+        of the pixel, so the matrix rows are the luma weights scaled by the
+        sepia row sums.
+        """
+        if img.mode == "L":
+            return EffectsEngine.apply_sepia(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        sepia = EffectsEngine.SEPIA_MATRIX
+        matrix = []
+        for row in range(3):
+            total = sum(sepia[row * 4:row * 4 + 3])
+            matrix.extend([total * w for w in EffectsEngine.LUMA_WEIGHTS] + [0])
+        return img.convert("RGB", tuple(matrix))
+
+    @staticmethod
+    def _vignette_profiles(width, height):
+        """Separable squared-distance profiles of the vignette.
+
+        Returns:
+            tuple: (x2, y2) float32 arrays of length width and height
+        """
+        x2 = np.linspace(-1, 1, width, dtype=np.float32) ** 2
+        y2 = np.linspace(-1, 1, height, dtype=np.float32) ** 2
+        return x2, y2
+
+    @staticmethod
+    def _build_vignette_mask(x2, y2, strength):
+        """Broadcast x^2/y^2 profiles into a float32 vignette mask."""
+        mask = np.add.outer(y2, x2)
+        np.sqrt(mask, out=mask)
+        mask *= -strength
+        mask += 1
+        np.clip(mask, 0, 1, out=mask)
+        return mask
+
+    @staticmethod
+    def _vignette_mask(width, height, strength):
+        """Get the (cached) float32 vignette mask for an image size.
+
+        The mask is built from separable x^2 and y^2 profiles broadcast
+        into a single float32 plane, and shared read-only between calls
+        with the same (size, strength).
+
+        Returns:
+            numpy.ndarray: (height, width) float32 mask in 0.0-1.0
+        """
+        def build():
+            x2, y2 = EffectsEngine._vignette_profiles(width, height)
+            mask = EffectsEngine._build_vignette_mask(x2, y2, strength)
+            mask.setflags(write=False)
+            return mask
+
+        key = (width, height, float(strength))
+        return _vignette_masks.get_or_create(key, build)
+
+    @staticmethod
+    def _apply_mask(img, mask):
+        """Multiply the color channels of img by a float32 mask.
+
+        The pixels are copied out of img once, multiplied in place
+        (truncating like astype()) and handed back to Pillow with
+        frombuffer, so L and RGBA results share that buffer instead of
+        copying it again. Alpha is untouched.
+        """
+        pixels = np.array(img)
+
+        if pixels.ndim == 3:
+            channels = pixels[:, :, :min(3, pixels.shape[2])]
+            np.multiply(channels, mask[:, :, None], out=channels, casting="unsafe")
+        else:
+            np.multiply(pixels, mask, out=pixels, casting="unsafe")
+
+        return Image.frombuffer(img.mode, img.size, pixels, "raw", img.mode, 0, 1)
+
     @staticmethod
     def apply_vignette(img, strength=0.5):
         """Apply vignette effect (darker edges).
 
+        The mask comes from an LRU cache keyed by (size, strength) and is
+        applied in place on a single copy of the uint8 pixel data, so peak
+        memory is about one extra image plane.
+
         Args:
             img: PIL Image
             strength: Vignette intensity (0.0-1.0)
         """
         width, height = img.size
-        img_array = np.array(img, dtype=np.float64)
-
-        # Create vignette mask
-        x = np.linspace(-1, 1, width)
-        y = np.linspace(-1, 1, height)
-        X, Y = np.meshgrid(x, y)
-        dist = np.sqrt(X**2 + Y**2)
-
-        vignette = 1 - (dist * strength)
-        vignette = np.clip(vignette, 0, 1)
-
-        # Apply to each channel
-        if len(img_array.shape) == 3:
-            for c in range(min(3, img_array.shape[2])):
-                img_array[:, :, c] *= vignette
-        else:
-            img_array *= vignette
-
-        result_array = np.clip(img_array, 0, 255).astype(np.uint8)
-        return Image.fromarray(result_array, img.mode)
+        mask = EffectsEngine._vignette_mask(width, height, strength)
+        return EffectsEngine._apply_mask(img, mask)
 
     @staticmethod
     def auto_enhance(img):
@@ -182,17 +398,63 @@ class EffectsEngine:
 
         Applies moderate improvements across all parameters.
         """
-        img = ImageEnhance.Brightness(img).enhance(1.1)
-        img = ImageEnhance.Contrast(img).enhance(1.15)
+        img = EffectsEngine.adjust_color(img, brightness=1.1, contrast=1.15, saturation=1.1)
         img = ImageEnhance.Sharpness(img).enhance(1.2)
-        img = ImageEnhance.Color(img).enhance(1.1)
         return img
 
     # ========== Batch apply ==========
 
+    @staticmethod
+    def apply_step(img, step):
+        """Apply one compiled effect step (see core.plan.PlanStep).
+
+        Args:
+            img: PIL Image
+            step: PlanStep whose op is in core.plan.EFFECT_OPS
+
+        Returns:
+            PIL Image: Processed image
+        """
+        if step.op == "color":
+            return EffectsEngine.adjust_color(img, *step.params)
+        if step.op == "sharpness":
+            return EffectsEngine.adjust_sharpness(img, step.params[0])
+        if step.op == "auto_enhance":
+            return EffectsEngine.auto_enhance(img)
+        if step.op == "grayscale" and img.mode == "L":
+            return img  # Already grayscale
+        return getattr(EffectsEngine, f"apply_{step.op}")(img)
+
+    def apply_steps(self, img, steps):
+        """Apply compiled effect steps in order.
+
+        Images of tile_threshold pixels or more run through TileEngine
+        when every step supports it.
+
+        Args:
+            img: PIL Image
+            steps: Sequence of PlanStep (core.plan.compile_effects())
+
+        Returns:
+            PIL Image: Processed image
+        """
+        from core.tiles import TileEngine
+
+        if not steps:
+            return img
+        if img.width * img.height >= self.tile_threshold and TileEngine.supports_steps(img, steps):
+            return TileEngine(self.tile_memory).apply_steps(img, steps)
+
+        for step in steps:
+            img = self.apply_step(img, step)
+        return img
+
     def apply_all(self, img, settings):
         """Apply all specified effects to an image.
 
+        The effects are compiled by core.plan.compile_effects(), which
+        drops no-ops and may reorder steps when the result is unchanged.
+
         Args:
             img: PIL Image
             settings: Settings dictionary with effect parameters
@@ -200,41 +462,6 @@ class EffectsEngine:
         Returns:
             PIL Image: Image with all effects applied
         """
-        # Adjustments
-        brightness = settings.get("brightness", 1.0)
-        if brightness != 1.0:
-            img = self.adjust_brightness(img, brightness)
+        from core.plan import compile_effects
 
-        contrast = settings.get("contrast", 1.0)
-        if contrast != 1.0:
-            img = self.adjust_contrast(img, contrast)
-
-        saturation = settings.get("saturation", 1.0)
-        if saturation != 1.0:
-            img = self.adjust_saturation(img, saturation)
-
-        sharpness = settings.get("sharpness", 1.0)
-        if sharpness != 1.0:
-            img = self.adjust_sharpness(img, sharpness)
-
-        # Filters
-        if settings.get("blur", False):
-            img = self.apply_blur(img)
-        if settings.get("sharpen", False):
-            img = self.apply_sharpen(img)
-        if settings.get("edge_enhance", False):
-            img = self.apply_edge_enhance(img)
-        if settings.get("emboss", False):
-            img = self.apply_emboss(img)
-        if settings.get("contour", False):
-            img = self.apply_contour(img)
-        if settings.get("grayscale", False):
-            img = self.apply_grayscale(img)
-        if settings.get("sepia", False):
-            img = self.apply_sepia(img)
-        if settings.get("vignette", False):
-            img = self.apply_vignette(img)
-        if settings.get("auto_enhance", False):
-            img = self.auto_enhance(img)
-
-        return img
+        return self.apply_steps(img, compile_effects(settings))
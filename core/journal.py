@@ -0,0 +1,145 @@
+"""
+Image Converter Pro — Resumable batch journal.
+Append-only log of finished batch items, so an interrupted batch can
+be resumed without redoing (or renaming) completed work.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class BatchJournal:
+    """Append-only JSON-lines journal of a batch in an output directory.
+
+    The first line identifies the batch settings; every following line
+    records one finished item by its input index and path:
+
+        {"type": "batch", "settings": "<settings_hash>"}
+        {"i": 0, "path": "...", "status": "done", "output": "..."}
+        {"i": 1, "path": "...", "status": "failed", "error": "..."}
+
+    Records are buffered and written with a single fsync every
+    FLUSH_EVERY records or FLUSH_INTERVAL seconds, whichever comes
+    first. A crash loses at most that window, and a torn last line is
+    ignored when reading.
+    """
+
+    FILENAME = ".imageconverter_journal.jsonl"
+    FLUSH_EVERY = 32
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, save_dir, settings_digest, resume=False):
+        """Open the journal of save_dir.
+
+        Args:
+            save_dir: Output directory holding the journal
+            settings_digest: settings_hash() of the batch settings
+            resume: Keep and load an existing journal instead of
+                starting a new one
+
+        Raises:
+            ValueError: If resuming a journal written with other settings
+        """
+        self.path = os.path.join(save_dir, self.FILENAME)
+        self.settings_digest = settings_digest
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._done = {}
+
+        if resume and os.path.exists(self.path):
+            digest, self._done = self._read()
+            if digest != settings_digest:
+                raise ValueError(
+                    "Cannot resume: the journal was written with different settings"
+                )
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._buffer.append({"type": "batch", "settings": settings_digest})
+            self.flush()
+
+    def _read(self):
+        """Read the settings digest and completed items of the journal.
+
+        Returns:
+            tuple: (settings digest or None, {(index, path): output_path})
+        """
+        digest = None
+        done = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn write from a crash
+                if record.get("type") == "batch":
+                    digest = record.get("settings")
+                    continue
+                key = (record.get("i"), record.get("path"))
+                if record.get("status") == "done":
+                    done[key] = record.get("output")
+                else:
+                    done.pop(key, None)
+        return digest, done
+
+    def completed(self, index, path):
+        """Return the output of an item finished in an earlier run.
+
+        Args:
+            index: Zero-based input index
+            path: Input file path
+
+        Returns:
+            str or None: Output path if the item was completed and its
+            output still exists
+        """
+        output = self._done.get((index, path))
+        if output and os.path.exists(output):
+            return output
+        return None
+
+    def record(self, index, path, output_path=None, error=None):
+        """Journal a finished item (flushed in batches).
+
+        Args:
+            index: Zero-based input index
+            path: Input file path
+            output_path: Saved file path (success)
+            error: Error message (failure)
+        """
+        if error is None:
+            entry = {"i": index, "path": path, "status": "done", "output": output_path}
+        else:
+            entry = {"i": index, "path": path, "status": "failed", "error": error}
+
+        with self._lock:
+            self._buffer.append(entry)
+            due = (len(self._buffer) >= self.FLUSH_EVERY
+                   or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records and fsync the journal."""
+        with self._lock:
+            if not self._buffer or self._file.closed:
+                return
+            self._file.write("".join(
+                json.dumps(entry, separators=(",", ":")) + "\n" for entry in self._buffer
+            ))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._buffer.clear()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush and close the journal."""
+        self.flush()
+        with self._lock:
+            self._file.close()
+
+    def __len__(self):
+        return len(self._done)
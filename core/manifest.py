@@ -0,0 +1,208 @@
+"""
+Image Converter Pro — Incremental batch manifest.
+Remembers which inputs produced which outputs with which settings,
+so unchanged images can be skipped on the next run.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+
+def settings_hash(settings):
+    """Hash a settings dict canonically (key order independent).
+
+    Args:
+        settings: Processing settings (dict)
+
+    Returns:
+        str: Hex digest
+    """
+    canonical = json.dumps(settings, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def content_hash(path, chunk_size=1024 * 1024):
+    """Hash file contents (BLAKE2b).
+
+    Args:
+        path: File path
+        chunk_size: Read size in bytes
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BatchManifest:
+    """On-disk manifest of a batch output directory.
+
+    Maps each input path to the key it was processed with (size, mtime,
+    optional content hash, settings hash) and the output it produced
+    (path, size, mtime). An input is unchanged when its key matches and
+    its output is still on disk untouched.
+
+    With use_content_hash, an input whose size/mtime changed but whose
+    content did not (e.g. a re-copied file) is still recognised as
+    unchanged.
+    """
+
+    FILENAME = ".imageconverter_manifest.json"
+    VERSION = 1
+
+    def __init__(self, save_dir, use_content_hash=False):
+        """Create BatchManifest and load the existing manifest, if any.
+
+        Args:
+            save_dir: Output directory holding the manifest
+            use_content_hash: Also store and compare content hashes
+        """
+        self.path = os.path.join(save_dir, self.FILENAME)
+        self.use_content_hash = use_content_hash
+        self._lock = threading.Lock()
+        self._entries = self._read()
+        self._dirty = False
+
+    def _read(self):
+        """Read manifest entries (empty if missing or unreadable)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        return data.get("entries", {})
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    def lookup(self, input_path, settings_digest):
+        """Check whether an input can be skipped.
+
+        Args:
+            input_path: Input file path
+            settings_digest: settings_hash() of the batch settings
+
+        Returns:
+            tuple: (output_path or None, previous output_path or None).
+            The first is set when the input is unchanged and can be
+            skipped; the second when it must be reprocessed but has an
+            earlier output that should be overwritten (the list of all
+            its outputs for a fan-out batch).
+        """
+        output, previous, expected_hash = self.check(input_path, settings_digest)
+        if expected_hash:
+            try:
+                if content_hash(input_path) == expected_hash:
+                    return output, None
+            except OSError:
+                pass
+            return None, previous
+        return output, previous
+
+    def check(self, input_path, settings_digest):
+        """Like lookup(), but without reading the input's contents.
+
+        Batch runs use this on the submitting thread and leave the
+        content comparison to the worker.
+
+        Args:
+            input_path: Input file path
+            settings_digest: settings_hash() of the batch settings
+
+        Returns:
+            tuple: (output_path or None, previous output_path or None,
+            expected hash or None). When the expected hash is set, only
+            the contents can tell: the input is unchanged (its output is
+            the first of previous) if content_hash() of it matches, and
+            must be reprocessed over previous otherwise.
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(input_path))
+        if entry is None:
+            return None, None, None
+
+        output = entry.get("output")
+        previous = entry.get("outputs") or output
+        try:
+            out_stat = os.stat(output)
+            in_stat = os.stat(input_path)
+        except (OSError, TypeError):
+            return None, None, None
+
+        if (out_stat.st_size != entry.get("output_size")
+                or out_stat.st_mtime_ns != entry.get("output_mtime_ns")):
+            return None, None, None  # Output modified, regenerate under a new name
+
+        if entry.get("settings") != settings_digest:
+            return None, previous, None
+
+        if in_stat.st_size == entry.get("size") and in_stat.st_mtime_ns == entry.get("mtime_ns"):
+            return output, None, None
+
+        if self.use_content_hash and entry.get("hash") and in_stat.st_size == entry.get("size"):
+            return None, previous, entry["hash"]
+
+        return None, previous, None
+
+    def record(self, input_path, input_stat, settings_digest, output_path, outputs=None,
+               input_hash=None):
+        """Record a successfully processed input.
+
+        Args:
+            input_path: Input file path
+            input_stat: os.stat() of the input taken before processing
+            settings_digest: settings_hash() of the batch settings
+            output_path: Written output path
+            outputs: All written outputs of a fan-out batch (output_path
+                is the first; only it is checked for modifications)
+            input_hash: content_hash() of the input, computed by the worker
+                that processed it; hashed here when None
+        """
+        try:
+            out_stat = os.stat(output_path)
+        except OSError:
+            return
+
+        entry = {
+            "size": input_stat.st_size,
+            "mtime_ns": input_stat.st_mtime_ns,
+            "settings": settings_digest,
+            "output": os.path.abspath(output_path),
+            "output_size": out_stat.st_size,
+            "output_mtime_ns": out_stat.st_mtime_ns,
+        }
+        if outputs:
+            entry["outputs"] = [os.path.abspath(path) for path in outputs]
+        if self.use_content_hash:
+            try:
+                entry["hash"] = input_hash or content_hash(input_path)
+            except OSError:
+                pass
+
+        with self._lock:
+            self._entries[self._key(input_path)] = entry
+            self._dirty = True
+
+    def save(self):
+        """Write the manifest atomically (only if it changed)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": self.VERSION, "entries": self._entries}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,574 @@
+"""
+Image Converter Pro — Execution plan compiler.
+Turns a settings dict into an ordered, simplified list of pipeline steps.
+"""
+
+import math
+from dataclasses import dataclass
+
+from PIL import Image
+
+from core.converter import ImageConverter
+from core.effects import EffectsEngine
+from core.manifest import settings_hash
+from core.watermark import WatermarkEngine
+from utils.cache import LRUCache
+from utils.validators import (
+    validate_dimensions, validate_angle, validate_effect_value, validate_format,
+    ValidationError,
+)
+
+
+# Estimated cost per pixel and channel in ns (measured on a 3 MP RGB frame)
+OP_COSTS = {
+    "resize": 9.0,
+    "transpose": 1.0,
+    "rotate": 44.0,
+    "color": 0.7,        # Brightness/contrast LUT; saturation adds SATURATION_COST
+    "sharpness": 10.0,
+    "blur": 19.0,
+    "sharpen": 13.0,
+    "edge_enhance": 16.0,
+    "emboss": 12.0,
+    "contour": 15.0,
+    "grayscale": 0.4,
+    "sepia": 2.0,
+    "gray_sepia": 2.0,
+    "vignette": 2.5,
+    "auto_enhance": 13.0,
+    "watermark": 3.5,
+    "convert": 0.7,
+}
+SATURATION_COST = 1.8
+
+# Typical area of a watermark stamp (pixels): only that region is blended
+STAMP_PIXELS = 10_000
+
+# Profiler stage of every operation
+OP_STAGES = {"resize": "resize", "transpose": "rotate", "rotate": "rotate",
+             "watermark": "watermark", "convert": "convert"}
+
+# Operations run by EffectsEngine.apply_steps()
+EFFECT_OPS = (
+    "color", "sharpness", "blur", "sharpen", "edge_enhance", "emboss", "contour",
+    "grayscale", "sepia", "gray_sepia", "vignette", "auto_enhance",
+)
+
+# Settings read by the effect steps
+EFFECT_KEYS = (
+    "brightness", "contrast", "saturation", "sharpness", "blur", "sharpen",
+    "edge_enhance", "emboss", "contour", "grayscale", "sepia", "vignette", "auto_enhance",
+)
+
+# Rotations that are exact transposes (Image.rotate angles are counter-clockwise)
+TRANSPOSES = {90: "ROTATE_90", 180: "ROTATE_180", 270: "ROTATE_270"}
+
+# Ops that give bit-identical results before or after a 90/180/270
+# transpose: symmetric 3x3 kernels and position-independent (or
+# center-symmetric) point ops. EMBOSS is directional; BLUR's box passes
+# round differently once the axes are swapped.
+TRANSPOSE_COMMUTES = {
+    "color", "sharpness", "sharpen", "edge_enhance", "contour",
+    "grayscale", "sepia", "gray_sepia", "vignette", "auto_enhance",
+}
+
+# Ops that can turn a one-level rounding difference into a visible one
+AMPLIFYING_OPS = {"sharpen", "edge_enhance", "emboss", "contour", "auto_enhance",
+                  "sepia", "gray_sepia"}
+
+# Frame the plans are costed on when choosing between orders
+REFERENCE_SIZE = (4000, 3000)
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """One operation of an execution plan.
+
+    Attributes:
+        op: Operation name (see OP_COSTS)
+        params: Operation parameters (hashable)
+    """
+    op: str
+    params: tuple = ()
+
+    @property
+    def stage(self):
+        """Profiler stage the step is timed under."""
+        return OP_STAGES.get(self.op, "effects")
+
+    def label(self):
+        """Short human-readable description."""
+        p = self.params
+        if self.op == "resize":
+            return f"resize {p[0]}x{p[1]}" + (" (fit)" if p[2] else "")
+        if self.op == "transpose":
+            return f"transpose {p[0]}"
+        if self.op == "rotate":
+            return f"rotate {p[0]:g}°"
+        if self.op == "color":
+            names = ("brightness", "contrast", "saturation")
+            return "color " + " ".join(f"{n}={v:g}" for n, v in zip(names, p) if v != 1.0)
+        if self.op == "sharpness":
+            return f"sharpness {p[0]:g}"
+        if self.op == "watermark":
+            return f"watermark {p[0]!r} {p[1]}"
+        if self.op == "convert":
+            return f"convert for {p[0]}"
+        if self.op == "gray_sepia":
+            return "grayscale+sepia"
+        return self.op.replace("_", " ")
+
+    def out_size(self, size):
+        """Frame size after the step."""
+        w, h = size
+        if self.op == "resize":
+            tw, th, maintain = self.params
+            if not maintain:
+                return tw, th
+            scale = min(1.0, tw / w, th / h)
+            return max(1, round(w * scale)), max(1, round(h * scale))
+        if self.op == "transpose" and self.params[0] != "ROTATE_180":
+            return h, w
+        if self.op == "rotate":
+            angle = math.radians(self.params[0])
+            cos, sin = abs(math.cos(angle)), abs(math.sin(angle))
+            return math.ceil(w * cos + h * sin), math.ceil(w * sin + h * cos)
+        return size
+
+    def out_mode(self, mode, native=True):
+        """Pixel mode after the step (mirrors the engines' conversions).
+
+        Args:
+            mode: Pixel mode before the step
+            native: Model the mode-aware engines; False models a naive
+                pipeline that composites watermarks in RGBA
+        """
+        if self.op == "grayscale":
+            return "L"
+        if self.op == "gray_sepia":
+            return "RGB"
+        if self.op == "sepia":
+            return "RGBA" if mode in ("RGBA", "LA") else "RGB"
+        if self.op == "watermark":
+            if native and mode in WatermarkEngine.NATIVE_MODES:
+                return mode
+            return "RGB" if mode == "RGB" else "RGBA"
+        if self.op == "convert":
+            return ImageConverter.target_mode(mode, self.params[0])
+        return mode
+
+    def conversions(self, mode, native=True):
+        """Full-frame pixel-mode conversions the step makes on a mode.
+
+        Args:
+            mode: Pixel mode before the step
+            native: As for out_mode()
+        """
+        if self.op == "watermark":
+            if native and mode in WatermarkEngine.NATIVE_MODES:
+                return 0
+            return 2 if mode == "RGB" else int(mode != "RGBA")  # RGB -> RGBA -> RGB
+        if self.op == "grayscale" and mode == "L":
+            return 0
+        return int(self.out_mode(mode, native) != mode)
+
+    def cost(self, size, mode):
+        """Estimated cost in ns for a frame of the given size and mode."""
+        channels = max(Image.getmodebands(mode), Image.getmodebands(self.out_mode(mode)))
+        weight = OP_COSTS[self.op]
+        if self.op == "color" and self.params[2] != 1.0 and mode != "L":
+            weight += SATURATION_COST
+        if self.op in ("sepia", "gray_sepia") and mode != "RGB":
+            weight += OP_COSTS["convert"]  # Converted to RGB before the matrix
+        pixels = size[0] * size[1]
+        if self.op == "rotate":
+            out = self.out_size(size)
+            pixels = out[0] * out[1]
+        if self.op == "watermark":
+            cost = weight * min(pixels, STAMP_PIXELS) * channels
+            if mode not in WatermarkEngine.NATIVE_MODES:
+                cost += OP_COSTS["convert"] * pixels * channels  # Converted to RGBA
+            return cost
+        return weight * pixels * channels
+
+
+class ExecutionPlan:
+    """Compiled, immutable processing pipeline for one settings dict.
+
+    Attributes:
+        steps: Tuple of PlanStep in execution order
+        notes: Rewrites the compiler applied (for describe())
+        decode_size: (width, height) the image may be decoded at, or None
+        maintain_ratio: Whether the resize keeps aspect ratio
+        format: Output format (None for fan-out plans)
+    """
+
+    def __init__(self, steps, notes=(), decode_size=None, maintain_ratio=True, fmt=None):
+        self.steps = tuple(steps)
+        self.notes = tuple(notes)
+        self.decode_size = decode_size
+        self.maintain_ratio = maintain_ratio
+        self.format = fmt
+
+    @property
+    def rotates(self):
+        """Whether the plan rotates the frame."""
+        return any(step.op in ("transpose", "rotate") for step in self.steps)
+
+    def cost(self, size=REFERENCE_SIZE, mode="RGB"):
+        """Estimated total cost in ns."""
+        return _total_cost(self.steps, size, mode)
+
+    def conversions(self, mode="RGB"):
+        """Count full-frame mode conversions for a source of the given mode.
+
+        The mode is tracked through every step, so an image is converted
+        only where a step or the output format requires it.
+
+        Returns:
+            tuple: (conversions made, conversions avoided compared with a
+            naive pipeline that composites watermarks in RGBA)
+        """
+        made = naive = 0
+        native_mode = naive_mode = mode
+        for step in self.steps:
+            made += step.conversions(native_mode)
+            naive += step.conversions(naive_mode, native=False)
+            native_mode = step.out_mode(native_mode)
+            naive_mode = step.out_mode(naive_mode, native=False)
+        return made, naive - made
+
+    def run(self, img, effects=None, watermark=None, timer=None, owned=False):
+        """Execute the plan on a decoded image.
+
+        Consecutive effect steps are handed to EffectsEngine.apply_steps()
+        together, so large frames are still processed in tiles. Pipeline
+        stages without a step are still reported (as zero) to the timer,
+        so every image profiles the same stages.
+
+        Args:
+            img: PIL Image
+            effects: EffectsEngine (a default one when None)
+            watermark: WatermarkEngine (a default one when None)
+            timer: Optional StageTimer
+            owned: img belongs to this run (e.g. freshly decoded) and may
+                be modified in place
+
+        Returns:
+            PIL Image: Processed image
+        """
+        from core.profiler import StageTimer
+
+        effects = effects or EffectsEngine()
+        watermark = watermark or WatermarkEngine()
+        timer = timer or StageTimer(enabled=False)
+
+        # Fan-out plans leave resize and convert to the variants
+        stages = ("rotate", "effects", "watermark")
+        if self.format is not None:
+            stages = ("resize",) + stages + ("convert",)
+        for name in stages:
+            with timer.stage(name):
+                pass
+
+        original = img
+        steps = self.steps
+        i = 0
+        while i < len(steps):
+            step = steps[i]
+            if step.op in EFFECT_OPS:
+                end = i
+                while end < len(steps) and steps[end].op in EFFECT_OPS:
+                    end += 1
+                with timer.stage("effects"):
+                    img = effects.apply_steps(img, steps[i:end])
+                i = end
+                continue
+
+            with timer.stage(step.stage):
+                p = step.params
+                if step.op == "resize":
+                    img = ImageConverter.resize(img, p[0], p[1], maintain_ratio=p[2])
+                elif step.op == "transpose":
+                    img = img.transpose(getattr(Image.Transpose, p[0]))
+                elif step.op == "rotate":
+                    img = ImageConverter.rotate(img, p[0])
+                elif step.op == "watermark":
+                    # Intermediates created by earlier steps are ours to stamp
+                    in_place = owned or img is not original
+                    img = watermark.add_text_watermark(img, text=p[0], position=p[1],
+                                                       opacity=p[2], in_place=in_place)
+                elif step.op == "convert":
+                    img = ImageConverter.convert_format(img, p[0])
+            i += 1
+        return img
+
+    def describe(self, size=REFERENCE_SIZE, mode="RGB"):
+        """Printable plan with the mode and estimated cost of every step.
+
+        Args:
+            size: (width, height) of the decoded frame to cost
+            mode: Its pixel mode
+
+        Returns:
+            str: Multi-line description
+        """
+        lines = [f"Execution plan ({size[0]}x{size[1]} {mode}):"]
+        start_mode = mode
+        total = 0.0
+        for n, step in enumerate(self.steps, 1):
+            cost = step.cost(size, mode)
+            total += cost
+            out_mode = step.out_mode(mode)
+            modes = mode if out_mode == mode else f"{mode}->{out_mode}"
+            lines.append(f"  {n:>2}. {step.label():<40} {modes:<10} {cost / 1e6:9.1f} ms")
+            size, mode = step.out_size(size), out_mode
+        if not self.steps:
+            lines.append("  (no operations)")
+        lines.append(f"  Estimated total: {total / 1e6:.1f} ms")
+        made, avoided = self.conversions(start_mode)
+        lines.append(f"  Mode conversions: {made} ({avoided} avoided)")
+        if self.notes:
+            lines.append("Rewrites:")
+            lines.extend(f"  - {note}" for note in self.notes)
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.describe()
+
+
+# Compiled plans by settings hash
+_plans = LRUCache(max_entries=64)
+
+
+def compile_plan(settings):
+    """Compile (or fetch the cached) execution plan for settings.
+
+    Args:
+        settings: Processing settings (dict)
+
+    Returns:
+        ExecutionPlan: Shared, read-only plan
+
+    Raises:
+        ValidationError: If an effect value, angle or format is invalid
+    """
+    return _plans.get_or_create(settings_hash(settings), lambda: _compile(settings))
+
+
+def compile_effects(settings):
+    """Compile only the effect settings (no resize, rotate or format).
+
+    Returns:
+        tuple: PlanStep for EffectsEngine.apply_steps()
+
+    Raises:
+        ValidationError: If an effect value is invalid
+    """
+    effects = {key: settings[key] for key in EFFECT_KEYS if key in settings}
+    return _plans.get_or_create(("effects", settings_hash(effects)),
+                                lambda: _compile(effects, effects_only=True).steps)
+
+
+def _canonical_steps(settings, effects_only=False):
+    """Settings in the pipeline's reference order, with no-ops left out.
+
+    Args:
+        settings: Processing settings (dict)
+        effects_only: Leave out the resize and format conversion
+
+    Returns:
+        tuple: (steps, notes, decode size, maintain_ratio, format)
+    """
+    steps, notes = [], []
+    # Variants resize and convert each output themselves
+    fan_out = effects_only or bool(settings.get("variants"))
+    maintain_ratio = settings.get("maintain_ratio", True)
+
+    decode_size = None
+    width, height = settings.get("width"), settings.get("height")
+    if width and height and not fan_out:
+        try:
+            decode_size = validate_dimensions(width, height)
+            steps.append(PlanStep("resize", decode_size + (bool(maintain_ratio),)))
+        except ValidationError:
+            pass  # Invalid dimensions — skip resize
+
+    try:
+        angle = float(settings.get("angle") or 0)
+    except (ValueError, TypeError):
+        angle = 0.0  # Invalid angle — skip rotate
+    if angle:
+        angle = validate_angle(angle)
+        turns = angle % 360
+        if turns == 0:
+            notes.append(f"rotate {angle:g}° dropped (full turn)")
+        elif turns in TRANSPOSES:
+            steps.append(PlanStep("transpose", (TRANSPOSES[turns],)))
+            notes.append(f"rotate {angle:g}° -> exact transpose")
+        else:
+            steps.append(PlanStep("rotate", (angle,)))
+
+    color = (
+        validate_effect_value(settings.get("brightness", 1.0), "Brightness"),
+        validate_effect_value(settings.get("contrast", 1.0), "Contrast"),
+        validate_effect_value(settings.get("saturation", 1.0), "Saturation"),
+    )
+    if color != (1.0, 1.0, 1.0):
+        steps.append(PlanStep("color", color))
+
+    sharpness = validate_effect_value(settings.get("sharpness", 1.0), "Sharpness")
+    if sharpness != 1.0:
+        steps.append(PlanStep("sharpness", (sharpness,)))
+
+    for name in ("blur", "sharpen", "edge_enhance", "emboss", "contour",
+                 "grayscale", "sepia", "vignette", "auto_enhance"):
+        if settings.get(name, False):
+            steps.append(PlanStep(name))
+
+    if settings.get("watermark", False) and settings.get("watermark_text"):
+        steps.append(PlanStep("watermark", (
+            settings["watermark_text"],
+            settings.get("watermark_position", "bottom-right"),
+            settings.get("watermark_opacity", 0.5),
+        )))
+
+    fmt = None
+    if not fan_out:
+        fmt = validate_format(str(settings.get("format", "JPEG")))
+        steps.append(PlanStep("convert", (fmt,)))
+
+    return steps, notes, decode_size, maintain_ratio, fmt
+
+
+def _compile(settings, effects_only=False):
+    """Compile settings into the cheapest equivalent ExecutionPlan."""
+    steps, notes, decode_size, maintain_ratio, fmt = _canonical_steps(settings, effects_only)
+
+    # Folding grayscale+sepia first, or hoisting grayscale first, can
+    # each block the other; keep whichever order the cost model prefers.
+    candidates = []
+    for fold_first in (True, False):
+        candidate_notes = list(notes)
+        candidate = list(steps)
+        if fold_first:
+            candidate = _fold(candidate, candidate_notes)
+        candidate = _reorder(candidate, candidate_notes)
+        candidate = _fold(candidate, candidate_notes)
+        candidate = _drop_mode_noops(candidate, candidate_notes)
+        candidates.append((_total_cost(candidate), candidate, candidate_notes))
+
+    _, best, best_notes = min(candidates, key=lambda c: c[0])
+    return ExecutionPlan(best, best_notes, decode_size, maintain_ratio, fmt)
+
+
+def _total_cost(steps, size=REFERENCE_SIZE, mode="RGB"):
+    """Estimated cost of running steps on a frame."""
+    total = 0.0
+    for step in steps:
+        total += step.cost(size, mode)
+        size, mode = step.out_size(size), step.out_mode(mode)
+    return total
+
+
+def _commutes(first, second, following=()):
+    """Whether two adjacent steps give the same result in either order.
+
+    Transposes move across ops they commute with bit-exactly. Grayscale
+    moves across ops that cannot clip, which preserves luma up to one
+    level of rounding, and only when no later step amplifies that
+    difference (see AMPLIFYING_OPS).
+
+    Args:
+        first: Earlier step
+        second: Later step
+        following: Steps run after the pair
+    """
+    ops = {first.op, second.op}
+    if "transpose" in ops:
+        other = second if first.op == "transpose" else first
+        return other.op in TRANSPOSE_COMMUTES
+    if "grayscale" in ops:
+        other = second if first.op == "grayscale" else first
+        if other.op not in ("color", "sharpness", "vignette"):
+            return False
+        if not all(value <= 1.0 for value in other.params):
+            return False
+        return not any(_amplifies(step) for step in following)
+    return False
+
+
+def _amplifies(step):
+    """Whether a step can magnify small differences in its input."""
+    if step.op in ("color", "sharpness"):
+        return any(value > 1.0 for value in step.params)
+    return step.op in AMPLIFYING_OPS
+
+
+def _reorder(steps, notes):
+    """Move steps across commuting neighbours while the estimated cost drops.
+
+    Each step is tried at every position it can reach through a chain of
+    commuting swaps, so moves that only pay off several places away
+    (a transpose sinking past a grayscale conversion) are found too.
+    """
+    steps = list(steps)
+    cost = _total_cost(steps)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(steps)):
+            best = None
+            for direction in (-1, 1):
+                candidate, j = list(steps), i
+                while 0 <= j + direction < len(candidate):
+                    k = j + direction
+                    a, b = min(j, k), max(j, k)
+                    if not _commutes(candidate[a], candidate[b], candidate[b + 1:]):
+                        break
+                    candidate[j], candidate[k] = candidate[k], candidate[j]
+                    j = k
+                    candidate_cost = _total_cost(candidate)
+                    if candidate_cost < cost and (best is None or candidate_cost < best[0]):
+                        best = (candidate_cost, list(candidate), j, direction)
+            if best:
+                cost, moved, j, direction = best
+                if direction < 0:
+                    notes.append(f"{moved[j].label()} moved before {moved[j + 1].label()}")
+                else:
+                    notes.append(f"{moved[j].label()} moved after {moved[j - 1].label()}")
+                steps, improved = moved, True
+                break
+    return steps
+
+
+def _fold(steps, notes):
+    """Merge adjacent grayscale + sepia into one matrix conversion.
+
+    The fused matrix rounds once instead of twice, so it is only used
+    when no later step amplifies a one-level difference.
+    """
+    folded = []
+    for i, step in enumerate(steps):
+        if (step.op == "sepia" and folded and folded[-1].op == "grayscale"
+                and not any(_amplifies(later) for later in steps[i + 1:])):
+            folded[-1] = PlanStep("gray_sepia")
+            notes.append("grayscale + sepia folded into one RGB matrix pass")
+            continue
+        folded.append(step)
+    return folded
+
+
+def _drop_mode_noops(steps, notes, mode="RGB"):
+    """Drop work that cannot change a grayscale frame (saturation)."""
+    kept = []
+    for step in steps:
+        if step.op == "color" and mode == "L" and step.params[2] != 1.0:
+            notes.append("saturation dropped (frame is grayscale)")
+            step = PlanStep("color", step.params[:2] + (1.0,))
+            if step.params == (1.0, 1.0, 1.0):
+                mode = step.out_mode(mode)
+                continue
+        kept.append(step)
+        mode = step.out_mode(mode)
+    return kept
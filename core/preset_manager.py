@@ -24,6 +24,11 @@ class PresetManager:
         "maintain_ratio": True,
         "angle": 0,
         "quality": 85,
+        "effort": "balanced",
+        "lossless": False,
+        "max_bytes": 0,
+        "fit_downscale": False,
+        "variants": [],
         "brightness": 1.0,
         "contrast": 1.0,
         "saturation": 1.0,
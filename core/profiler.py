@@ -0,0 +1,198 @@
+"""
+Image Converter Pro — Per-stage latency profiler.
+Wall/CPU timers for batch pipeline stages with percentile reports.
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from core.stats import percentile
+
+
+class StageTimer:
+    """Collects wall and CPU time per pipeline stage for one image.
+
+    Disabled timers are no-ops, so the pipeline can always use them.
+
+    Attributes:
+        stages: {stage_name: (wall_seconds, cpu_seconds)}
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block of code as the given stage."""
+        if not self.enabled:
+            yield
+            return
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = self.stages.get(name, (0.0, 0.0))  # Repeated stages add up
+            self.stages[name] = (
+                wall + time.perf_counter() - wall_start,
+                cpu + time.thread_time() - cpu_start,
+            )
+
+
+class _Samples:
+    """Bounded reservoir of samples with exact count and sum."""
+
+    def __init__(self, max_samples):
+        self.max_samples = max_samples
+        self.values = []
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if len(self.values) < self.max_samples:
+            self.values.append(value)
+        else:
+            # Reservoir sampling keeps a uniform sample of all values
+            j = random.randrange(self.count)
+            if j < self.max_samples:
+                self.values[j] = value
+
+    def percentile(self, pct):
+        """Nearest-rank percentile of the sampled values."""
+        if not self.values:
+            return 0.0
+        return percentile(sorted(self.values), pct / 100)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class StageProfiler:
+    """Thread-safe aggregator of per-stage timings across a batch.
+
+    Memory is bounded: each series keeps at most MAX_SAMPLES values
+    (uniform reservoir), counts and totals stay exact.
+    """
+
+    STAGES = (
+        "load", "resize", "rotate", "effects",
+        "watermark", "convert", "save", "filename",
+    )
+    MAX_SAMPLES = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        """Reset all samples and start the batch clock."""
+        with self._lock:
+            self._wall = defaultdict(lambda: _Samples(self.MAX_SAMPLES))
+            self._cpu = defaultdict(lambda: _Samples(self.MAX_SAMPLES))
+            self._formats = defaultdict(lambda: _Samples(self.MAX_SAMPLES))
+            self._format_pixels = defaultdict(float)
+            self._megapixels = 0.0
+            self.start_time = time.time()
+            self.end_time = 0
+
+    def finish(self):
+        """Stop the batch clock."""
+        self.end_time = time.time()
+
+    @property
+    def elapsed(self):
+        """Elapsed batch time in seconds."""
+        end = self.end_time if self.end_time else time.time()
+        return end - self.start_time
+
+    def record(self, stages, fmt=None, megapixels=0.0):
+        """Record the stage timings of one processed image.
+
+        Args:
+            stages: {stage_name: (wall_seconds, cpu_seconds)}
+            fmt: Input image format (for the per-format breakdown)
+            megapixels: Input image size in megapixels
+        """
+        image_wall = sum(wall for wall, _ in stages.values())
+        fmt = fmt or "UNKNOWN"
+
+        with self._lock:
+            for name, (wall, cpu) in stages.items():
+                self._wall[name].add(wall)
+                self._cpu[name].add(cpu)
+            self._formats[fmt].add(image_wall)
+            self._format_pixels[fmt] += megapixels
+            self._megapixels += megapixels
+
+    def report(self):
+        """Generate the latency report.
+
+        Returns:
+            dict: {
+                "stages": {name: {count, p50, p95, p99, mean, cpu_mean}},
+                "formats": {fmt: {count, p50, p95, p99, megapixels_per_s}},
+                "megapixels": float,
+                "megapixels_per_s": float,
+            }
+            Times are in milliseconds.
+        """
+        with self._lock:
+            order = list(self.STAGES) + sorted(set(self._wall) - set(self.STAGES))
+            stages = {}
+            for name in order:
+                if name not in self._wall:
+                    continue
+                wall = self._wall[name]
+                stages[name] = {
+                    "count": wall.count,
+                    "p50": wall.percentile(50) * 1000,
+                    "p95": wall.percentile(95) * 1000,
+                    "p99": wall.percentile(99) * 1000,
+                    "mean": wall.mean * 1000,
+                    "cpu_mean": self._cpu[name].mean * 1000,
+                }
+
+            formats = {}
+            for fmt, samples in sorted(self._formats.items()):
+                formats[fmt] = {
+                    "count": samples.count,
+                    "p50": samples.percentile(50) * 1000,
+                    "p95": samples.percentile(95) * 1000,
+                    "p99": samples.percentile(99) * 1000,
+                    "megapixels_per_s": (
+                        self._format_pixels[fmt] / samples.total if samples.total else 0.0
+                    ),
+                }
+
+            elapsed = self.elapsed
+            return {
+                "stages": stages,
+                "formats": formats,
+                "megapixels": self._megapixels,
+                "megapixels_per_s": self._megapixels / elapsed if elapsed else 0.0,
+            }
+
+    def report_text(self):
+        """Generate a human-readable latency table."""
+        report = self.report()
+        lines = [f"{'stage':<10} {'p50':>9} {'p95':>9} {'p99':>9} {'cpu':>9}"]
+        for name, s in report["stages"].items():
+            lines.append(
+                f"{name:<10} {s['p50']:>7.1f}ms {s['p95']:>7.1f}ms "
+                f"{s['p99']:>7.1f}ms {s['cpu_mean']:>7.1f}ms"
+            )
+        for fmt, s in report["formats"].items():
+            lines.append(
+                f"[{fmt}] {s['count']} image(s), p50 {s['p50']:.1f}ms, "
+                f"{s['megapixels_per_s']:.1f} MP/s per worker"
+            )
+        lines.append(f"⚡ Throughput: {report['megapixels_per_s']:.1f} MP/s")
+        return "\n".join(lines)
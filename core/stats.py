@@ -1,46 +1,82 @@
 """
 Image Converter Pro — Processing statistics.
-Tracks batch results: timing, file sizes, compression ratio.
+Tracks batch results: timing, file sizes, compression ratio, live throughput.
 """
 
+import math
 import os
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 
 
 @dataclass
 class ProcessingStats:
     """Tracks and reports batch processing statistics.
 
+    Thread-safe: record_* and update_queue may be called from any thread
+    while another thread (e.g. the GUI) reads the live properties.
+
     Attributes:
         total: Total number of images
         success: Successfully processed count
         failed: Failed count
+        skipped: Inputs skipped as unchanged (incremental) or already done (resume)
         start_time: Start timestamp
         end_time: End timestamp
         total_input_size: Total input file size (bytes)
         total_output_size: Total output file size (bytes)
+        conversions_avoided: Pixel-mode conversions saved by mode tracking
         errors: Error messages list
+        profile: Per-stage latency report (StageProfiler.report()), if any
+        in_flight: Submitted tasks that have not finished yet
+        queue_depth: In-flight tasks still waiting for a free worker
     """
     total: int = 0
     success: int = 0
     failed: int = 0
+    skipped: int = 0
     start_time: float = 0
     end_time: float = 0
     total_input_size: int = 0
     total_output_size: int = 0
+    conversions_avoided: int = 0
     errors: List[str] = field(default_factory=list)
+    profile: Optional[dict] = None
+    in_flight: int = 0
+    queue_depth: int = 0
+
+    # Sliding window (seconds) used for live throughput
+    THROUGHPUT_WINDOW = 10.0
+
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+    _window: deque = field(default_factory=deque, repr=False, compare=False)
 
     def start(self, total):
-        """Start tracking statistics."""
-        self.total = total
-        self.start_time = time.time()
-        self.success = 0
-        self.failed = 0
-        self.errors = []
-        self.total_input_size = 0
-        self.total_output_size = 0
+        """Start tracking statistics.
+
+        Args:
+            total: Number of images, or None if unknown (streamed input)
+        """
+        with self._lock:
+            self.total = total or 0
+            self.start_time = time.time()
+            self.end_time = 0
+            self.success = 0
+            self.failed = 0
+            self.skipped = 0
+            self.errors = []
+            self.total_input_size = 0
+            self.total_output_size = 0
+            self.conversions_avoided = 0
+            self.profile = None
+            self.in_flight = 0
+            self.queue_depth = 0
+            self._window.clear()
 
     def finish(self):
         """Finish tracking."""
@@ -74,19 +110,116 @@ class ProcessingStats:
             return 0
         return (1 - self.total_output_size / self.total_input_size) * 100
 
+    @property
+    def processed(self):
+        """Number of finished images (success + failed + skipped)."""
+        return self.success + self.failed + self.skipped
+
+    @property
+    def eta(self):
+        """Estimated remaining time in seconds (None if total is unknown)."""
+        if not self.total:
+            return None
+        remaining = self.total - self.processed
+        if remaining <= 0:
+            return 0
+        speed = self.window_speed or self.speed
+        if speed == 0:
+            return None
+        return remaining / speed
+
+    def _trim_window(self, now):
+        """Drop samples older than THROUGHPUT_WINDOW (caller holds the lock)."""
+        while self._window and now - self._window[0][0] > self.THROUGHPUT_WINDOW:
+            self._window.popleft()
+
+    def _window_rates(self):
+        """Return (images/s, bytes in/s, bytes out/s) over the window."""
+        with self._lock:
+            now = time.time()
+            self._trim_window(now)
+            if not self._window:
+                return 0, 0, 0
+            span = min(self.THROUGHPUT_WINDOW, max(now - self.start_time, 1e-6))
+            count = len(self._window)
+            bytes_in = sum(sample[1] for sample in self._window)
+            bytes_out = sum(sample[2] for sample in self._window)
+        return count / span, bytes_in / span, bytes_out / span
+
+    @property
+    def window_speed(self):
+        """Recent processing speed (images/second, sliding window)."""
+        return self._window_rates()[0]
+
+    @property
+    def window_mb_in(self):
+        """Recent input throughput (MB/s, sliding window)."""
+        return self._window_rates()[1] / (1024 * 1024)
+
+    @property
+    def window_mb_out(self):
+        """Recent output throughput (MB/s, sliding window)."""
+        return self._window_rates()[2] / (1024 * 1024)
+
+    def record_success(self, bytes_in=0, bytes_out=0, conversions_avoided=0):
+        """Record a successfully processed image.
+
+        Args:
+            bytes_in: Input file size (known from loading)
+            bytes_out: Output file size (known from saving)
+            conversions_avoided: Pixel-mode conversions the execution plan
+                saved on this image
+        """
+        with self._lock:
+            now = time.time()
+            self.success += 1
+            self.total_input_size += bytes_in
+            self.total_output_size += bytes_out
+            self.conversions_avoided += conversions_avoided
+            self._window.append((now, bytes_in, bytes_out))
+            self._trim_window(now)
+
+    def record_failure(self, error):
+        """Record a failed image.
+
+        Args:
+            error: Error message
+        """
+        with self._lock:
+            now = time.time()
+            self.failed += 1
+            self.errors.append(error)
+            self._window.append((now, 0, 0))
+            self._trim_window(now)
+
+    def record_skipped(self):
+        """Record an unchanged input that was not reprocessed."""
+        with self._lock:
+            self.skipped += 1
+
+    def update_queue(self, in_flight, queue_depth):
+        """Update the live in-flight and queue depth counters."""
+        with self._lock:
+            self.in_flight = in_flight
+            self.queue_depth = queue_depth
+
     def add_input_size(self, path):
         """Add input file size to total."""
         try:
-            self.total_input_size += os.path.getsize(path)
+            size = os.path.getsize(path)
         except OSError:
-            pass
+            return
+        with self._lock:
+            self.total_input_size += size
 
     def add_output_size(self, path):
         """Add output file size to total."""
         try:
-            self.total_output_size += os.path.getsize(path)
+            size = os.path.getsize(path)
         except OSError:
-            pass
+            return
+        with self._lock:
+            self.total_output_size += size
 
     def summary(self):
         """Generate detailed results summary.
@@ -94,18 +227,38 @@ class ProcessingStats:
         Returns:
             dict: Detailed report
         """
-        return {
+        summary = {
             "total": self.total,
             "success": self.success,
             "failed": self.failed,
+            "skipped": self.skipped,
             "elapsed": f"{self.elapsed:.1f}s",
             "avg_time": f"{self.avg_time:.2f}s",
             "speed": f"{self.speed:.1f} img/s",
             "input_size": self._format_size(self.total_input_size),
             "output_size": self._format_size(self.total_output_size),
             "compression": f"{self.compression_ratio:.1f}%",
+            "conversions_avoided": self.conversions_avoided,
             "errors": self.errors,
         }
+        if self.profile is not None:
+            summary["profile"] = self.profile
+        return summary
+
+    def live_text(self):
+        """Generate a one-line live progress text."""
+        speed, bytes_in, bytes_out = self._window_rates()
+        mb = 1024 * 1024
+        total = self.total if self.total else "?"
+        text = (
+            f"{self.processed}/{total} | {speed:.1f} img/s | "
+            f"{bytes_in / mb:.1f} MB/s in, {bytes_out / mb:.1f} MB/s out | "
+            f"in flight: {self.in_flight} (queued: {self.queue_depth})"
+        )
+        eta = self.eta
+        if eta is not None:
+            text += f" | ETA: {int(eta)}s"
+        return text
 
     def summary_text(self):
         """Generate human-readable summary text."""
@@ -117,6 +270,10 @@ class ProcessingStats:
             f"💾 Input: {s['input_size']} → Output: {s['output_size']}",
             f"📉 Compression: {s['compression']}",
         ]
+        if self.conversions_avoided:
+            lines.append(f"🎨 Mode conversions avoided: {self.conversions_avoided}")
+        if self.skipped:
+            lines.append(f"⏭️ Unchanged (skipped): {self.skipped}")
         if self.failed:
             lines.append(f"❌ Errors: {self.failed}")
         return "\n".join(lines)
@@ -130,3 +287,20 @@ class ProcessingStats:
             return f"{size_bytes / 1024:.1f} KB"
         else:
             return f"{size_bytes / (1024 * 1024):.2f} MB"
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted, non-empty list.
+
+    Args:
+        ordered: Sorted values
+        fraction: Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        The value at that rank
+    """
+    # Smallest value with at least fraction of the samples at or below it;
+    # rounded first so float noise (0.07 * 100 = 7.000000000000001)
+    # cannot push the rank up
+    rank = math.ceil(round(fraction * len(ordered), 9)) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
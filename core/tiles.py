@@ -0,0 +1,205 @@
+"""
+Image Converter Pro — Tiled effects engine for very large images.
+Runs point ops and neighborhood filters in overlapping tiles.
+"""
+
+import math
+
+from PIL import Image
+
+from config.constants import TILE_MEMORY_CAP
+from core.effects import EffectsEngine
+from core.plan import compile_effects
+
+
+class TileEngine:
+    """Applies EffectsEngine effects tile by tile.
+
+    Each tile is cropped with an overlap equal to the sum of the kernel
+    radii of the neighborhood filters in the chain, processed, trimmed
+    and pasted into a preallocated output image. Results are identical
+    to the full-frame path, but temporaries are bounded by memory_cap
+    instead of scaling with the image: only the source and the output
+    frame are full size.
+
+    Global statistics (the contrast mean) are taken up front from the
+    histogram of the frame the color step sees (the source, or the
+    intermediate summed over tiles when a compiled plan runs grayscale
+    first), so adjustments stay tile-independent.
+    """
+
+    # Neighborhood radius (pixels) of each filter
+    FILTER_RADIUS = {
+        "sharpness": 1,     # ImageEnhance.Sharpness uses the 3x3 SMOOTH kernel
+        "blur": 8,          # GaussianBlur(radius=2): 3 box passes, ~3 * sigma
+        "sharpen": 1,
+        "edge_enhance": 1,
+        "emboss": 1,
+        "contour": 1,
+    }
+
+    # Effects that need global statistics of an intermediate result
+    UNSUPPORTED = ("auto_enhance",)
+
+    # Image copies alive per tile (crop, filter output, alpha/converted copy)
+    TILE_COPIES = 3
+
+    MIN_TILE = 64
+
+    # apply_all() uses apply_vignette()'s default strength
+    VIGNETTE_STRENGTH = 0.5
+
+    def __init__(self, memory_cap=TILE_MEMORY_CAP):
+        """Create TileEngine.
+
+        Args:
+            memory_cap: Byte budget for per-tile temporaries
+        """
+        self.memory_cap = memory_cap
+
+    @staticmethod
+    def supports(img, settings):
+        """Check whether the effects in settings can run tiled on img."""
+        if img.mode not in EffectsEngine.FUSED_MODES:
+            return False
+        return not any(settings.get(name, False) for name in TileEngine.UNSUPPORTED)
+
+    @staticmethod
+    def supports_steps(img, steps):
+        """Check whether compiled effect steps can run tiled on img."""
+        if img.mode not in EffectsEngine.FUSED_MODES:
+            return False
+        return not any(step.op in TileEngine.UNSUPPORTED for step in steps)
+
+    @staticmethod
+    def plan(settings):
+        """List the compiled effect operations in execution order.
+
+        Returns:
+            list: [(name, radius)] with radius 0 for point operations
+        """
+        return [(step.op, TileEngine.FILTER_RADIUS.get(step.op, 0))
+                for step in compile_effects(settings)]
+
+    @staticmethod
+    def margin(settings):
+        """Tile overlap needed for the chain (sum of kernel radii)."""
+        return sum(radius for _, radius in TileEngine.plan(settings))
+
+    def tile_size(self, margin):
+        """Largest square tile side whose working set fits memory_cap."""
+        # 4 bytes/channel-pixel upper bound (RGBA) plus a float32 vignette mask
+        bytes_per_pixel = 4 * self.TILE_COPIES + 4
+        side = int(math.sqrt(self.memory_cap / bytes_per_pixel)) - 2 * margin
+        return max(self.MIN_TILE, side)
+
+    def estimate_peak_bytes(self, size, mode):
+        """Estimate peak memory of a tiled run (source + output + tiles).
+
+        Args:
+            size: (width, height) of the image
+            mode: PIL mode of the image
+        """
+        width, height = size
+        frame = width * height * Image.getmodebands(mode)
+        return 2 * frame + self.memory_cap
+
+    def apply(self, img, settings):
+        """Apply all effects in settings to img, tile by tile.
+
+        Args:
+            img: PIL Image (mode L, RGB or RGBA)
+            settings: Settings dictionary (as for EffectsEngine.apply_all)
+
+        Returns:
+            PIL Image: Processed image
+        """
+        return self.apply_steps(img, compile_effects(settings))
+
+    def apply_steps(self, img, steps):
+        """Apply compiled effect steps to img, tile by tile.
+
+        Args:
+            img: PIL Image (mode L, RGB or RGBA)
+            steps: Sequence of PlanStep (core.plan.compile_effects())
+
+        Returns:
+            PIL Image: Processed image
+        """
+        if not steps:
+            return img
+
+        width, height = img.size
+        radii = [self.FILTER_RADIUS.get(step.op, 0) for step in steps]
+        margin = sum(radii)
+        side = self.tile_size(margin)
+
+        context = {}
+        for step in steps:
+            if step.op == "vignette":
+                context["vignette"] = EffectsEngine._vignette_profiles(width, height)
+
+        for index, step in enumerate(steps):
+            if step.op == "color":
+                # The contrast mean depends on the whole frame: take it from
+                # the histogram of the intermediate the color step sees
+                histogram = None
+                if index:
+                    histogram = self._histogram(img, steps[:index], sum(radii[:index]),
+                                                side, context)
+                context["color"] = EffectsEngine._color_tables(img, *step.params,
+                                                               histogram=histogram)
+
+        output = None
+        for box, _, tile in self._tiles(img, steps, margin, side, context):
+            if output is None:
+                output = Image.new(tile.mode, img.size)
+            output.paste(tile, box)
+        return output
+
+    def _tiles(self, img, steps, margin, side, context):
+        """Run steps over overlapping tiles of img.
+
+        Yields:
+            tuple: (box, ext, processed tile trimmed to box)
+        """
+        width, height = img.size
+        for top in range(0, height, side):
+            for left in range(0, width, side):
+                box = (left, top, min(left + side, width), min(top + side, height))
+                ext = (
+                    max(0, box[0] - margin), max(0, box[1] - margin),
+                    min(width, box[2] + margin), min(height, box[3] + margin),
+                )
+
+                tile = img.crop(ext)
+                for step in steps:
+                    tile = self._apply_step(step, tile, ext, context)
+
+                yield box, ext, tile.crop((
+                    box[0] - ext[0], box[1] - ext[1],
+                    box[2] - ext[0], box[3] - ext[1],
+                ))
+
+    def _histogram(self, img, steps, margin, side, context):
+        """Histogram of the result of steps on img, summed over tiles."""
+        total = None
+        for _, _, tile in self._tiles(img, steps, margin, side, context):
+            histogram = tile.histogram()
+            total = histogram if total is None else [a + b for a, b in zip(total, histogram)]
+        return total
+
+    @staticmethod
+    def _apply_step(step, tile, ext, context):
+        """Apply one compiled step to a tile cropped at ext."""
+        name = step.op
+        if name == "color":
+            lut, matrix = context["color"]
+            return EffectsEngine._apply_color_tables(tile, lut, matrix)
+        if name == "vignette":
+            x2, y2 = context["vignette"]
+            mask = EffectsEngine._build_vignette_mask(
+                x2[ext[0]:ext[2]], y2[ext[1]:ext[3]], TileEngine.VIGNETTE_STRENGTH
+            )
+            return EffectsEngine._apply_mask(tile, mask)
+        return EffectsEngine.apply_step(tile, step)
@@ -0,0 +1,136 @@
+"""
+Image Converter Pro — Multi-output variants.
+Several outputs (sizes, formats, qualities) from one decode of each source.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from config.constants import FORMAT_EXTENSIONS, MAX_IMAGE_DIMENSION
+from utils.validators import (
+    validate_dimensions, validate_format, validate_quality, validate_effort,
+    validate_max_bytes, ValidationError,
+)
+
+# Settings a variant may override, besides its "suffix"
+VARIANT_KEYS = (
+    "width", "height", "format", "quality", "effort", "lossless",
+    "max_bytes", "fit_downscale",
+)
+
+
+@dataclass
+class OutputVariant:
+    """One output of a fan-out batch.
+
+    Attributes:
+        index: Position in the declared variant list
+        size: (width, height) box to fit, None to keep the rendered size
+        format: Output format
+        suffix: Appended to the output name, before the extension
+        settings: Batch settings with this variant's overrides applied
+    """
+    index: int
+    size: Optional[tuple]
+    format: str
+    suffix: str
+    settings: dict
+
+    def target_size(self, size, maintain_ratio=True):
+        """Size this variant produces from an image of the given size."""
+        if self.size is None:
+            return size
+        if not maintain_ratio:
+            return self.size
+        scale = min(1.0, self.size[0] / size[0], self.size[1] / size[1])
+        return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def parse_variants(settings):
+    """Build the output variants declared in settings["variants"].
+
+    Each variant is a dict overriding any of VARIANT_KEYS, plus an
+    optional "suffix" for its file name (default "_{width}w", or none
+    without a width). With maintain_ratio, a variant may give only a
+    width or only a height.
+
+    Args:
+        settings: Processing settings (dict)
+
+    Returns:
+        list: OutputVariant in declared order (empty without variants)
+
+    Raises:
+        ValidationError: If a variant is malformed, or two variants would
+            produce the same file name
+    """
+    specs = settings.get("variants") or []
+    if not isinstance(specs, (list, tuple)):
+        raise ValidationError("Variants must be a list of objects.")
+    maintain_ratio = settings.get("maintain_ratio", True)
+
+    variants = []
+    names = set()
+    for i, spec in enumerate(specs):
+        if not isinstance(spec, dict):
+            raise ValidationError(f"Variant {i + 1} must be an object.")
+        unknown = sorted(set(spec) - set(VARIANT_KEYS) - {"suffix"})
+        if unknown:
+            raise ValidationError(f"Unknown variant settings: {', '.join(unknown)}")
+
+        merged = dict(settings)
+        merged.pop("variants", None)
+        merged.update({key: spec[key] for key in VARIANT_KEYS if key in spec})
+        merged["format"] = validate_format(str(merged.get("format", "JPEG")))
+        merged["quality"] = validate_quality(merged.get("quality", 85))
+        merged["effort"] = validate_effort(merged.get("effort", "balanced"))
+        merged["max_bytes"] = validate_max_bytes(merged.get("max_bytes"))
+
+        width, height = spec.get("width"), spec.get("height")
+        size = None
+        if width or height:
+            if not (width and height) and not maintain_ratio:
+                raise ValidationError(
+                    f"Variant {i + 1} needs both width and height without maintain_ratio."
+                )
+            size = validate_dimensions(width or MAX_IMAGE_DIMENSION,
+                                       height or MAX_IMAGE_DIMENSION)
+
+        suffix = str(spec.get("suffix", f"_{width}w" if width else ""))
+        name = (suffix, FORMAT_EXTENSIONS.get(merged["format"], ".jpg"))
+        if name in names:
+            raise ValidationError(
+                f"Variants {name[0] or '(no suffix)'}{name[1]} would overwrite each other; "
+                f"give them distinct suffixes."
+            )
+        names.add(name)
+
+        variants.append(OutputVariant(i, size, merged["format"], suffix, merged))
+    return variants
+
+
+def decode_size(variants, rotated=False):
+    """Smallest box worth decoding for a set of variants.
+
+    Args:
+        variants: OutputVariant list
+        rotated: The pipeline rotates the image, so the box must hold
+            either orientation
+
+    Returns:
+        tuple or None: (width, height) covering every variant, or None if
+        one of them keeps the full resolution
+    """
+    if not variants or any(v.size is None for v in variants):
+        return None
+    width = max(v.size[0] for v in variants)
+    height = max(v.size[1] for v in variants)
+    if rotated:
+        width = height = max(width, height)
+    return width, height
+
+
+def variant_outputs(metrics):
+    """Output paths of a fan-out result, in declared order (None otherwise)."""
+    records = metrics.get("variants")
+    return [record["output"] for record in records] if records else None
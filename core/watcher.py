@@ -0,0 +1,333 @@
+"""
+Image Converter Pro — Watch-folder mode.
+Continuously converts images dropped into a folder on a persistent worker pool.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from config.constants import (
+    IN_FLIGHT_PER_WORKER, WATCH_POLL_INTERVAL, WATCH_SETTLE_TIME, MANIFEST_SAVE_INTERVAL
+)
+from core.batch_processor import BatchItemResult
+from core.manifest import BatchManifest, settings_hash
+from core.stats import percentile
+from core.variants import variant_outputs
+from utils.file_utils import OutputNameIndex
+from utils.ingest import sniff_image_format
+
+
+class FolderWatcher:
+    """Watches a folder and converts new or modified images as they settle.
+
+    Every poll takes a stat snapshot of the folder (one os.scandir per
+    directory, no file reads). A file is submitted once its size and
+    mtime have not changed for settle_time, so half-written uploads are
+    never picked up. Submitted work runs on a single worker pool created
+    by the BatchProcessor and kept for the watcher's lifetime.
+
+    A BatchManifest in save_dir remembers what was converted, so a
+    restarted watcher skips unchanged files and overwrites the outputs
+    of modified ones. Hidden files (leading ".") are ignored.
+
+    Attributes:
+        processor: BatchProcessor providing the pool and live stats
+        detected: Files that settled and were queued
+        ignored: Settled files that are not images
+    """
+
+    LATENCY_SAMPLES = 1000
+    MANIFEST_SAVE_INTERVAL = MANIFEST_SAVE_INTERVAL
+
+    def __init__(self, processor, settings, watch_dir, save_dir,
+                 interval=WATCH_POLL_INTERVAL, settle_time=WATCH_SETTLE_TIME,
+                 recursive=False):
+        """Create FolderWatcher.
+
+        Args:
+            processor: BatchProcessor (its max_workers and backend are used)
+            settings: Processing settings (dict)
+            watch_dir: Folder to watch
+            save_dir: Output directory (must not be inside a recursively
+                watched folder)
+            interval: Seconds between snapshots
+            settle_time: Seconds a file's size/mtime must stay unchanged
+            recursive: Also watch subdirectories
+
+        Raises:
+            ValueError: If save_dir would be watched itself
+        """
+        watch_real = os.path.realpath(watch_dir)
+        save_real = os.path.realpath(save_dir)
+        if save_real == watch_real or (recursive and save_real.startswith(watch_real + os.sep)):
+            raise ValueError("Output directory must not be inside the watched folder.")
+
+        self.processor = processor
+        self.settings = settings
+        self.watch_dir = watch_dir
+        self.save_dir = save_dir
+        self.interval = interval
+        self.settle_time = settle_time
+        self.recursive = recursive
+        self.stop_event = threading.Event()
+
+        self.detected = 0
+        self.ignored = 0
+        self._settling = {}   # path -> (signature, unchanged since)
+        self._seen = {}       # path -> signature already handled
+        self._ready = deque()  # (path, settled since), waiting for a pool slot
+        self._pending = {}    # future -> (index, path, settled since, input stat)
+        self._results = queue.Queue()
+        self._latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._count = 0
+        self.manifest = None
+
+    # ========== Lifecycle ==========
+
+    def start(self):
+        """Create the worker pool and load the manifest."""
+        os.makedirs(self.save_dir, exist_ok=True)
+        OutputNameIndex.reset(self.save_dir)
+        self.manifest = BatchManifest(self.save_dir,
+                                      use_content_hash=self.processor.content_hash)
+        self._digest = settings_hash(self.settings)
+        self._window = self.processor.max_workers * IN_FLIGHT_PER_WORKER
+        self._executor, self._task = self.processor.create_executor()
+        self._last_save = time.monotonic()
+        self.processor.reset()
+        self.processor.stats.start(None)
+
+    def stop(self):
+        """Ask run() to return after finishing in-flight work."""
+        self.stop_event.set()
+
+    def close(self):
+        """Finish in-flight work, shut the pool down and save the manifest.
+
+        Queued files that were not started yet are dropped (they are
+        picked up again by the next watcher).
+
+        Returns:
+            list: BatchItemResult of the work finished while closing
+        """
+        self._ready.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.processor._update_queue(0)
+        if self.manifest is not None:
+            self.manifest.save()
+        self.processor.stats.finish()
+        return self._drain()
+
+    def run(self, on_result=None):
+        """Poll until stop() is called.
+
+        Args:
+            on_result: Called with each finished BatchItemResult, from
+                the thread running this method
+        """
+        self.start()
+        try:
+            while not self.stop_event.is_set():
+                self._dispatch(self.poll(), on_result)
+                if time.monotonic() - self._last_save >= self.MANIFEST_SAVE_INTERVAL:
+                    self.manifest.save()
+                    self._last_save = time.monotonic()
+                self.stop_event.wait(self.interval)
+        finally:
+            self._dispatch(self.close(), on_result)
+
+    @staticmethod
+    def _dispatch(results, on_result):
+        if on_result:
+            for result in results:
+                on_result(result)
+
+    # ========== Polling ==========
+
+    def snapshot(self):
+        """Stat all visible files in the watched folder.
+
+        Returns:
+            dict: {path: (size, mtime_ns)}
+        """
+        files = {}
+        stack = [self.watch_dir]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive:
+                                    stack.append(entry.path)
+                                continue
+                            if not entry.is_file():
+                                continue
+                            stat = entry.stat()
+                        except OSError:
+                            continue  # Deleted between listing and stat
+                        files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        return files
+
+    def poll(self):
+        """Take one snapshot, submit settled files and collect finished work.
+
+        Returns:
+            list: BatchItemResult finished since the previous poll
+        """
+        now = time.monotonic()
+        files = self.snapshot()
+
+        for path, signature in files.items():
+            if self._seen.get(path) == signature:
+                continue
+            current = self._settling.get(path)
+            if current is None or current[0] != signature:
+                self._settling[path] = (signature, now)  # New or still changing
+
+        for path in [p for p in self._settling if p not in files]:
+            del self._settling[path]
+        for path in [p for p in self._seen if p not in files]:
+            del self._seen[path]  # Removed; a new file with the same name is new work
+
+        for path, (signature, since) in list(self._settling.items()):
+            if now - since < self.settle_time:
+                continue
+            del self._settling[path]
+            self._seen[path] = signature
+            if signature[0] > 0:  # Empty files are still being created
+                self.detected += 1
+                self._ready.append((path, since))
+
+        self._submit_ready()
+        return self._drain()
+
+    def _submit_ready(self):
+        """Submit queued files while the in-flight window has room."""
+        stats = self.processor.stats
+        while self._ready and len(self._pending) < self._window:
+            path, since = self._ready.popleft()
+            if sniff_image_format(path) is None:
+                self.ignored += 1
+                continue
+
+            # Touched inputs are hashed by the worker, not on the polling thread
+            unchanged, previous, expected_hash = self.manifest.check(path, self._digest)
+            index = self._count
+            self._count += 1
+            if unchanged:
+                stats.record_skipped()
+                self._results.put(
+                    BatchItemResult(index, path, output_path=unchanged, skipped=True)
+                )
+                continue
+
+            in_stat = self.processor._stat(path)
+            future = self._executor.submit(
+                self._task, path, self.settings, self.save_dir, index + 1, False, previous,
+                self.manifest.use_content_hash, expected_hash
+            )
+            with self._lock:
+                self._pending[future] = (index, path, since, in_stat)
+            future.add_done_callback(self._on_done)
+
+        with self._lock:
+            in_flight = len(self._pending)
+        self.processor._update_queue(in_flight)
+
+    def _on_done(self, future):
+        """Record a finished task (runs on a pool thread)."""
+        with self._lock:
+            index, path, since, in_stat = self._pending.pop(future)
+        stats = self.processor.stats
+        latency = time.monotonic() - since
+
+        try:
+            output_path, metrics = future.result()
+        except Exception as e:
+            stats.record_failure(f"{os.path.basename(path)}: {e}")
+            self._results.put(BatchItemResult(index, path, error=str(e)))
+            return
+
+        if metrics.get("unchanged"):  # Touched, but the content hash matched
+            stats.record_skipped()
+            self._results.put(
+                BatchItemResult(index, path, output_path=output_path, skipped=True)
+            )
+            return
+
+        stats.record_success(metrics["bytes_in"], metrics["bytes_out"],
+                             metrics.get("conversions_avoided", 0))
+        if in_stat:
+            self.manifest.record(path, in_stat, self._digest, output_path,
+                                 outputs=variant_outputs(metrics),
+                                 input_hash=metrics.get("content_hash"))
+        with self._lock:
+            self._latencies.append(latency)
+        metrics["latency"] = latency
+        self._results.put(BatchItemResult(index, path, output_path=output_path, metrics=metrics))
+
+    def _drain(self):
+        """Collect finished results."""
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    # ========== Counters ==========
+
+    def counters(self):
+        """Current backlog and latency counters.
+
+        Latency is measured from the moment a file stopped changing to
+        the moment its output was written.
+
+        Returns:
+            dict: {"detected", "converted", "failed", "skipped", "ignored",
+            "settling", "queued", "in_flight", "backlog",
+            "latency": {"last", "p50", "p95", "max"} in seconds (None if
+            nothing converted yet)}
+        """
+        with self._lock:
+            in_flight = len(self._pending)
+            latencies = list(self._latencies)
+        settling = len(self._settling)
+        queued = len(self._ready)
+        stats = self.processor.stats
+
+        latency = {"last": None, "p50": None, "p95": None, "max": None}
+        if latencies:
+            ordered = sorted(latencies)
+            latency = {
+                "last": latencies[-1],
+                "p50": percentile(ordered, 0.50),
+                "p95": percentile(ordered, 0.95),
+                "max": ordered[-1],
+            }
+
+        return {
+            "detected": self.detected,
+            "converted": stats.success,
+            "failed": stats.failed,
+            "skipped": stats.skipped,
+            "ignored": self.ignored,
+            "settling": settling,
+            "queued": queued,
+            "in_flight": in_flight,
+            "backlog": settling + queued + in_flight,
+            "latency": latency,
+        }
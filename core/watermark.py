@@ -5,6 +5,17 @@ Text watermark with font fallback and shadow.
 
 from PIL import Image, ImageDraw, ImageFont
 
+from utils.cache import LRUCache
+
+
+# Loaded fonts by size, and rendered stamp sprites by (text, font, size,
+# opacity), shared by all WatermarkEngine instances of the process
+_fonts = LRUCache(max_entries=16)
+_stamps = LRUCache(
+    max_entries=64, max_bytes=64 * 1024 * 1024,
+    sizeof=lambda stamp: stamp[0].width * stamp[0].height * 4,
+)
+
 
 class WatermarkEngine:
     """Text watermark engine with font fallback and opacity control."""
@@ -16,9 +27,15 @@ class WatermarkEngine:
         "Helvetica.ttf",
     ]
 
+    # Modes the watermark is composited into without converting the image
+    NATIVE_MODES = ("RGB", "L", "RGBA")
+
+    # Shadow offset (pixels, down and right of the text)
+    SHADOW_OFFSET = 2
+
     @staticmethod
     def _get_font(size=24):
-        """Get best available font with fallback.
+        """Get best available font with fallback (cached per size).
 
         Args:
             size: Font size in pixels
@@ -26,6 +43,11 @@ class WatermarkEngine:
         Returns:
             ImageFont: Loaded font
         """
+        return _fonts.get_or_create(size, lambda: WatermarkEngine._load_font(size))
+
+    @staticmethod
+    def _load_font(size):
+        """Load the first available font of FONT_FALLBACKS."""
         for font_name in WatermarkEngine.FONT_FALLBACKS:
             try:
                 return ImageFont.truetype(font_name, size)
@@ -33,6 +55,53 @@ class WatermarkEngine:
                 continue
         return ImageFont.load_default()
 
+    @staticmethod
+    def _get_stamp(text, font_size, opacity):
+        """Get the (cached) rendered stamp for a watermark.
+
+        Returns:
+            tuple: (RGBA sprite, (x, y) of the text anchor inside the
+            sprite, (width, height) of the text). The sprite is shared and
+            must not be modified.
+        """
+        font = WatermarkEngine._get_font(font_size)
+        key = (text, getattr(font, "path", "default"), font_size, float(opacity))
+        return _stamps.get_or_create(
+            key, lambda: WatermarkEngine._render_stamp(text, font, opacity)
+        )
+
+    @staticmethod
+    def _render_stamp(text, font, opacity):
+        """Render text and its shadow into a tight RGBA sprite."""
+        probe = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        bbox = probe.textbbox((0, 0), text, font=font)
+        text_size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+
+        offset = WatermarkEngine.SHADOW_OFFSET
+        origin = (max(0, -bbox[0]), max(0, -bbox[1]))
+        sprite = Image.new("RGBA", (
+            max(1, origin[0] + bbox[2] + offset), max(1, origin[1] + bbox[3] + offset),
+        ), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+
+        # Shadow, then the main text
+        shadow_alpha = int(128 * opacity)
+        draw.text((origin[0] + offset, origin[1] + offset), text,
+                  fill=(0, 0, 0, shadow_alpha), font=font)
+        text_alpha = int(255 * opacity)
+        draw.text(origin, text, fill=(255, 255, 255, text_alpha), font=font)
+
+        return sprite, origin, text_size
+
+    @staticmethod
+    def cache_info():
+        """Return the font and stamp cache counters.
+
+        Returns:
+            dict: {"fonts": LRUCache.info(), "stamps": LRUCache.info()}
+        """
+        return {"fonts": _fonts.info(), "stamps": _stamps.info()}
+
     @staticmethod
     def _calculate_position(img_size, text_size, position):
         """Calculate watermark position coordinates.
@@ -60,7 +129,7 @@ class WatermarkEngine:
         return positions.get(position, positions["bottom-right"])
 
     def add_text_watermark(self, img, text, position="bottom-right",
-                            opacity=0.5, font_size=24):
+                            opacity=0.5, font_size=24, in_place=False):
         """Add text watermark to image.
 
         Features:
@@ -68,6 +137,10 @@ class WatermarkEngine:
             - Text shadow for readability
             - Opacity control via alpha compositing
 
+        RGB, L and RGBA images keep their mode; other modes are
+        converted to RGBA. Only the bounding box of the stamp is blended,
+        so the cost scales with the watermark, not the image.
+
         Args:
             img: PIL Image
             text: Watermark text
@@ -75,6 +148,8 @@ class WatermarkEngine:
                        "bottom-right", "center")
             opacity: Text opacity (0.0-1.0)
             font_size: Font size in pixels
+            in_place: Stamp img itself instead of a copy (the caller must
+                own img)
 
         Returns:
             PIL Image: Image with watermark
@@ -82,32 +157,33 @@ class WatermarkEngine:
         if not text:
             return img
 
-        # Convert to RGBA for transparency support
-        base = img.convert("RGBA")
-        watermark_layer = Image.new("RGBA", base.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(watermark_layer)
-
-        font = self._get_font(font_size)
-
-        # Calculate text size
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
-
-        # Calculate position
-        x, y = self._calculate_position(base.size, text_size, position)
-
-        # Draw shadow (offset by 2px)
-        shadow_alpha = int(128 * opacity)
-        draw.text((x + 2, y + 2), text, fill=(0, 0, 0, shadow_alpha), font=font)
-
-        # Draw main text
-        text_alpha = int(255 * opacity)
-        draw.text((x, y), text, fill=(255, 255, 255, text_alpha), font=font)
-
-        # Composite
-        result = Image.alpha_composite(base, watermark_layer)
-
-        # Convert back to original mode
-        if img.mode == "RGB":
-            return result.convert("RGB")
+        if img.mode not in self.NATIVE_MODES:
+            result = img.convert("RGBA")
+        elif in_place:
+            result = img
+        else:
+            result = img.copy()
+
+        # Text, font and shadow are rendered once per (text, font, size,
+        # opacity); each image only gets the cached sprite blended in
+        sprite, origin, text_size = self._get_stamp(text, font_size, opacity)
+        x, y = self._calculate_position(result.size, text_size, position)
+        left, top = x - origin[0], y - origin[1]
+
+        # Part of the sprite inside the image
+        box = (
+            max(0, left), max(0, top),
+            min(result.width, left + sprite.width), min(result.height, top + sprite.height),
+        )
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return result
+        stamp = sprite.crop((box[0] - left, box[1] - top, box[2] - left, box[3] - top))
+
+        if result.mode == "RGBA":
+            region = Image.alpha_composite(result.crop(box), stamp)
+            result.paste(region, box[:2])
+        else:
+            # Opaque base: blending the stamp through its own alpha is the
+            # same "over" composite, without a round trip through RGBA
+            result.paste(stamp, box[:2], stamp)
         return result
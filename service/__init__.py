@@ -0,0 +1,5 @@
+"""
+Image Converter Pro — HTTP conversion service.
+"""
+
+from service.server import ConversionService
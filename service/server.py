@@ -0,0 +1,469 @@
+"""
+Image Converter Pro — Local HTTP conversion service.
+Stdlib asyncio HTTP/1.1 server in front of a warm worker pool.
+"""
+
+import asyncio
+import io
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs
+
+from PIL import Image, UnidentifiedImageError
+
+from config.constants import (
+    APP_NAME, APP_VERSION, MAX_WORKERS, DEFAULT_EFFORT,
+    SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_QUEUE, SERVICE_MAX_BODY,
+)
+from core.batch_processor import BatchProcessor
+from core.preset_manager import PresetManager
+from core.stats import percentile
+from core.watermark import WatermarkEngine
+from utils.validators import (
+    validate_format, validate_quality, validate_effort, validate_max_bytes, ValidationError
+)
+
+
+# Conversion errors caused by the upload itself (answered with 422): not
+# an image, truncated or corrupt data (decoders raise OSError; nothing
+# here touches the filesystem), or an image the settings cannot apply to
+CLIENT_ERRORS = (
+    UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError, ValidationError,
+)
+
+STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 422: "Unprocessable Entity",
+    429: "Too Many Requests", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Request error answered with an HTTP status and a JSON message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Request:
+    """Parsed HTTP request."""
+    method: str
+    path: str
+    query: dict
+    headers: dict
+    body: bytes = b""
+    keep_alive: bool = True
+    length: int = 0  # Content-Length; the body is read after admission
+
+
+@dataclass
+class Response:
+    """HTTP response to send."""
+    status: int
+    body: bytes = b""
+    content_type: str = "application/json"
+    headers: dict = field(default_factory=dict)
+
+    @classmethod
+    def json(cls, status, data, **headers):
+        return cls(status, json.dumps(data).encode("utf-8"), headers=headers)
+
+
+class ConversionService:
+    """HTTP service converting uploaded images on a warm worker pool.
+
+    Endpoints:
+        POST /convert  Body: encoded image. Settings as JSON in the
+                       X-Settings header or the "settings" query
+                       parameter, merged over the service defaults.
+                       Returns the encoded output image.
+        GET /metrics   Request counters, queue state and latency (JSON)
+        GET /health    Liveness check
+
+    At most max_workers conversions run at once and max_queue more
+    wait for a worker; beyond that requests are answered with 429 and
+    a Retry-After header instead of piling up.
+    """
+
+    HEADER_TIMEOUT = 30.0  # Seconds to receive a request's header, and then its body
+    LINGER_TIME = 1.0  # Seconds to discard a rejected upload before closing
+    LATENCY_SAMPLES = 1000
+
+    def __init__(self, settings=None, max_workers=MAX_WORKERS, backend="thread",
+                 host=SERVICE_HOST, port=SERVICE_PORT, max_queue=SERVICE_MAX_QUEUE,
+                 max_body=SERVICE_MAX_BODY):
+        """Create ConversionService.
+
+        Args:
+            settings: Default settings (default: PresetManager.DEFAULTS)
+            max_workers: Parallel conversions
+            backend: "thread" or "process" worker pool
+            host: Interface to listen on (localhost by default)
+            port: TCP port (0 picks a free port)
+            max_queue: Requests allowed to wait for a worker
+            max_body: Largest accepted upload in bytes
+
+        Raises:
+            ValueError: If backend is unknown
+        """
+        self.processor = BatchProcessor(max_workers=max_workers, backend=backend)
+        self.settings = dict(settings or PresetManager.DEFAULTS)
+        self.host = host
+        self.port = port
+        self.max_queue = max_queue
+        self.max_body = max_body
+
+        self._server = None
+        self._executor = None
+        self._task = None
+        self._slots = None
+        self._active = 0    # Accepted /convert requests (running + waiting)
+        self._running = 0
+        self._started = None
+        self._latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self.counters = {
+            "requests": 0, "converted": 0, "client_errors": 0,
+            "failed": 0, "rejected": 0, "bytes_in": 0, "bytes_out": 0,
+        }
+
+    @property
+    def capacity(self):
+        """Requests accepted at once (running + waiting)."""
+        return self.processor.max_workers + self.max_queue
+
+    # ========== Lifecycle ==========
+
+    async def start(self):
+        """Start the worker pool (warmed up) and begin listening."""
+        self._executor, self._task = self.processor.create_executor(in_memory=True)
+        self._slots = asyncio.Semaphore(self.processor.max_workers)
+        await self._warm_up()
+
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started = time.monotonic()
+
+    async def _warm_up(self):
+        """Run a tiny conversion on every worker so the first request is fast."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (8, 8)).save(buffer, format="PNG")
+        data = buffer.getvalue()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._task, data, {"format": "PNG"})
+            for _ in range(self.processor.max_workers)
+        ))
+
+    async def close(self):
+        """Stop listening and shut the worker pool down."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def serve_forever(self):
+        """Start the service and serve until cancelled."""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    # ========== HTTP ==========
+
+    async def _handle_connection(self, reader, writer):
+        """Serve requests on one connection (keep-alive aware)."""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader),
+                                                     self.HEADER_TIMEOUT)
+                except HTTPError as e:
+                    self.counters["client_errors"] += 1
+                    await self._send(writer, Response.json(e.status, {"error": str(e)}), False)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+
+                rejected = self._reject_saturated(request)
+                if rejected is not None:
+                    # Answered before the upload is read, then dropped
+                    await self._send(writer, rejected, False)
+                    await self._linger(reader, request.length)
+                    break
+                if request.length:
+                    try:
+                        request.body = await asyncio.wait_for(
+                            reader.readexactly(request.length), self.HEADER_TIMEOUT
+                        )
+                    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                        break
+
+                response = await self._dispatch(request)
+                await self._send(writer, response, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        """Read and parse one request header (None at a clean end of stream).
+
+        The body is left unread (request.length bytes), so a saturated
+        service can turn an upload away before taking it in.
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise HTTPError(400, "Incomplete request")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request header too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "Chunked uploads are not supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body:
+            raise HTTPError(413, f"Body larger than {self.max_body} bytes")
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = connection != "close"
+        else:
+            keep_alive = connection == "keep-alive"
+
+        path, _, query = target.partition("?")
+        return Request(method.upper(), path, parse_qs(query), headers, b"", keep_alive, length)
+
+    def _reject_saturated(self, request):
+        """429 response for a conversion that cannot be accepted now, else None."""
+        if request.method != "POST" or request.path != "/convert":
+            return None
+        if self._active < self.capacity:
+            return None
+        self.counters["requests"] += 1
+        return self._saturated()
+
+    def _saturated(self):
+        """Count and build a 429 response."""
+        self.counters["rejected"] += 1
+        return Response.json(429, {"error": "Service saturated, retry later"},
+                             **{"Retry-After": "1"})
+
+    async def _linger(self, reader, length):
+        """Discard (without buffering) the upload of a rejected request.
+
+        Closing a socket with unread data resets the connection, which
+        can destroy the response before the client reads it; the body is
+        skipped for at most LINGER_TIME instead.
+        """
+        async def discard():
+            remaining = length
+            while remaining > 0:
+                chunk = await reader.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+
+        try:
+            await asyncio.wait_for(discard(), self.LINGER_TIME)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+
+    @staticmethod
+    async def _send(writer, response, keep_alive):
+        """Write a response."""
+        reason = STATUS_TEXT.get(response.status, "")
+        head = [
+            f"HTTP/1.1 {response.status} {reason}",
+            f"Content-Type: {response.content_type}",
+            f"Content-Length: {len(response.body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            f"Server: {APP_NAME.replace(' ', '-')}/{APP_VERSION}",
+        ]
+        head.extend(f"{name}: {value}" for name, value in response.headers.items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + response.body)
+        await writer.drain()
+
+    async def _dispatch(self, request):
+        """Route a request to its handler."""
+        self.counters["requests"] += 1
+        routes = {
+            "/convert": ("POST", self._convert),
+            "/metrics": ("GET", self._metrics),
+            "/health": ("GET", self._health),
+        }
+        route = routes.get(request.path)
+        if route is None:
+            self.counters["client_errors"] += 1
+            return Response.json(404, {"error": f"Unknown endpoint: {request.path}"})
+        method, handler = route
+        if request.method != method:
+            self.counters["client_errors"] += 1
+            return Response.json(405, {"error": f"Use {method} for {request.path}"},
+                                 Allow=method)
+        try:
+            return await handler(request)
+        except HTTPError as e:
+            self.counters["client_errors"] += 1
+            return Response.json(e.status, {"error": str(e)})
+
+    # ========== Handlers ==========
+
+    async def _health(self, request):
+        return Response.json(200, {"status": "ok"})
+
+    async def _metrics(self, request):
+        return Response.json(200, self.metrics())
+
+    async def _convert(self, request):
+        """Convert the uploaded image."""
+        if self._active >= self.capacity:
+            return self._saturated()  # Filled up while the body was read
+        if not request.body:
+            raise HTTPError(400, "Empty body: send the encoded image")
+        settings = self._request_settings(request)
+
+        self._active += 1
+        start = time.perf_counter()
+        try:
+            async with self._slots:
+                self._running += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    output, fmt, metrics = await loop.run_in_executor(
+                        self._executor, self._task, request.body, settings
+                    )
+                finally:
+                    self._running -= 1
+        except CLIENT_ERRORS as e:
+            self.counters["failed"] += 1
+            return Response.json(422, {"error": str(e)})
+        except Exception as e:
+            self.counters["failed"] += 1
+            return Response.json(500, {"error": f"Internal error: {e}"})
+        finally:
+            self._active -= 1
+
+        elapsed = time.perf_counter() - start
+        self._latencies.append(elapsed)
+        self.counters["converted"] += 1
+        self.counters["bytes_in"] += len(request.body)
+        self.counters["bytes_out"] += len(output)
+
+        headers = {
+            "X-Image-Format": fmt,
+            "X-Source-Format": metrics.get("format") or "",
+            "X-Processing-Ms": f"{elapsed * 1000:.1f}",
+        }
+        encode = metrics.get("encode")
+        if encode:
+            headers["X-Encode-Iterations"] = str(encode["iterations"])
+            headers["X-Encode-Quality"] = "" if encode["quality"] is None else str(encode["quality"])
+
+        Image.init()
+        return Response(200, output, content_type=Image.MIME.get(fmt, "application/octet-stream"),
+                        headers=headers)
+
+    def _request_settings(self, request):
+        """Merge the request's settings JSON over the service defaults.
+
+        Raises:
+            HTTPError: If the settings are malformed or invalid
+        """
+        raw = request.headers.get("x-settings") or request.query.get("settings", [""])[0]
+        overrides = {}
+        if raw:
+            try:
+                overrides = json.loads(raw)
+            except ValueError:
+                raise HTTPError(400, "Settings are not valid JSON")
+            if not isinstance(overrides, dict):
+                raise HTTPError(400, "Settings must be a JSON object")
+            unknown = sorted(set(overrides) - set(PresetManager.DEFAULTS))
+            if unknown:
+                raise HTTPError(400, f"Unknown settings: {', '.join(unknown)}")
+            if overrides.get("variants"):
+                raise HTTPError(400, "Variants are not supported (one image per response)")
+
+        settings = dict(self.settings)
+        settings.update(overrides)
+        try:
+            settings["format"] = validate_format(str(settings["format"]))
+            settings["quality"] = validate_quality(settings["quality"])
+            settings["effort"] = validate_effort(settings.get("effort", DEFAULT_EFFORT))
+            settings["max_bytes"] = validate_max_bytes(settings.get("max_bytes"))
+        except ValidationError as e:
+            raise HTTPError(400, str(e))
+        return settings
+
+    # ========== Metrics ==========
+
+    def metrics(self):
+        """Current service metrics.
+
+        Returns:
+            dict: Request counters, "in_flight", "queued", "capacity",
+            "uptime" (s), "latency" (ms: p50, p95, max; None before
+            the first conversion) and "watermark_cache" (font and stamp
+            cache counters; None with the process backend, whose workers
+            keep their own caches)
+        """
+        latency = {"p50": None, "p95": None, "max": None}
+        if self._latencies:
+            ordered = sorted(self._latencies)
+            latency = {
+                "p50": percentile(ordered, 0.50) * 1000,
+                "p95": percentile(ordered, 0.95) * 1000,
+                "max": ordered[-1] * 1000,
+            }
+
+        metrics = dict(self.counters)
+        metrics.update({
+            "in_flight": self._running,
+            "queued": self._active - self._running,
+            "capacity": {
+                "workers": self.processor.max_workers,
+                "max_queue": self.max_queue,
+                "backend": self.processor.backend,
+            },
+            "uptime": time.monotonic() - self._started if self._started else 0.0,
+            "latency": latency,
+            "watermark_cache": (WatermarkEngine.cache_info()
+                                if self.processor.backend == "thread" else None),
+        })
+        return metrics
@@ -0,0 +1,79 @@
+"""
+Test — MemoryBudget va working set taxmini.
+"""
+
+import pytest
+import os
+import sys
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.admission import MemoryBudget, estimate_peak_bytes, read_header
+from core.batch_processor import BatchProcessor
+
+
+class TestEstimate:
+    def test_read_header(self, tmp_image_path):
+        assert read_header(tmp_image_path) == ((200, 150), "RGB", "PNG")
+
+    def test_read_header_missing(self):
+        assert read_header("/nonexistent/missing.png") is None
+
+    def test_larger_image_costs_more(self):
+        small = estimate_peak_bytes((100, 100), "RGB", "PNG", {})
+        large = estimate_peak_bytes((4000, 3000), "RGB", "PNG", {})
+        assert large > small
+
+    def test_jpeg_draft_cheaper(self):
+        settings = {"width": 400, "height": 300}
+        jpeg = estimate_peak_bytes((8000, 6000), "RGB", "JPEG", settings)
+        png = estimate_peak_bytes((8000, 6000), "RGB", "PNG", settings)
+        assert jpeg < png
+
+    def test_at_least_full_decode(self):
+        cost = estimate_peak_bytes((1000, 1000), "RGB", "PNG", {"width": 10, "height": 10})
+        assert cost >= 1000 * 1000 * 3
+
+    def test_vignette_adds_mask(self):
+        base = estimate_peak_bytes((1000, 1000), "RGB", "PNG", {})
+        vignette = estimate_peak_bytes((1000, 1000), "RGB", "PNG", {"vignette": True})
+        assert vignette > base
+
+
+class TestMemoryBudget:
+    def test_invalid_budget(self):
+        with pytest.raises(ValueError):
+            MemoryBudget(0)
+
+    def test_admits_within_budget(self):
+        budget = MemoryBudget(100)
+        assert budget.try_acquire(60)
+        assert not budget.try_acquire(60)
+        budget.release(60)
+        assert budget.try_acquire(60)
+
+    def test_oversized_runs_alone(self):
+        budget = MemoryBudget(100)
+        assert budget.try_acquire(500)
+        assert not budget.try_acquire(1)
+        budget.release(500)
+        assert budget.in_use == 0
+
+
+class TestBatchAdmission:
+    def test_serializes_under_small_budget(self, tmp_path):
+        paths = []
+        for i in range(4):
+            path = str(tmp_path / f"img_{i}.png")
+            Image.new("RGB", (300, 200), (i, i, i)).save(path)
+            paths.append(path)
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+
+        processor = BatchProcessor(max_workers=4, memory_budget=1)
+        results = processor.process_batch(paths, {"format": "PNG"}, str(out_dir))
+        assert results["success"] == 4
+        single = MemoryBudget.estimate(paths[0], {"format": "PNG"})
+        assert processor.admission.peak == single
+        assert processor.admission.in_use == 0
@@ -0,0 +1,269 @@
+"""
+Test — BatchProcessor klassi.
+"""
+
+import pytest
+import asyncio
+import json
+import os
+import sys
+import time
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.batch_processor import BatchProcessor
+
+
+@pytest.fixture
+def processor():
+    return BatchProcessor(max_workers=2)
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    """5 ta test rasm yaratish."""
+    src = tmp_path / "src"
+    src.mkdir()
+    paths = []
+    for i in range(5):
+        path = str(src / f"img_{i}.png")
+        Image.new("RGB", (120, 90), color=(i * 40, 100, 150)).save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def out_dir(tmp_path):
+    path = tmp_path / "out"
+    path.mkdir()
+    return str(path)
+
+
+SETTINGS = {"format": "JPEG", "width": 60, "height": 60, "quality": 80}
+
+
+class TestProcessBatch:
+    def test_all_success(self, processor, image_paths, out_dir):
+        results = processor.process_batch(image_paths, SETTINGS, out_dir)
+        assert results["success"] == 5
+        assert results["failed"] == 0
+        assert len(os.listdir(out_dir)) == 5
+
+    def test_failed_image(self, processor, image_paths, out_dir):
+        results = processor.process_batch(
+            image_paths + ["/nonexistent/missing.png"], SETTINGS, out_dir
+        )
+        assert results["success"] == 5
+        assert results["failed"] == 1
+        assert len(results["errors"]) == 1
+
+    def test_progress_callback(self, processor, image_paths, out_dir):
+        calls = []
+        processor.process_batch(
+            image_paths, SETTINGS, out_dir,
+            progress_callback=lambda *args: calls.append(args)
+        )
+        assert len(calls) == 5
+        assert all(total == 5 for _, total, _, _ in calls)
+
+
+class TestStreaming:
+    def test_generator_input(self, processor, image_paths, out_dir):
+        calls = []
+        results = processor.process_batch(
+            (p for p in image_paths), SETTINGS, out_dir,
+            progress_callback=lambda *args: calls.append(args)
+        )
+        assert results["success"] == 5
+        assert all(total is None for _, total, _, _ in calls)
+
+    def test_bounded_window(self, processor, image_paths, out_dir):
+        pulled = []
+
+        def lazy_paths():
+            for p in image_paths:
+                pulled.append(p)
+                yield p
+
+        gen = processor.iter_batch(lazy_paths(), SETTINGS, out_dir, max_in_flight=2)
+        first = next(gen)
+        assert first.ok
+        # Only the window (plus one refill) has been pulled from the input
+        assert len(pulled) <= 3
+        gen.close()
+
+    def test_iter_batch_results(self, processor, image_paths, out_dir):
+        items = list(processor.iter_batch(image_paths, SETTINGS, out_dir, max_in_flight=1))
+        assert sorted(item.index for item in items) == list(range(5))
+        assert all(os.path.exists(item.output_path) for item in items)
+
+    def test_cancel_stops_submission(self, processor, image_paths, out_dir):
+        gen = processor.iter_batch(image_paths * 20, SETTINGS, out_dir, max_in_flight=2)
+        next(gen)
+        processor.cancel()
+        remaining = list(gen)
+        assert len(remaining) == 0
+        assert len(os.listdir(out_dir)) < 100
+
+
+class TestProcessBackend:
+    def test_invalid_backend(self):
+        with pytest.raises(ValueError):
+            BatchProcessor(backend="gpu")
+
+    def test_process_backend(self, image_paths, out_dir):
+        processor = BatchProcessor(max_workers=2, backend="process")
+        results = processor.process_batch(image_paths, SETTINGS, out_dir)
+        assert results["success"] == 5
+        assert len(os.listdir(out_dir)) == 5
+
+
+class TestProfiling:
+    def test_profile_report(self, image_paths, out_dir):
+        processor = BatchProcessor(max_workers=2, profile=True)
+        results = processor.process_batch(image_paths, SETTINGS, out_dir)
+        stages = results["profile"]["stages"]
+        assert stages["load"]["count"] == 5
+        assert "save" in stages
+        assert results["profile"]["formats"]["PNG"]["count"] == 5
+
+    def test_no_profile_by_default(self, processor, image_paths, out_dir):
+        results = processor.process_batch(image_paths, SETTINGS, out_dir)
+        assert "profile" not in results
+
+    def test_profile_process_backend(self, image_paths, out_dir):
+        processor = BatchProcessor(max_workers=2, backend="process", profile=True)
+        results = processor.process_batch(image_paths, SETTINGS, out_dir)
+        assert results["profile"]["stages"]["effects"]["count"] == 5
+
+
+class TestLiveStats:
+    def test_stats_updated(self, processor, image_paths, out_dir):
+        processor.process_batch(image_paths, SETTINGS, out_dir)
+        stats = processor.stats
+        assert stats.total == 5
+        assert stats.success == 5
+        assert stats.in_flight == 0
+        assert stats.total_input_size == sum(os.path.getsize(p) for p in image_paths)
+        outputs = [os.path.join(out_dir, f) for f in os.listdir(out_dir)]
+        assert stats.total_output_size == sum(os.path.getsize(p) for p in outputs)
+
+    def test_conversions_avoided(self, processor, image_paths, out_dir):
+        settings = dict(SETTINGS, format="JPEG", watermark=True, watermark_text="(c)")
+        processor.process_batch(image_paths, settings, out_dir)
+        assert processor.stats.conversions_avoided == 2 * len(image_paths)
+        assert processor.stats.summary()["conversions_avoided"] == 2 * len(image_paths)
+
+    def test_stats_failure(self, processor, out_dir):
+        processor.process_batch(["/nonexistent/missing.png"], SETTINGS, out_dir)
+        assert processor.stats.failed == 1
+        assert len(processor.stats.errors) == 1
+
+
+class TestAsyncBatch:
+    def test_aiter_batch(self, processor, image_paths, out_dir):
+        async def collect():
+            return [item async for item in processor.aiter_batch(image_paths, SETTINGS, out_dir)]
+
+        results = asyncio.run(collect())
+        assert sorted(item.index for item in results) == list(range(5))
+        assert all(item.ok and os.path.exists(item.output_path) for item in results)
+        assert processor.stats.success == 5
+
+    def test_result_record(self, image_paths, out_dir):
+        processor = BatchProcessor(max_workers=2, profile=True)
+
+        async def first():
+            async for item in processor.aiter_batch(image_paths[:1], SETTINGS, out_dir):
+                return item.as_dict()
+
+        record = asyncio.run(first())
+        json.dumps(record)
+        assert record["path"] == image_paths[0]
+        assert record["status"] == "ok" and record["error"] is None
+        assert record["bytes_in"] > 0 and record["bytes_out"] > 0
+        assert "save" in record["stages"]
+
+    def test_cancellation_stops_submission(self, image_paths, out_dir):
+        processor = BatchProcessor(max_workers=1)
+        original = processor._process_single
+
+        def slow(*args):
+            time.sleep(0.05)
+            return original(*args)
+
+        processor._process_single = slow
+        paths = image_paths * 10  # 50 inputs
+        seen = []
+
+        async def consume():
+            async for item in processor.aiter_batch(paths, SETTINGS, out_dir, max_in_flight=2):
+                seen.append(item)
+
+        async def main():
+            task = asyncio.create_task(consume())
+            while not seen:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        time.sleep(0.2)  # Let the running task finish
+        assert processor.stats.processed < len(paths)
+        assert len(os.listdir(out_dir)) < len(paths)
+
+    def test_early_break(self, processor, image_paths, out_dir):
+        async def first():
+            async for item in processor.aiter_batch(image_paths, SETTINGS, out_dir):
+                return item
+
+        assert asyncio.run(first()).ok
+        # The processor is reusable afterwards
+        assert processor.process_batch(image_paths, SETTINGS, out_dir)["success"] == 5
+
+
+class TestProcessBytes:
+    def test_process_bytes(self, processor, image_paths):
+        with open(image_paths[0], "rb") as f:
+            data = f.read()
+        output, fmt, metrics = processor.process_bytes(data, SETTINGS)
+        assert fmt == "JPEG"
+        assert output[:3] == b"\xff\xd8\xff"
+        assert metrics["bytes_in"] == len(data)
+        assert metrics["bytes_out"] == len(output)
+
+    def test_process_bytes_max_bytes(self, processor, image_paths):
+        with open(image_paths[0], "rb") as f:
+            data = f.read()
+        settings = dict(SETTINGS, quality=95, max_bytes=600)
+        output, _, metrics = processor.process_bytes(data, settings)
+        assert len(output) <= 600
+        assert metrics["encode"]["iterations"] >= 1
+        assert metrics["encode"]["size"] == len(output)
+
+    def test_process_bytes_invalid(self, processor):
+        with pytest.raises(Exception):
+            processor.process_bytes(b"garbage", SETTINGS)
+
+
+class TestOutputNames:
+    def test_same_name_no_overwrite(self, tmp_path, out_dir):
+        paths = []
+        for i in range(6):
+            folder = tmp_path / f"dir_{i}"
+            folder.mkdir()
+            path = str(folder / "photo.png")
+            Image.new("RGB", (50, 50), (i * 30, 0, 0)).save(path)
+            paths.append(path)
+
+        processor = BatchProcessor(max_workers=4)
+        results = processor.process_batch(paths, {"format": "PNG"}, out_dir)
+        assert results["success"] == 6
+        assert len(os.listdir(out_dir)) == 6
+
+    def test_size_placeholders(self, processor, image_paths, out_dir):
+        settings = dict(SETTINGS, rename=True, rename_pattern="img_{num}_{w}x{h}")
+        processor.process_batch(image_paths[:1], settings, out_dir)
+        assert os.listdir(out_dir) == ["img_001_60x45.jpg"]
@@ -0,0 +1,70 @@
+"""
+Test — LRUCache klassi.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_get_put(self):
+        cache = LRUCache()
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+    def test_evicts_least_recent(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_entries=10, max_bytes=10, sizeof=len)
+        cache.put("a", "xxxxxx")
+        cache.put("b", "yyyyyy")
+        assert cache.get("a") is None
+        assert cache.size_bytes == 6
+
+    def test_oversized_not_cached(self):
+        cache = LRUCache(max_bytes=4, sizeof=len)
+        cache.put("a", "xxxxxxxx")
+        assert len(cache) == 0
+
+    def test_get_or_create(self):
+        cache = LRUCache()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return "value"
+
+        assert cache.get_or_create("k", factory) == "value"
+        assert cache.get_or_create("k", factory) == "value"
+        assert len(calls) == 1
+
+    def test_hit_rate(self):
+        cache = LRUCache()
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("missing")
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.hit_rate == 0.5
+        assert cache.info()["entries"] == 1
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == 0
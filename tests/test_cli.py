@@ -0,0 +1,183 @@
+"""
+Test — headless CLI (python -m cli).
+"""
+
+import pytest
+import json
+import os
+import subprocess
+import sys
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from cli.main import (
+    main, parse_override, expand_inputs,
+    EXIT_OK, EXIT_FAILURES, EXIT_USAGE, EXIT_ALL_FAILED, EXIT_NO_INPUT,
+)
+from core.preset_manager import PresetManager
+from utils.validators import ValidationError
+
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+@pytest.fixture
+def src_dir(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(3):
+        Image.new("RGB", (60, 40), (i * 60, 0, 0)).save(str(src / f"img_{i}.png"))
+    (src / "notes.txt").write_text("not an image")
+    return str(src)
+
+
+@pytest.fixture
+def out_dir(tmp_path):
+    return str(tmp_path / "out")
+
+
+def records(capsys):
+    out = capsys.readouterr().out
+    return [json.loads(line) for line in out.splitlines()]
+
+
+class TestParsing:
+    def test_parse_override_json(self):
+        assert parse_override("sepia=true") == ("sepia", True)
+        assert parse_override("quality=70") == ("quality", 70)
+        assert parse_override("watermark_text=Hello") == ("watermark_text", "Hello")
+
+    def test_parse_override_invalid(self):
+        with pytest.raises(ValidationError):
+            parse_override("sepia")
+        with pytest.raises(ValidationError):
+            parse_override("nope=1")
+
+    def test_expand_directory(self, src_dir):
+        paths = list(expand_inputs([src_dir]))
+        assert [os.path.basename(p) for p in paths] == ["img_0.png", "img_1.png", "img_2.png"]
+
+    def test_expand_recursive(self, src_dir):
+        sub = os.path.join(src_dir, "sub")
+        os.mkdir(sub)
+        Image.new("RGB", (10, 10)).save(os.path.join(sub, "deep.png"))
+        assert len(list(expand_inputs([src_dir]))) == 3
+        assert len(list(expand_inputs([src_dir], recursive=True))) == 4
+
+    def test_expand_glob_unmatched(self, src_dir):
+        unmatched = []
+        paths = list(expand_inputs([os.path.join(src_dir, "*_1.png"), "missing/*.jpg"], unmatched))
+        assert len(paths) == 1
+        assert unmatched == ["missing/*.jpg"]
+
+
+class TestConvert:
+    def test_convert_directory(self, src_dir, out_dir, capsys):
+        code = main(["convert", src_dir, "-o", out_dir, "-f", "png", "-j", "2", "-q"])
+        assert code == EXIT_OK
+
+        lines = records(capsys)
+        results = [r for r in lines if r["type"] == "result"]
+        assert len(results) == 3
+        assert all(r["status"] == "ok" and os.path.exists(r["output"]) for r in results)
+        assert lines[-1]["type"] == "summary"
+        assert lines[-1]["success"] == 3
+
+    def test_inline_settings(self, src_dir, out_dir, capsys):
+        code = main(["convert", src_dir, "-o", out_dir, "-f", "PNG",
+                     "--width", "30", "--height", "20", "--set", "grayscale=true", "-q"])
+        assert code == EXIT_OK
+        output = records(capsys)[0]["output"]
+        with Image.open(output) as img:
+            assert img.size == (30, 20)
+            assert img.mode == "L"
+
+    def test_preset(self, src_dir, out_dir, tmp_path, capsys):
+        presets = str(tmp_path / "presets")
+        PresetManager(presets).save("web", {"format": "WEBP", "width": 20, "height": 20})
+        code = main(["convert", src_dir, "-o", out_dir, "-p", "web",
+                     "--presets-dir", presets, "-q"])
+        assert code == EXIT_OK
+        assert records(capsys)[0]["output"].endswith(".webp")
+
+    def test_missing_preset(self, src_dir, out_dir, tmp_path, capsys):
+        code = main(["convert", src_dir, "-o", out_dir, "-p", "nope",
+                     "--presets-dir", str(tmp_path / "presets")])
+        assert code == EXIT_USAGE
+
+    def test_max_size(self, src_dir, out_dir, capsys):
+        code = main(["convert", src_dir, "-o", out_dir, "-f", "JPEG", "--quality", "95",
+                     "--max-size", "1K", "-q"])
+        assert code == EXIT_OK
+        for record in records(capsys)[:-1]:
+            assert record["bytes_out"] <= 1024
+            assert record["encode"]["iterations"] >= 1
+        assert main(["convert", src_dir, "-o", out_dir, "--max-size", "big"]) == EXIT_USAGE
+
+    def test_invalid_format(self, src_dir, out_dir):
+        assert main(["convert", src_dir, "-o", out_dir, "-f", "XYZ"]) == EXIT_USAGE
+
+    def test_partial_failure(self, src_dir, out_dir, capsys):
+        broken = os.path.join(src_dir, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\ntruncated")
+        code = main(["convert", src_dir, "-o", out_dir, "-f", "PNG", "-q"])
+        assert code == EXIT_FAILURES
+        failed = [r for r in records(capsys) if r.get("status") == "failed"]
+        assert failed[0]["path"] == broken
+        assert failed[0]["error"]
+
+    def test_all_failed(self, tmp_path, out_dir):
+        broken = str(tmp_path / "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\ntruncated")
+        assert main(["convert", broken, "-o", out_dir, "-q"]) == EXIT_ALL_FAILED
+
+    def test_no_input(self, tmp_path, out_dir):
+        assert main(["convert", str(tmp_path / "*.png"), "-o", out_dir, "-q"]) == EXIT_NO_INPUT
+
+    def test_resume(self, src_dir, out_dir, capsys):
+        assert main(["convert", src_dir, "-o", out_dir, "--resume", "-q"]) == EXIT_USAGE
+        assert main(["convert", src_dir, "-o", out_dir, "-f", "PNG", "-q"]) == EXIT_OK
+        capsys.readouterr()
+
+        code = main(["convert", src_dir, "-o", out_dir, "-f", "PNG", "--resume", "-q"])
+        assert code == EXIT_OK
+        assert [r["status"] for r in records(capsys)[:-1]] == ["skipped"] * 3
+        assert len([f for f in os.listdir(out_dir) if f.endswith(".png")]) == 3
+
+    def test_explain(self, src_dir, tmp_path, capsys):
+        out_dir = str(tmp_path / "plan")
+        code = main(["convert", src_dir, "-o", out_dir, "--explain",
+                     "--set", "angle=90", "--set", "grayscale=true", "--set", "sepia=true"])
+        assert code == EXIT_OK
+        out = capsys.readouterr().out
+        assert "transpose ROTATE_90" in out and "grayscale+sepia" in out
+        assert not os.path.exists(out_dir)
+
+
+class TestWatch:
+    def test_missing_folder(self, tmp_path, out_dir):
+        assert main(["watch", str(tmp_path / "missing"), "-o", out_dir]) == EXIT_USAGE
+
+    def test_output_inside_folder(self, src_dir):
+        assert main(["watch", src_dir, "-o", src_dir]) == EXIT_USAGE
+
+
+class TestHeadless:
+    def test_no_tkinter_import(self):
+        code = (
+            "import sys; import cli.main; "
+            "assert 'tkinter' not in sys.modules; "
+            "assert not any(m == 'ui' or m.startswith('ui.') for m in sys.modules)"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+    def test_module_entry_point(self, src_dir, out_dir):
+        proc = subprocess.run(
+            [sys.executable, "-m", "cli", "convert", src_dir, "-o", out_dir, "-q"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        assert proc.returncode == EXIT_OK
+        assert json.loads(proc.stdout.splitlines()[-1])["success"] == 3
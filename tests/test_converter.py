@@ -3,6 +3,7 @@ Test — ImageConverter klassi.
 """
 
 import pytest
+import io
 import os
 import tempfile
 from PIL import Image
@@ -84,6 +85,19 @@ class TestConvertFormat:
         result = ImageConverter.convert_format(sample_image, "JPEG")
         assert result.mode == "RGB"
 
+    def test_flatten_onto_white(self):
+        img = Image.new("RGBA", (4, 4), (0, 0, 0, 0))
+        img.putpixel((0, 0), (200, 0, 0, 255))
+        result = ImageConverter.convert_format(img, "JPEG")
+        assert result.getpixel((0, 0)) == (200, 0, 0)
+        assert result.getpixel((3, 3)) == (255, 255, 255)
+
+    def test_target_mode(self):
+        assert ImageConverter.target_mode("RGBA", "WEBP") == "RGB"
+        assert ImageConverter.target_mode("RGBA", "PNG") == "RGBA"
+        assert ImageConverter.target_mode("P", "JPEG") == "RGB"
+        assert ImageConverter.target_mode("L", "JPEG") == "L"
+
     def test_invalid_format(self, sample_image):
         with pytest.raises(ValidationError):
             ImageConverter.convert_format(sample_image, "INVALID")
@@ -122,6 +136,98 @@ class TestSave:
             os.unlink(path)
 
 
+class TestEncoderEffort:
+    @pytest.fixture
+    def photo(self):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        gradient = np.linspace(0, 255, 256, dtype=np.uint8)[None, :, None].repeat(192, 0).repeat(3, 2)
+        noise = rng.integers(0, 24, gradient.shape, dtype=np.uint8)
+        return Image.fromarray(gradient // 2 + noise, "RGB")
+
+    def encode(self, img, fmt, effort, **kwargs):
+        buffer = io.BytesIO()
+        ImageConverter.save(img, buffer, fmt, effort=effort, **kwargs)
+        return buffer.getvalue()
+
+    @pytest.mark.parametrize("fmt", ["JPEG", "PNG", "WEBP", "GIF", "TIFF", "BMP"])
+    @pytest.mark.parametrize("effort", ["fastest", "balanced", "smallest"])
+    def test_all_profiles_decode(self, photo, fmt, effort):
+        img = ImageConverter.convert_format(photo, fmt)
+        with Image.open(io.BytesIO(self.encode(img, fmt, effort))) as out:
+            assert out.size == photo.size
+
+    def test_png_effort_ordering(self, photo):
+        fastest = self.encode(photo, "PNG", "fastest")
+        smallest = self.encode(photo, "PNG", "smallest")
+        assert len(smallest) < len(fastest)
+
+    def test_smallest_jpeg_progressive(self, photo):
+        with Image.open(io.BytesIO(self.encode(photo, "JPEG", "smallest"))) as out:
+            assert out.info.get("progressive")
+
+    def test_webp_lossless(self, photo):
+        data = self.encode(photo, "WEBP", "fastest", lossless=True)
+        with Image.open(io.BytesIO(data)) as out:
+            assert out.convert("RGB").tobytes() == photo.tobytes()
+
+    def test_invalid_effort(self, photo):
+        with pytest.raises(ValidationError):
+            self.encode(photo, "PNG", "turbo")
+
+
+class TestTargetSize:
+    @pytest.fixture(autouse=True)
+    def clear_seeds(self):
+        from core import converter
+        converter._fit_seeds.clear()
+
+    @pytest.fixture
+    def photo(self):
+        import numpy as np
+        rng = np.random.default_rng(1)
+        return Image.fromarray(rng.integers(0, 256, (240, 320, 3), dtype=np.uint8), "RGB")
+
+    def test_fits_budget(self, photo):
+        data, info = ImageConverter.encode_to_size(photo, "JPEG", 40_000, quality=95)
+        assert len(data) <= 40_000 and info["size"] == len(data)
+        assert info["scale"] == 1.0
+        assert 10 <= info["quality"] < 95
+        assert info["iterations"] >= 2
+
+        # Within the tolerance of the best fitting quality
+        above = io.BytesIO()
+        ImageConverter.save(photo, above, "JPEG", info["quality"] + 2)
+        assert above.tell() > 40_000
+
+    def test_already_fits_single_encode(self, photo):
+        data, info = ImageConverter.encode_to_size(photo, "JPEG", 10_000_000, quality=80)
+        assert info == {"quality": 80, "scale": 1.0, "size": len(data), "iterations": 1}
+
+    def test_seed_reduces_iterations(self, photo):
+        _, first = ImageConverter.encode_to_size(photo, "WEBP", 40_000, quality=95)
+        _, second = ImageConverter.encode_to_size(photo, "WEBP", 40_000, quality=95)
+        assert second["quality"] == first["quality"]
+        assert second["iterations"] <= 2 < first["iterations"]
+
+    def test_too_small_without_downscale(self, photo):
+        with pytest.raises(ValueError):
+            ImageConverter.encode_to_size(photo, "JPEG", 2_000)
+
+    def test_downscale(self, photo):
+        data, info = ImageConverter.encode_to_size(photo, "PNG", 20_000, downscale=True)
+        assert len(data) <= 20_000
+        assert info["quality"] is None and info["scale"] < 1
+        with Image.open(io.BytesIO(data)) as out:
+            assert out.width == round(320 * info["scale"])
+
+    def test_save_writes_once(self, photo, tmp_path):
+        path = str(tmp_path / "out.jpg")
+        report = {}
+        ImageConverter.save(photo, path, "JPEG", 95, max_bytes="40K", report=report)
+        assert os.path.getsize(path) == report["size"] <= 40 * 1024
+
+
 class TestLoad:
     def test_load_image(self, sample_image):
         with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
@@ -134,6 +240,54 @@ class TestLoad:
         finally:
             os.unlink(path)
 
+    def test_load_jpeg_draft_scale(self):
+        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as f:
+            path = f.name
+            Image.new("RGB", (2400, 1800), (10, 20, 30)).save(path, "JPEG")
+
+        try:
+            loaded = ImageConverter.load(path, target_size=(200, 200))
+            # Decoded smaller, but still >= REDUCING_GAP x the thumbnail size
+            assert loaded.width < 2400
+            assert loaded.width >= 400 and loaded.height >= 300
+        finally:
+            os.unlink(path)
+
+    def test_load_png_reduce(self):
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+            path = f.name
+            Image.new("RGB", (1600, 1200), (10, 20, 30)).save(path)
+
+        try:
+            loaded = ImageConverter.load(path, target_size=(100, 100))
+            assert loaded.size == (200, 150)
+            assert loaded.format == "PNG"
+        finally:
+            os.unlink(path)
+
+    def test_load_no_upscale(self, sample_image):
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+            path = f.name
+            sample_image.save(path)
+
+        try:
+            loaded = ImageConverter.load(path, target_size=(800, 600))
+            assert loaded.size == (200, 150)
+        finally:
+            os.unlink(path)
+
+    def test_load_scaled_matches_resize(self):
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+            path = f.name
+            Image.new("RGB", (1600, 1200), (10, 20, 30)).save(path)
+
+        try:
+            loaded = ImageConverter.load(path, target_size=(100, 80), maintain_ratio=False)
+            result = ImageConverter.resize(loaded, 100, 80, maintain_ratio=False)
+            assert result.size == (100, 80)
+        finally:
+            os.unlink(path)
+
 
 class TestProcess:
     def test_full_process(self, converter, sample_image):
@@ -10,7 +10,7 @@ from PIL import Image
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from core.dpi_manager import DPIManager
-from core.stats import ProcessingStats
+from core.stats import ProcessingStats, percentile
 
 
 class TestDPIManager:
@@ -118,3 +118,77 @@ class TestProcessingStats:
         assert "B" in ProcessingStats._format_size(500)
         assert "KB" in ProcessingStats._format_size(2048)
         assert "MB" in ProcessingStats._format_size(2 * 1024 * 1024)
+
+    def test_record_success(self):
+        stats = ProcessingStats()
+        stats.start(4)
+        stats.record_success(bytes_in=1000, bytes_out=400)
+        stats.record_success(bytes_in=1000, bytes_out=600)
+        assert stats.success == 2
+        assert stats.processed == 2
+        assert stats.total_input_size == 2000
+        assert stats.total_output_size == 1000
+        assert stats.window_speed > 0
+        assert stats.window_mb_in > 0
+
+    def test_record_failure(self):
+        stats = ProcessingStats()
+        stats.start(2)
+        stats.record_failure("a.png: broken")
+        assert stats.failed == 1
+        assert stats.errors == ["a.png: broken"]
+
+    def test_eta(self):
+        stats = ProcessingStats()
+        stats.start(10)
+        stats.record_success()
+        assert stats.eta is not None and stats.eta > 0
+
+    def test_eta_unknown_total(self):
+        stats = ProcessingStats()
+        stats.start(None)
+        stats.record_success()
+        assert stats.eta is None
+        assert "?" in stats.live_text()
+
+    def test_thread_safe_counters(self):
+        import threading
+        stats = ProcessingStats()
+        stats.start(4000)
+
+        def worker():
+            for _ in range(1000):
+                stats.record_success(bytes_in=10, bytes_out=5)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert stats.success == 4000
+        assert stats.total_input_size == 40000
+
+    def test_live_text(self):
+        stats = ProcessingStats()
+        stats.start(3)
+        stats.update_queue(5, 1)
+        text = stats.live_text()
+        assert "0/3" in text
+        assert "in flight: 5" in text
+
+    def test_percentile(self):
+        ordered = list(range(1, 101))
+        assert percentile(ordered, 0.50) == 50
+        assert percentile(ordered, 0.95) == 95
+        assert percentile([7], 0.95) == 7
+
+    @pytest.mark.parametrize("ordered,fraction,expected", [
+        ([1, 2, 3, 4, 5], 0.50, 3),            # Rank 2.5 -> 3rd value
+        (list(range(1, 31)), 0.95, 29),        # Rank 28.5 -> 29th value
+        (list(range(1, 8)), 0.50, 4),
+        (list(range(1, 101)), 0.07, 7),
+        ([1, 2, 3], 0.0, 1),
+        ([1, 2, 3], 1.0, 3),
+    ])
+    def test_percentile_nearest_rank(self, ordered, fraction, expected):
+        assert percentile(ordered, fraction) == expected
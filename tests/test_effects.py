@@ -109,3 +109,112 @@ class TestApplyAll:
         settings = {}
         result = engine.apply_all(sample_image, settings)
         assert result.size == sample_image.size
+
+
+class TestAdjustColor:
+    @pytest.fixture
+    def noise_image(self):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        return Image.fromarray(rng.integers(0, 256, (60, 80, 3), dtype=np.uint8), "RGB")
+
+    @staticmethod
+    def _max_diff(a, b):
+        import numpy as np
+        return np.abs(np.asarray(a, dtype=int) - np.asarray(b, dtype=int)).max()
+
+    @pytest.mark.parametrize("b,c,s", [(1.2, 1.1, 1.3), (0.7, 1.5, 0.4), (1.0, 1.0, 2.0)])
+    def test_matches_sequential(self, noise_image, b, c, s):
+        expected = EffectsEngine.adjust_saturation(
+            EffectsEngine.adjust_contrast(
+                EffectsEngine.adjust_brightness(noise_image, b), c), s)
+        result = EffectsEngine.adjust_color(noise_image, b, c, s)
+        assert self._max_diff(expected, result) <= 2
+
+    def test_preserves_alpha(self, noise_image):
+        rgba = noise_image.convert("RGBA")
+        rgba.putalpha(77)
+        result = EffectsEngine.adjust_color(rgba, 1.2, 1.1, 1.3)
+        assert result.mode == "RGBA"
+        assert result.getchannel("A").getextrema() == (77, 77)
+
+    def test_grayscale(self, noise_image):
+        gray = noise_image.convert("L")
+        result = EffectsEngine.adjust_color(gray, 1.2, 1.3, 0.5)
+        assert result.mode == "L"
+
+    def test_fallback_mode(self, noise_image):
+        result = EffectsEngine.adjust_color(noise_image.convert("CMYK"), 1.2, 1.1, 1.0)
+        assert result.mode == "CMYK"
+
+    def test_invalid_value(self, sample_image):
+        with pytest.raises(ValidationError):
+            EffectsEngine.adjust_color(sample_image, saturation="abc")
+
+
+class TestVignette:
+    def test_vignette_rgb(self, sample_image):
+        result = EffectsEngine.apply_vignette(sample_image)
+        assert result.mode == "RGB"
+        assert result.size == sample_image.size
+        # Corners darker than center
+        assert result.getpixel((0, 0))[0] < result.getpixel((50, 50))[0]
+
+    def test_vignette_preserves_alpha(self, rgba_image):
+        result = EffectsEngine.apply_vignette(rgba_image)
+        assert result.mode == "RGBA"
+        assert result.getchannel("A").getextrema() == (255, 255)
+
+    def test_vignette_grayscale(self, sample_image):
+        result = EffectsEngine.apply_vignette(sample_image.convert("L"))
+        assert result.mode == "L"
+
+    def test_apply_mask_single_copy(self, rgba_image):
+        import numpy as np
+        mask = EffectsEngine._vignette_mask(*rgba_image.size, 0.5)
+        result = EffectsEngine._apply_mask(rgba_image, mask)
+        expected = np.array(rgba_image)
+        expected[:, :, :3] = (expected[:, :, :3] * mask[:, :, None]).astype(np.uint8)
+        assert np.array_equal(np.asarray(result), expected)
+        assert result.readonly  # Shares the multiplied buffer, no second copy
+
+    def test_mask_cached(self):
+        first = EffectsEngine._vignette_mask(64, 48, 0.5)
+        second = EffectsEngine._vignette_mask(64, 48, 0.5)
+        assert first is second
+        assert first.dtype.name == "float32"
+        assert not first.flags.writeable
+
+    def test_mask_matches_float64(self):
+        import numpy as np
+        mask = EffectsEngine._vignette_mask(40, 30, 0.7)
+        x = np.linspace(-1, 1, 40)
+        y = np.linspace(-1, 1, 30)
+        X, Y = np.meshgrid(x, y)
+        expected = np.clip(1 - np.sqrt(X ** 2 + Y ** 2) * 0.7, 0, 1)
+        assert np.abs(mask - expected).max() < 1e-6
+
+
+class TestSepia:
+    def test_matches_float_matmul(self):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        img = Image.fromarray(rng.integers(0, 256, (40, 50, 3), dtype=np.uint8), "RGB")
+        matrix = np.array([
+            [0.393, 0.769, 0.189],
+            [0.349, 0.686, 0.168],
+            [0.272, 0.534, 0.131],
+        ])
+        expected = np.clip(np.array(img, dtype=np.float64) @ matrix.T, 0, 255).astype(np.uint8)
+        result = np.asarray(EffectsEngine.apply_sepia(img), dtype=int)
+        assert np.abs(result - expected.astype(int)).max() <= 1
+
+    def test_alpha_values_preserved(self):
+        img = Image.new("RGBA", (20, 20), (120, 80, 40, 33))
+        result = EffectsEngine.apply_sepia(img)
+        assert result.getchannel("A").getextrema() == (33, 33)
+
+    def test_after_grayscale(self, sample_image):
+        gray = EffectsEngine.apply_grayscale(sample_image)
+        result = EffectsEngine.apply_sepia(gray)
+        assert result.mode == "RGB"
@@ -0,0 +1,111 @@
+"""
+Test — Fayl nomlari: RenamePattern, OutputNameIndex, generate_output_filename.
+"""
+
+import pytest
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.file_utils import (
+    RenamePattern, OutputNameIndex, compile_rename_pattern, generate_output_filename,
+    make_temp_output,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    OutputNameIndex.reset()
+    yield
+    OutputNameIndex.reset()
+
+
+class TestRenamePattern:
+    def test_placeholders(self):
+        pattern = RenamePattern("{orig}_{num}_{w}x{h}")
+        assert pattern.render(7, "photo", (800, 600)) == "photo_007_800x600"
+
+    def test_date_time(self):
+        name = RenamePattern("{date}_{time}").render(1, "x")
+        assert len(name) == len("2024-01-15_14-30-00")
+
+    def test_literal_braces(self):
+        assert RenamePattern("a{unknown}b").render(1, "x") == "a{unknown}b"
+
+    def test_compiled_once(self):
+        assert compile_rename_pattern("img_{num}") is compile_rename_pattern("img_{num}")
+
+
+class TestOutputNameIndex:
+    def test_existing_files_seeded(self, tmp_dir):
+        open(os.path.join(tmp_dir, "image.jpg"), "w").close()
+        path = OutputNameIndex(tmp_dir).reserve("image", ".jpg")
+        assert os.path.basename(path) == "image_1.jpg"
+
+    def test_sequential_suffixes(self, tmp_dir):
+        index = OutputNameIndex(tmp_dir)
+        names = [os.path.basename(index.reserve("image", ".jpg")) for _ in range(4)]
+        assert names == ["image.jpg", "image_1.jpg", "image_2.jpg", "image_3.jpg"]
+
+    def test_placeholder_created(self, tmp_dir):
+        path = OutputNameIndex(tmp_dir).reserve("a", ".png")
+        assert os.path.exists(path)
+
+    def test_separate_indexes_do_not_collide(self, tmp_dir):
+        # Simulates two worker processes with their own index
+        first = OutputNameIndex(tmp_dir).reserve("image", ".jpg")
+        second = OutputNameIndex(tmp_dir).reserve("image", ".jpg")
+        assert first != second
+
+    def test_thread_safe(self, tmp_dir):
+        index = OutputNameIndex(tmp_dir)
+        results = []
+
+        def worker():
+            for _ in range(50):
+                results.append(index.reserve("image", ".jpg"))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(results)) == 200
+
+    def test_release(self, tmp_dir):
+        index = OutputNameIndex(tmp_dir)
+        path = index.reserve("image", ".jpg")
+        os.remove(path)
+        index.release(path)
+        assert index.reserve("image", ".jpg") == path
+
+
+class TestGenerateOutputFilename:
+    def test_original_name(self, tmp_dir):
+        path = generate_output_filename("/src/photo.png", 1, tmp_dir, "JPEG")
+        assert os.path.basename(path) == "photo.jpg"
+
+    def test_rename_with_size(self, tmp_dir):
+        path = generate_output_filename(
+            "/src/photo.png", 3, tmp_dir, "PNG",
+            rename=True, pattern="img_{num}_{w}x{h}", size=(640, 480)
+        )
+        assert os.path.basename(path) == "img_003_640x480.png"
+
+    def test_no_overwrite(self, tmp_dir):
+        first = generate_output_filename("/a/photo.png", 1, tmp_dir, "JPEG")
+        second = generate_output_filename("/b/photo.png", 2, tmp_dir, "JPEG")
+        assert first != second
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+    def test_published_mode_follows_umask(self, tmp_dir):
+        f, temp_path = make_temp_output(tmp_dir)
+        with f:
+            f.write(b"data")
+        path = generate_output_filename("/src/photo.png", 1, tmp_dir, "PNG", temp_path=temp_path)
+
+        reference = os.path.join(tmp_dir, "reference")
+        open(reference, "wb").close()
+        assert os.stat(path).st_mode & 0o777 == os.stat(reference).st_mode & 0o777
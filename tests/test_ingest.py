@@ -0,0 +1,89 @@
+"""
+Test — ImageIngestor va magic-byte aniqlash.
+"""
+
+import pytest
+import os
+import sys
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.ingest import ImageIngestor, sniff_image_format, sniff_header
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """root/{a.png, b.jpg, notes.txt, fake.png, sub/{c.webp, deep/d.gif}, skip/e.png}"""
+    root = tmp_path / "root"
+    (root / "sub" / "deep").mkdir(parents=True)
+    (root / "skip").mkdir()
+    Image.new("RGB", (8, 8)).save(str(root / "a.png"))
+    Image.new("RGB", (8, 8)).save(str(root / "b.jpg"))
+    (root / "notes.txt").write_text("hello")
+    (root / "fake.png").write_text("not really a png")
+    Image.new("RGB", (8, 8)).save(str(root / "sub" / "c.webp"))
+    Image.new("RGB", (8, 8)).save(str(root / "sub" / "deep" / "d.gif"))
+    Image.new("RGB", (8, 8)).save(str(root / "skip" / "e.png"))
+    return root
+
+
+def names(paths):
+    return [os.path.basename(path) for path in paths]
+
+
+class TestSniff:
+    @pytest.mark.parametrize("fmt", ["JPEG", "PNG", "GIF", "BMP", "TIFF", "WEBP", "ICO"])
+    def test_formats(self, tmp_path, fmt):
+        path = str(tmp_path / "image.bin")  # Extension is irrelevant
+        Image.new("RGB", (16, 16)).save(path, format=fmt)
+        assert sniff_image_format(path) == fmt
+
+    def test_non_image(self):
+        assert sniff_header(b"%PDF-1.7\n") is None
+        assert sniff_header(b"BMfoo but not a bitmap") is None
+        assert sniff_header(b"RIFF\x00\x00\x00\x00WAVEfmt ") is None
+        assert sniff_header(b"") is None
+
+    def test_missing_file(self, tmp_path):
+        assert sniff_image_format(str(tmp_path / "missing.png")) is None
+
+
+class TestImageIngestor:
+    def test_recursive_walk(self, tree):
+        ingestor = ImageIngestor(str(tree))
+        assert names(ingestor) == ["a.png", "b.jpg", "e.png", "c.webp", "d.gif"]
+        assert ingestor.matched == 5
+        assert ingestor.skipped == 2  # notes.txt, fake.png
+
+    def test_non_recursive(self, tree):
+        assert names(ImageIngestor(str(tree), recursive=False)) == ["a.png", "b.jpg"]
+
+    def test_include_exclude(self, tree):
+        assert names(ImageIngestor(str(tree), include=["*.png"])) == ["a.png", "e.png"]
+        assert names(ImageIngestor(str(tree), exclude=["skip", "*.jpg"])) == [
+            "a.png", "c.webp", "d.gif"
+        ]
+        assert names(ImageIngestor(str(tree), include=["sub/*"])) == ["c.webp", "d.gif"]
+
+    def test_explicit_files(self, tree):
+        roots = [str(tree / "a.png"), str(tree / "notes.txt")]
+        assert names(ImageIngestor(roots)) == ["a.png"]
+
+    def test_lazy(self, tree):
+        iterator = iter(ImageIngestor(str(tree)))
+        assert os.path.basename(next(iterator)) == "a.png"
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks unsupported")
+    def test_symlink_loop(self, tree):
+        try:
+            os.symlink(str(tree), str(tree / "sub" / "loop"))
+        except OSError:
+            pytest.skip("cannot create symlinks")
+        assert len(list(ImageIngestor(str(tree)))) == 5
+        assert len(list(ImageIngestor(str(tree), follow_symlinks=True))) == 5
+
+    def test_missing_root(self, tmp_path):
+        ingestor = ImageIngestor(str(tmp_path / "missing"))
+        assert list(ingestor) == []
+        assert ingestor.skipped == 1
@@ -0,0 +1,164 @@
+"""
+Test — BatchJournal va resume rejimi.
+"""
+
+import pytest
+import os
+import sys
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.batch_processor import BatchProcessor
+from core.journal import BatchJournal
+from core.manifest import settings_hash
+from utils.file_utils import TEMP_OUTPUT_PREFIX
+
+
+SETTINGS = {"format": "PNG", "rename": True, "rename_pattern": "out_{num}"}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    paths = []
+    for i in range(5):
+        path = str(src / f"img_{i}.png")
+        Image.new("RGB", (40, 30), (i * 40, 0, 0)).save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def out_dir(tmp_path):
+    path = tmp_path / "out"
+    path.mkdir()
+    return str(path)
+
+
+def outputs(directory):
+    return sorted(name for name in os.listdir(directory) if not name.startswith("."))
+
+
+class TestBatchJournal:
+    def test_roundtrip(self, out_dir):
+        digest = settings_hash(SETTINGS)
+        output = os.path.join(out_dir, "a.png")
+        open(output, "wb").close()
+
+        journal = BatchJournal(out_dir, digest)
+        journal.record(0, "a.jpg", output_path=output)
+        journal.record(1, "b.jpg", error="broken")
+        journal.close()
+
+        resumed = BatchJournal(out_dir, digest, resume=True)
+        assert resumed.completed(0, "a.jpg") == output
+        assert resumed.completed(1, "b.jpg") is None
+        assert resumed.completed(0, "other.jpg") is None
+        resumed.close()
+
+    def test_missing_output_not_completed(self, out_dir):
+        digest = settings_hash(SETTINGS)
+        journal = BatchJournal(out_dir, digest)
+        journal.record(0, "a.jpg", output_path=os.path.join(out_dir, "gone.png"))
+        journal.close()
+
+        resumed = BatchJournal(out_dir, digest, resume=True)
+        assert resumed.completed(0, "a.jpg") is None
+        resumed.close()
+
+    def test_torn_last_line(self, out_dir):
+        digest = settings_hash(SETTINGS)
+        output = os.path.join(out_dir, "a.png")
+        open(output, "wb").close()
+
+        journal = BatchJournal(out_dir, digest)
+        journal.record(0, "a.jpg", output_path=output)
+        journal.close()
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"i": 1, "path": "b.jp')
+
+        resumed = BatchJournal(out_dir, digest, resume=True)
+        assert len(resumed) == 1
+        resumed.close()
+
+    def test_settings_mismatch(self, out_dir):
+        BatchJournal(out_dir, settings_hash(SETTINGS)).close()
+        with pytest.raises(ValueError):
+            BatchJournal(out_dir, settings_hash({"format": "JPEG"}), resume=True)
+
+    def test_batched_flush(self, out_dir):
+        journal = BatchJournal(out_dir, "digest")
+        journal.FLUSH_INTERVAL = 3600
+        journal.record(0, "a.jpg", error="x")
+        with open(journal.path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 1  # Header only, record buffered
+        journal.close()
+        with open(journal.path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 2
+
+
+class TestResume:
+    def test_resume_keeps_numbering(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=1, journal=True)
+        results = processor.iter_batch(sources, SETTINGS, out_dir, max_in_flight=1)
+        next(results)
+        next(results)
+        results.close()  # Interrupted after two images
+        assert len(outputs(out_dir)) == 2
+
+        stats = BatchProcessor(max_workers=2).process_batch(
+            sources, SETTINGS, out_dir, resume=True
+        )
+        assert stats["skipped"] == 2
+        assert stats["success"] == 3
+        assert outputs(out_dir) == [f"out_{n:03d}.png" for n in range(1, 6)]
+
+    def test_resume_after_cancel(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=2, journal=True)
+        for _ in processor.iter_batch(sources, SETTINGS, out_dir):
+            processor.cancel()  # Tasks already running still finish
+        done = outputs(out_dir)
+
+        stats = BatchProcessor(max_workers=2).process_batch(
+            sources, SETTINGS, out_dir, resume=True
+        )
+        assert stats["skipped"] == len(done)
+        assert stats["success"] == 5 - len(done)
+        assert outputs(out_dir) == [f"out_{n:03d}.png" for n in range(1, 6)]
+
+    def test_resume_removes_partial_outputs(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=1, journal=True)
+        processor.process_batch(sources[:1], SETTINGS, out_dir)
+        partial = os.path.join(out_dir, f"{TEMP_OUTPUT_PREFIX}crash.part")
+        open(partial, "wb").close()
+
+        stats = BatchProcessor(max_workers=1).process_batch(
+            sources, SETTINGS, out_dir, resume=True
+        )
+        assert stats["skipped"] == 1
+        assert not os.path.exists(partial)
+
+    def test_resume_retries_failed(self, sources, out_dir, tmp_path):
+        broken = str(tmp_path / "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+        paths = sources[:2] + [broken]
+
+        first = BatchProcessor(max_workers=1, journal=True).process_batch(
+            paths, SETTINGS, out_dir
+        )
+        assert first["failed"] == 1
+
+        Image.new("RGB", (40, 30)).save(broken, format="PNG")
+        second = BatchProcessor(max_workers=1).process_batch(
+            paths, SETTINGS, out_dir, resume=True
+        )
+        assert second["skipped"] == 2
+        assert second["success"] == 1
+
+    def test_no_temp_files_left(self, sources, out_dir):
+        BatchProcessor(max_workers=2).process_batch(sources, SETTINGS, out_dir)
+        assert not any(name.endswith(".part") for name in os.listdir(out_dir))
+        assert len(outputs(out_dir)) == 5
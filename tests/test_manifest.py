@@ -0,0 +1,155 @@
+"""
+Test — BatchManifest va incremental batch rejimi.
+"""
+
+import pytest
+import os
+import sys
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.batch_processor import BatchProcessor
+from core.manifest import BatchManifest, settings_hash, content_hash
+
+
+SETTINGS = {"format": "PNG", "width": 40, "height": 40}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    paths = []
+    for i in range(3):
+        path = str(src / f"img_{i}.png")
+        Image.new("RGB", (80, 60), (i * 50, 0, 0)).save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def out_dir(tmp_path):
+    path = tmp_path / "out"
+    path.mkdir()
+    return str(path)
+
+
+def touch_later(path):
+    """Bump mtime so the change is visible even on coarse timestamps."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+class TestHashes:
+    def test_settings_hash_key_order(self):
+        assert settings_hash({"a": 1, "b": 2}) == settings_hash({"b": 2, "a": 1})
+        assert settings_hash({"a": 1}) != settings_hash({"a": 2})
+
+    def test_content_hash(self, sources):
+        assert content_hash(sources[0]) == content_hash(sources[0])
+        assert content_hash(sources[0]) != content_hash(sources[1])
+
+
+class TestIncremental:
+    def test_second_run_skips(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=2, incremental=True)
+        first = processor.process_batch(sources, SETTINGS, out_dir)
+        assert first["success"] == 3
+
+        second = processor.process_batch(sources, SETTINGS, out_dir)
+        assert second["success"] == 0
+        assert second["skipped"] == 3
+        assert processor.stats.skipped == 3
+        assert len([f for f in os.listdir(out_dir) if f.endswith(".png")]) == 3
+
+    def test_changed_input_reprocessed_in_place(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=2, incremental=True)
+        processor.process_batch(sources, SETTINGS, out_dir)
+
+        Image.new("RGB", (80, 60), (0, 255, 0)).save(sources[0])
+        touch_later(sources[0])
+
+        results = processor.process_batch(sources, SETTINGS, out_dir)
+        assert results["success"] == 1
+        assert results["skipped"] == 2
+        # Previous output overwritten, no _1 copy
+        assert sorted(f for f in os.listdir(out_dir) if f.endswith(".png")) == [
+            "img_0.png", "img_1.png", "img_2.png"
+        ]
+
+    def test_changed_settings_reprocess(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=2, incremental=True)
+        processor.process_batch(sources, SETTINGS, out_dir)
+        results = processor.process_batch(sources, dict(SETTINGS, width=30), out_dir)
+        assert results["success"] == 3
+
+    def test_deleted_output_regenerated(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=2, incremental=True)
+        processor.process_batch(sources, SETTINGS, out_dir)
+        os.remove(os.path.join(out_dir, "img_1.png"))
+        results = processor.process_batch(sources, SETTINGS, out_dir)
+        assert results["success"] == 1
+        assert os.path.exists(os.path.join(out_dir, "img_1.png"))
+
+    def test_content_hash_touch_only(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=2, incremental=True, content_hash=True)
+        processor.process_batch(sources, SETTINGS, out_dir)
+        touch_later(sources[0])
+        results = processor.process_batch(sources, SETTINGS, out_dir)
+        assert results["skipped"] == 3
+
+    def test_content_hash_in_worker(self, sources, out_dir, monkeypatch):
+        import core.manifest
+
+        def not_on_collector(path):
+            raise AssertionError("hashed while recording")
+
+        monkeypatch.setattr(core.manifest, "content_hash", not_on_collector)
+        processor = BatchProcessor(max_workers=2, incremental=True, content_hash=True)
+        processor.process_batch(sources, SETTINGS, out_dir)
+        monkeypatch.undo()
+
+        manifest = BatchManifest(out_dir)
+        for path in sources:
+            assert manifest._entries[manifest._key(path)]["hash"] == content_hash(path)
+
+    def test_touched_input_hashed_in_worker(self, sources, out_dir, monkeypatch):
+        import core.manifest
+
+        processor = BatchProcessor(max_workers=2, incremental=True, content_hash=True)
+        processor.process_batch(sources, SETTINGS, out_dir)
+        touch_later(sources[0])
+        with open(sources[1], "ab") as f:
+            f.write(b"\0")  # Same mtime bump, different size and content
+        touch_later(sources[1])
+
+        def not_on_submitter(path):
+            raise AssertionError("hashed while submitting")
+
+        monkeypatch.setattr(core.manifest, "content_hash", not_on_submitter)
+        results = list(processor.iter_batch(sources, SETTINGS, out_dir))
+        assert [r.status for r in results if r.path == sources[0]] == ["skipped"]
+        assert [r.status for r in results if r.path == sources[1]] == ["ok"]
+
+    def test_saved_during_run(self, sources, out_dir, monkeypatch):
+        import core.batch_processor
+
+        monkeypatch.setattr(core.batch_processor, "MANIFEST_SAVE_INTERVAL", 0)
+        processor = BatchProcessor(max_workers=1, incremental=True)
+        results = processor.iter_batch(sources, SETTINGS, out_dir, max_in_flight=1)
+        next(results)
+        assert len(BatchManifest(out_dir)) == 1  # Before the batch is closed
+        results.close()
+
+    def test_not_incremental_by_default(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=2)
+        processor.process_batch(sources, SETTINGS, out_dir)
+        results = processor.process_batch(sources, SETTINGS, out_dir)
+        assert results["success"] == 3
+        assert not os.path.exists(os.path.join(out_dir, BatchManifest.FILENAME))
+
+    def test_corrupt_manifest_ignored(self, out_dir):
+        with open(os.path.join(out_dir, BatchManifest.FILENAME), "w") as f:
+            f.write("{not json")
+        assert len(BatchManifest(out_dir)) == 0
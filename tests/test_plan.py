@@ -0,0 +1,180 @@
+"""
+Test — Execution plan kompilyatori.
+"""
+
+import pytest
+import os
+import sys
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.converter import ImageConverter
+from core.effects import EffectsEngine
+from core.plan import compile_plan, compile_effects, PlanStep, ExecutionPlan, _canonical_steps
+from utils.validators import ValidationError
+
+
+@pytest.fixture
+def noise_image():
+    rng = np.random.default_rng(1)
+    return Image.fromarray(rng.integers(0, 256, (90, 120, 3), dtype=np.uint8), "RGB")
+
+
+def ops(plan):
+    return [step.op for step in plan.steps]
+
+
+def sequential(img, settings):
+    """Reference: the effects in their declared order, one call each."""
+    engine = EffectsEngine(tile_threshold=float("inf"))
+    for name in ("blur", "grayscale", "sepia"):
+        if settings.get(name):
+            img = getattr(engine, f"apply_{name}")(img)
+    return img
+
+
+def max_diff(a, b):
+    return int(np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16)).max())
+
+
+class TestCompile:
+    def test_noops_dropped(self):
+        plan = compile_plan({"format": "PNG", "angle": 0, "brightness": 1.0,
+                             "sharpness": 1.0, "blur": False})
+        assert ops(plan) == ["convert"]
+        assert plan.format == "PNG"
+
+    def test_full_turn_dropped(self):
+        plan = compile_plan({"angle": 360})
+        assert ops(plan) == ["convert"]
+        assert any("full turn" in note for note in plan.notes)
+
+    @pytest.mark.parametrize("angle,method", [(90, "ROTATE_90"), (-90, "ROTATE_270"),
+                                              (180, "ROTATE_180"), (-270, "ROTATE_90")])
+    def test_right_angle_transpose(self, noise_image, angle, method):
+        plan = compile_plan({"angle": angle, "format": "PNG"})
+        assert plan.steps[0] == PlanStep("transpose", (method,))
+        expected = ImageConverter.rotate(noise_image, angle)
+        assert np.array_equal(np.asarray(plan.run(noise_image)), np.asarray(expected))
+
+    def test_arbitrary_angle_kept(self):
+        assert ops(compile_plan({"angle": 30})) == ["rotate", "convert"]
+
+    def test_gray_sepia_folded(self, noise_image):
+        settings = {"grayscale": True, "sepia": True}
+        steps = compile_effects(settings)
+        assert [step.op for step in steps] == ["gray_sepia"]
+        result = EffectsEngine().apply_steps(noise_image, steps)
+        assert result.mode == "RGB"
+        assert max_diff(result, sequential(noise_image, settings)) <= 1
+
+    def test_gray_sepia_not_folded_before_amplifier(self):
+        steps = compile_effects({"grayscale": True, "sepia": True, "auto_enhance": True})
+        assert [step.op for step in steps] == ["grayscale", "sepia", "auto_enhance"]
+
+    def test_grayscale_hoisted(self, noise_image):
+        steps = compile_effects({"brightness": 0.9, "vignette": True, "grayscale": True})
+        assert [step.op for step in steps] == ["grayscale", "color", "vignette"]
+        result = EffectsEngine().apply_steps(noise_image, steps)
+        assert result.mode == "L"
+
+    def test_grayscale_not_hoisted_past_blur(self):
+        steps = compile_effects({"blur": True, "grayscale": True})
+        assert [step.op for step in steps] == ["blur", "grayscale"]
+
+    def test_grayscale_not_hoisted_before_amplifier(self):
+        steps = compile_effects({"brightness": 0.9, "grayscale": True, "edge_enhance": True})
+        assert [step.op for step in steps] == ["color", "edge_enhance", "grayscale"]
+
+    def test_saturation_dropped_after_grayscale(self):
+        steps = compile_effects({"brightness": 0.9, "saturation": 0.5, "grayscale": True})
+        assert steps == (PlanStep("grayscale"), PlanStep("color", (0.9, 1.0, 1.0)))
+
+    def test_grayscale_not_hoisted_when_clipping(self):
+        steps = compile_effects({"brightness": 1.4, "grayscale": True})
+        assert [step.op for step in steps] == ["color", "grayscale"]
+
+    def test_transpose_stays_before_emboss(self):
+        plan = compile_plan({"angle": 90, "emboss": True, "grayscale": True})
+        assert ops(plan).index("transpose") < ops(plan).index("emboss")
+
+    def test_fan_out_plan(self):
+        plan = compile_plan({"width": 100, "height": 100, "blur": True,
+                             "variants": [{"width": 50}]})
+        assert ops(plan) == ["blur"]
+        assert plan.format is None and plan.decode_size is None
+
+    def test_cached(self):
+        settings = {"blur": True, "format": "WEBP"}
+        assert compile_plan(settings) is compile_plan(dict(settings))
+
+    def test_invalid(self):
+        with pytest.raises(ValidationError):
+            compile_plan({"brightness": "bright"})
+        with pytest.raises(ValidationError):
+            compile_plan({"format": "XYZ"})
+
+    def test_describe(self):
+        text = compile_plan({"angle": 270, "grayscale": True, "sepia": True}).describe((400, 300))
+        assert "Execution plan (400x300 RGB)" in text
+        assert "Rewrites:" in text and "grayscale+sepia" in text
+
+
+class TestExact:
+    @pytest.mark.parametrize("settings", [
+        {"angle": 90, "blur": True, "edge_enhance": True},
+        {"angle": 270, "blur": True, "grayscale": True, "contour": True},
+        {"angle": 180, "sharpness": 1.8, "sharpen": True, "grayscale": True},
+        {"angle": -90, "brightness": 0.9, "grayscale": True, "edge_enhance": True},
+        {"angle": 90, "blur": True, "grayscale": True, "auto_enhance": True},
+        {"angle": 90, "vignette": True, "emboss": True, "grayscale": True},
+        {"angle": 270, "sharpen": True, "grayscale": True, "sepia": True, "auto_enhance": True},
+    ])
+    def test_matches_canonical_order(self, noise_image, settings):
+        settings = dict(settings, format="PNG")
+        result = compile_plan(settings).run(noise_image)
+        expected = ExecutionPlan(*_canonical_steps(settings)).run(noise_image)
+        assert result.mode == expected.mode
+        assert np.array_equal(np.asarray(result), np.asarray(expected))
+
+
+class TestModes:
+    WATERMARK = {"watermark": True, "watermark_text": "(c)", "format": "JPEG"}
+
+    def test_watermark_native(self):
+        plan = compile_plan(self.WATERMARK)
+        assert plan.conversions("RGB") == (0, 2)
+        assert plan.conversions("L") == (0, 2)     # L -> RGBA, then flattened for JPEG
+        assert plan.conversions("RGBA") == (1, 0)  # One flatten at the end
+
+    def test_no_conversions(self):
+        assert compile_plan({"blur": True, "format": "PNG"}).conversions("RGB") == (0, 0)
+
+    def test_grayscale_watermark_stays_l(self, noise_image):
+        settings = dict(self.WATERMARK, grayscale=True)
+        result = compile_plan(settings).run(noise_image)
+        assert result.mode == "L"
+        assert compile_plan(settings).conversions("RGB") == (1, 2)
+
+
+class TestRun:
+    def test_matches_converter_steps(self, noise_image):
+        settings = {"width": 60, "height": 60, "angle": 30, "format": "JPEG"}
+        result = compile_plan(settings).run(noise_image)
+        expected = ImageConverter.resize(noise_image, 60, 60)
+        expected = ImageConverter.convert_format(ImageConverter.rotate(expected, 30), "JPEG")
+        assert np.array_equal(np.asarray(result), np.asarray(expected))
+
+    def test_watermark_keeps_caller_image(self, noise_image):
+        original = noise_image.tobytes()
+        plan = compile_plan({"watermark": True, "watermark_text": "(c)", "format": "PNG"})
+        result = plan.run(noise_image)
+        assert result is not noise_image and noise_image.tobytes() == original
+        assert plan.run(noise_image.copy(), owned=True).tobytes() == result.tobytes()
+
+    def test_grayscale_source(self, noise_image):
+        gray = noise_image.convert("L")
+        result = EffectsEngine().apply_steps(gray, compile_effects({"grayscale": True}))
+        assert result is gray
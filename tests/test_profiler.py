@@ -0,0 +1,100 @@
+"""
+Test — StageTimer va StageProfiler.
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.profiler import StageProfiler, StageTimer
+from core.stats import ProcessingStats
+
+
+class TestStageTimer:
+    def test_records_stage(self):
+        timer = StageTimer()
+        with timer.stage("load"):
+            sum(range(1000))
+        wall, cpu = timer.stages["load"]
+        assert wall >= 0
+        assert cpu >= 0
+
+    def test_disabled(self):
+        timer = StageTimer(enabled=False)
+        with timer.stage("load"):
+            pass
+        assert timer.stages == {}
+
+
+class TestStageProfiler:
+    def test_percentiles(self):
+        profiler = StageProfiler()
+        for i in range(1, 101):
+            profiler.record({"load": (i / 1000, 0.0)}, "JPEG", 1.0)
+        report = profiler.report()
+        load = report["stages"]["load"]
+        assert load["count"] == 100
+        assert abs(load["p50"] - 50) < 1e-6
+        assert abs(load["p95"] - 95) < 1e-6
+        assert abs(load["p99"] - 99) < 1e-6
+
+    def test_percentiles_odd_count(self):
+        profiler = StageProfiler()
+        for i in range(1, 31):
+            profiler.record({"load": (i / 1000, 0.0)}, "JPEG", 1.0)
+        load = profiler.report()["stages"]["load"]
+        assert abs(load["p50"] - 15) < 1e-6
+        assert abs(load["p95"] - 29) < 1e-6  # Nearest rank, not rounded down
+        assert abs(load["p99"] - 30) < 1e-6
+
+    def test_format_breakdown(self):
+        profiler = StageProfiler()
+        profiler.record({"load": (0.01, 0.01), "save": (0.01, 0.01)}, "JPEG", 2.0)
+        profiler.record({"load": (0.02, 0.02)}, "PNG", 1.0)
+        report = profiler.report()
+        assert report["formats"]["JPEG"]["count"] == 1
+        assert abs(report["formats"]["JPEG"]["megapixels_per_s"] - 100.0) < 1e-6
+        assert report["megapixels"] == 3.0
+
+    def test_stage_order(self):
+        profiler = StageProfiler()
+        profiler.record({"save": (0.1, 0.1), "load": (0.1, 0.1)})
+        assert list(profiler.report()["stages"]) == ["load", "save"]
+
+    def test_bounded_samples(self):
+        profiler = StageProfiler()
+        profiler.MAX_SAMPLES = 10
+        profiler.start()
+        for _ in range(100):
+            profiler.record({"load": (0.001, 0.0)})
+        assert profiler.report()["stages"]["load"]["count"] == 100
+        assert len(profiler._wall["load"].values) == 10
+
+    def test_thread_safe(self):
+        profiler = StageProfiler()
+
+        def worker():
+            for _ in range(500):
+                profiler.record({"load": (0.001, 0.0)}, "JPEG", 0.1)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert profiler.report()["stages"]["load"]["count"] == 2000
+
+    def test_report_text(self):
+        profiler = StageProfiler()
+        profiler.record({"load": (0.01, 0.01)}, "JPEG", 1.0)
+        assert "load" in profiler.report_text()
+
+    def test_stats_summary(self):
+        profiler = StageProfiler()
+        profiler.record({"load": (0.01, 0.01)}, "JPEG", 1.0)
+        stats = ProcessingStats()
+        stats.start(1)
+        stats.profile = profiler.report()
+        assert "load" in stats.summary()["profile"]["stages"]
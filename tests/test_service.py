@@ -0,0 +1,213 @@
+"""
+Test — ConversionService (lokal HTTP servis).
+"""
+
+import pytest
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from service.server import ConversionService
+
+
+def png_bytes(size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def http(port, method, path, body=b"", headers=None):
+    """Send one request and return (status, headers, body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost",
+             f"Content-Length: {len(body)}", "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+
+    head, _, payload = data.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    return int(status_line.split()[1]), response_headers, payload
+
+
+def run_service(test, **kwargs):
+    """Run test(service) against a started service on a free port."""
+    kwargs.setdefault("max_workers", 2)
+
+    async def main():
+        service = ConversionService({"format": "PNG", "quality": 85}, port=0, **kwargs)
+        await service.start()
+        try:
+            return await test(service)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+class TestConvert:
+    def test_convert(self):
+        async def test(service):
+            return await http(service.port, "POST", "/convert", png_bytes(),
+                              {"X-Settings": json.dumps({"format": "WEBP", "grayscale": True})})
+
+        status, headers, body = run_service(test)
+        assert status == 200
+        assert headers["content-type"] == "image/webp"
+        assert headers["x-image-format"] == "WEBP"
+        with Image.open(io.BytesIO(body)) as img:
+            assert img.format == "WEBP"
+            assert img.size == (64, 48)
+
+    def test_settings_query_parameter(self):
+        async def test(service):
+            query = '{"width":32,"height":32}'
+            return await http(service.port, "POST", f"/convert?settings={query}", png_bytes())
+
+        status, _, body = run_service(test)
+        assert status == 200
+        with Image.open(io.BytesIO(body)) as img:
+            assert img.size == (32, 24)
+
+    def test_bad_requests(self):
+        async def test(service):
+            port = service.port
+            return [
+                (await http(port, "POST", "/convert", b""))[0],
+                (await http(port, "POST", "/convert", png_bytes(), {"X-Settings": "{oops"}))[0],
+                (await http(port, "POST", "/convert", png_bytes(), {"X-Settings": '{"nope": 1}'}))[0],
+                (await http(port, "POST", "/convert", png_bytes(), {"X-Settings": '{"format": "XYZ"}'}))[0],
+                (await http(port, "POST", "/convert", b"not an image"))[0],
+                (await http(port, "GET", "/convert"))[0],
+                (await http(port, "GET", "/missing"))[0],
+            ]
+
+        assert run_service(test) == [400, 400, 400, 400, 422, 405, 404]
+
+    def test_internal_error(self):
+        async def test(service):
+            def broken(data, settings):
+                raise RuntimeError("worker died")
+
+            service._task = broken
+            return await http(service.port, "POST", "/convert", png_bytes())
+
+        status, _, body = run_service(test)
+        assert status == 500
+        assert "worker died" in json.loads(body)["error"]
+
+    def test_body_too_large(self):
+        async def test(service):
+            return await http(service.port, "POST", "/convert", png_bytes())
+
+        status, _, _ = run_service(test, max_body=10)
+        assert status == 413
+
+
+class TestBackpressure:
+    def test_429_when_saturated(self):
+        async def test(service):
+            convert = service._task
+
+            def slow(data, settings):
+                time.sleep(0.3)
+                return convert(data, settings)
+
+            service._task = slow
+            responses = await asyncio.gather(
+                http(service.port, "POST", "/convert", png_bytes()),
+                http(service.port, "POST", "/convert", png_bytes()),
+            )
+            return sorted(status for status, _, _ in responses), responses
+
+        statuses, responses = run_service(test, max_workers=1, max_queue=0)
+        assert statuses == [200, 429]
+        rejected = next(headers for status, headers, _ in responses if status == 429)
+        assert rejected["retry-after"] == "1"
+
+    def test_429_before_reading_body(self):
+        async def test(service):
+            convert = service._task
+
+            def slow(data, settings):
+                time.sleep(0.5)
+                return convert(data, settings)
+
+            service._task = slow
+            busy = asyncio.ensure_future(http(service.port, "POST", "/convert", png_bytes()))
+            await asyncio.sleep(0.1)
+
+            # Header only: a rejection must not wait for the announced upload
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            writer.write(b"POST /convert HTTP/1.1\r\nHost: x\r\n"
+                         b"Content-Length: 50000000\r\n\r\n")
+            await writer.drain()
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 2.0)
+            writer.close()
+            return int(head.split()[1]), (await busy)[0]
+
+        assert run_service(test, max_workers=1, max_queue=0) == (429, 200)
+
+
+class TestMetrics:
+    def test_metrics_and_health(self):
+        async def test(service):
+            await http(service.port, "POST", "/convert", png_bytes())
+            health = await http(service.port, "GET", "/health")
+            metrics = await http(service.port, "GET", "/metrics")
+            return health, json.loads(metrics[2])
+
+        health, metrics = run_service(test)
+        assert health[0] == 200
+        assert metrics["converted"] == 1
+        assert metrics["requests"] == 3
+        assert metrics["bytes_in"] > 0 and metrics["bytes_out"] > 0
+        assert metrics["latency"]["p50"] > 0
+        assert metrics["in_flight"] == 0 and metrics["queued"] == 0
+        assert metrics["capacity"]["workers"] == 2
+        assert "stamps" in metrics["watermark_cache"]
+
+    def test_latency_percentiles(self):
+        service = ConversionService({"format": "PNG"}, port=0)
+        service._latencies.extend(i / 1000 for i in range(1, 6))
+        latency = service.metrics()["latency"]
+        assert latency["p50"] == pytest.approx(3.0)  # ms; rank 2.5 -> 3rd
+        assert latency["p95"] == pytest.approx(5.0)
+        assert latency["max"] == pytest.approx(5.0)
+
+    def test_keep_alive(self):
+        async def test(service):
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            statuses = []
+            for _ in range(2):
+                writer.write(b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n")
+                await writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                await reader.readexactly(length)
+                statuses.append(int(head.split()[1]))
+            writer.close()
+            return statuses
+
+        assert run_service(test) == [200, 200]
+
+
+class TestProcessBackend:
+    def test_process_pool(self):
+        async def test(service):
+            return await http(service.port, "POST", "/convert", png_bytes())
+
+        status, _, _ = run_service(test, backend="process", max_workers=1)
+        assert status == 200
@@ -0,0 +1,116 @@
+"""
+Test — TileEngine klassi.
+"""
+
+import pytest
+import os
+import struct
+import sys
+import zlib
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.batch_processor import BatchProcessor
+from core.effects import EffectsEngine
+from core.tiles import TileEngine
+
+
+@pytest.fixture
+def noise_image():
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (260, 330, 3), dtype=np.uint8), "RGB")
+
+
+def write_bilevel_png(path, width, height):
+    """Write a huge but tiny 1-bit PNG row by row (never held in memory)."""
+    def chunk(f, tag, data):
+        f.write(struct.pack(">I", len(data)) + tag + data)
+        f.write(struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    compressor = zlib.compressobj(9)
+    row = b"\x00" + b"\xaa" * ((width + 7) // 8)
+    data = b"".join(compressor.compress(row) for _ in range(height)) + compressor.flush()
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        chunk(f, b"IHDR", struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0))
+        chunk(f, b"IDAT", data)
+        chunk(f, b"IEND", b"")
+
+
+def full_frame(img, settings):
+    """Reference: apply_all without tiling."""
+    return EffectsEngine(tile_threshold=float("inf")).apply_all(img, settings)
+
+
+SETTINGS = [
+    {"blur": True},
+    {"sharpen": True, "emboss": True},
+    {"edge_enhance": True, "contour": True},
+    {"sepia": True, "vignette": True},
+    {
+        "brightness": 1.2, "contrast": 1.3, "saturation": 0.8, "sharpness": 1.5,
+        "blur": True, "contour": True, "grayscale": True, "vignette": True,
+    },
+    # Compiled with grayscale first: color tables from the tiled L histogram
+    {"brightness": 0.8, "contrast": 0.7, "blur": True, "grayscale": True},
+]
+
+
+class TestTileEngine:
+    @pytest.mark.parametrize("settings", SETTINGS)
+    def test_matches_full_frame(self, noise_image, settings):
+        engine = TileEngine(memory_cap=60_000)  # Forces many small tiles
+        assert engine.tile_size(engine.margin(settings)) < noise_image.width
+        expected = np.asarray(full_frame(noise_image, settings))
+        result = np.asarray(engine.apply(noise_image, settings))
+        assert np.array_equal(expected, result)
+
+    def test_rgba(self, noise_image):
+        rgba = noise_image.convert("RGBA")
+        settings = {"blur": True, "vignette": True}
+        result = TileEngine(memory_cap=60_000).apply(rgba, settings)
+        assert result.mode == "RGBA"
+        assert np.array_equal(np.asarray(result), np.asarray(full_frame(rgba, settings)))
+
+    def test_no_effects(self, noise_image):
+        assert TileEngine().apply(noise_image, {}) is noise_image
+
+    def test_margin(self):
+        assert TileEngine.margin({"sharpen": True, "emboss": True}) == 2
+        assert TileEngine.margin({"sepia": True}) == 0
+
+    def test_supports(self, noise_image):
+        assert TileEngine.supports(noise_image, {"blur": True})
+        assert not TileEngine.supports(noise_image, {"auto_enhance": True})
+        assert not TileEngine.supports(noise_image.convert("P"), {"blur": True})
+
+    def test_tile_size_respects_cap(self):
+        small = TileEngine(memory_cap=1024 * 1024).tile_size(8)
+        large = TileEngine(memory_cap=64 * 1024 * 1024).tile_size(8)
+        assert small < large
+
+    def test_estimate_peak_bytes(self):
+        engine = TileEngine(memory_cap=1000)
+        assert engine.estimate_peak_bytes((100, 100), "RGB") == 2 * 30000 + 1000
+
+    def test_apply_all_dispatch(self, noise_image):
+        engine = EffectsEngine(tile_threshold=1000, tile_memory=60_000)
+        settings = {"blur": True, "sepia": True}
+        result = engine.apply_all(noise_image, settings)
+        assert np.array_equal(np.asarray(result), np.asarray(full_frame(noise_image, settings)))
+
+    def test_above_default_pixel_limit(self, tmp_path):
+        # 13400 x 13400 = 180 MP, past Pillow's default bomb limit (~179 MP)
+        path = str(tmp_path / "huge.png")
+        write_bilevel_png(path, 13400, 13400)
+        out = tmp_path / "out"
+        out.mkdir()
+
+        results = list(BatchProcessor(max_workers=1).iter_batch(
+            [path], {"format": "PNG", "width": 100, "height": 100}, str(out)
+        ))
+        assert results[0].ok, results[0].error
+        with Image.open(results[0].output_path) as img:
+            assert img.size == (100, 100)
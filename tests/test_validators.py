@@ -18,6 +18,8 @@ from utils.validators import (
     validate_format,
     validate_opacity,
     validate_effect_value,
+    validate_effort,
+    validate_max_bytes,
 )
 
 
@@ -101,6 +103,40 @@ class TestValidateFormat:
             validate_format("INVALID")
 
 
+class TestValidateEffort:
+    def test_valid_effort(self):
+        assert validate_effort("fastest") == "fastest"
+        assert validate_effort(" Smallest ") == "smallest"
+
+    def test_invalid_effort(self):
+        with pytest.raises(ValidationError):
+            validate_effort("turbo")
+
+
+class TestValidateMaxBytes:
+    def test_units(self):
+        assert validate_max_bytes(150000) == 150000
+        assert validate_max_bytes("150K") == 150 * 1024
+        assert validate_max_bytes("150 kb") == 150 * 1024
+        assert validate_max_bytes("1.5M") == 1536 * 1024
+
+    def test_disabled(self):
+        assert validate_max_bytes(None) is None
+        assert validate_max_bytes("") is None
+        assert validate_max_bytes(0) is None
+
+    def test_invalid(self):
+        with pytest.raises(ValidationError):
+            validate_max_bytes("lots")
+        with pytest.raises(ValidationError):
+            validate_max_bytes(-1)
+
+    @pytest.mark.parametrize("value", ["inf", "-inf", "nan", "1e400K", float("inf")])
+    def test_non_finite(self, value):
+        with pytest.raises(ValidationError):
+            validate_max_bytes(value)
+
+
 class TestValidateOpacity:
     def test_valid(self):
         assert validate_opacity(0.5) == 0.5
@@ -0,0 +1,180 @@
+"""
+Test — Multi-output variants (bitta decode, bir nechta natija).
+"""
+
+import pytest
+import os
+import sys
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.batch_processor import BatchProcessor
+from core.converter import ImageConverter
+from core.variants import parse_variants, decode_size
+from utils.validators import ValidationError
+
+
+SRCSET = {
+    "format": "JPEG",
+    "quality": 80,
+    "variants": [
+        {"width": 400},
+        {"width": 200, "format": "WEBP", "quality": 70},
+        {"width": 100},
+        {"width": 100, "format": "PNG", "suffix": "_thumb"},
+    ],
+}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    paths = []
+    for i in range(3):
+        path = str(src / f"img_{i}.jpg")
+        Image.new("RGB", (800, 600), (i * 60, 120, 200)).save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def out_dir(tmp_path):
+    path = tmp_path / "out"
+    path.mkdir()
+    return str(path)
+
+
+class TestParseVariants:
+    def test_defaults_and_overrides(self):
+        variants = parse_variants(SRCSET)
+        assert [v.suffix for v in variants] == ["_400w", "_200w", "_100w", "_thumb"]
+        assert [v.format for v in variants] == ["JPEG", "WEBP", "JPEG", "PNG"]
+        assert variants[1].settings["quality"] == 70
+        assert variants[0].settings["quality"] == 80
+        assert "variants" not in variants[0].settings
+
+    def test_no_variants(self):
+        assert parse_variants({"format": "PNG"}) == []
+
+    def test_duplicate_names(self):
+        with pytest.raises(ValidationError):
+            parse_variants({"variants": [{"width": 100}, {"width": 100, "quality": 50}]})
+
+    def test_invalid(self):
+        with pytest.raises(ValidationError):
+            parse_variants({"variants": [{"width": 100, "colour": "red"}]})
+        with pytest.raises(ValidationError):
+            parse_variants({"variants": [{"width": 100, "format": "XYZ"}]})
+        with pytest.raises(ValidationError):
+            parse_variants({"maintain_ratio": False, "variants": [{"width": 100}]})
+
+    def test_decode_size(self):
+        variants = parse_variants({"variants": [{"width": 400, "height": 300},
+                                                {"width": 200, "height": 500}]})
+        assert decode_size(variants) == (400, 500)
+        assert decode_size(variants, rotated=True) == (500, 500)
+        assert decode_size(parse_variants({"variants": [{"format": "PNG"}]})) is None
+
+
+class TestFanOut:
+    def test_outputs(self, sources, out_dir):
+        processor = BatchProcessor(max_workers=2)
+        results = list(processor.iter_batch(sources[:1], SRCSET, out_dir))
+
+        assert len(results) == 1 and results[0].ok
+        variants = results[0].metrics["variants"]
+        names = [os.path.basename(v["output"]) for v in variants]
+        assert names == ["img_0_400w.jpg", "img_0_200w.webp", "img_0_100w.jpg", "img_0_thumb.png"]
+        assert results[0].output_path == variants[0]["output"]
+        assert results[0].metrics["bytes_out"] == sum(v["bytes"] for v in variants)
+
+        for variant, width in zip(variants, (400, 200, 100, 100)):
+            with Image.open(variant["output"]) as img:
+                assert img.size == (width, width * 3 // 4)
+                assert img.format == variant["format"]
+
+    def test_decodes_once(self, sources, out_dir, monkeypatch):
+        calls = []
+        load = ImageConverter.load
+
+        def counting_load(*args, **kwargs):
+            calls.append(args)
+            return load(*args, **kwargs)
+
+        monkeypatch.setattr(ImageConverter, "load", staticmethod(counting_load))
+        results = BatchProcessor(max_workers=2).process_batch(sources, SRCSET, out_dir)
+
+        assert results["success"] == 3
+        assert len(calls) == 3
+        assert all(target == (400, 20000) for _, target, _ in calls)
+        assert len(os.listdir(out_dir)) == 12
+
+    def test_matches_separate_runs(self, sources, out_dir, tmp_path):
+        BatchProcessor().process_batch(sources[:1], {"variants": [{"width": 200, "format": "PNG"}]},
+                                       out_dir)
+        single = str(tmp_path / "single")
+        os.mkdir(single)
+        BatchProcessor().process_batch(sources[:1], {"width": 200, "height": 20000,
+                                                     "format": "PNG"}, single)
+
+        with Image.open(os.path.join(out_dir, "img_0_200w.png")) as fanned, \
+                Image.open(os.path.join(single, "img_0.png")) as separate:
+            assert fanned.size == separate.size
+
+    def test_failed_encode_publishes_nothing(self, sources, out_dir):
+        settings = {"format": "JPEG", "variants": [{"width": 400},
+                                                   {"width": 100, "max_bytes": 10}]}
+        results = list(BatchProcessor().iter_batch(sources[:1], settings, out_dir))
+        assert not results[0].ok
+        assert os.listdir(out_dir) == []
+
+    def test_failed_publish_releases_names(self, sources, out_dir, monkeypatch):
+        publish = BatchProcessor._publish
+        calls = []
+
+        def failing_publish(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                os.remove(args[0])  # The temp file, as _publish does on failure
+                raise OSError("disk full")
+            return publish(*args, **kwargs)
+
+        monkeypatch.setattr(BatchProcessor, "_publish", staticmethod(failing_publish))
+        settings = {"format": "PNG", "variants": [{"width": 400}, {"width": 100}]}
+        results = list(BatchProcessor().iter_batch(sources[:1], settings, out_dir))
+        assert not results[0].ok
+        assert os.listdir(out_dir) == []
+
+        monkeypatch.undo()
+        results = list(BatchProcessor().iter_batch(sources[:1], settings, out_dir))
+        assert results[0].ok
+        assert sorted(os.listdir(out_dir)) == ["img_0_100w.png", "img_0_400w.png"]
+
+    def test_incremental_overwrites_variants(self, sources, out_dir):
+        processor = BatchProcessor(incremental=True)
+        first = list(processor.iter_batch(sources[:1], SRCSET, out_dir))[0]
+
+        changed = dict(SRCSET, quality=60)
+        second = list(processor.iter_batch(sources[:1], changed, out_dir))[0]
+        assert [v["output"] for v in second.metrics["variants"]] == \
+            [v["output"] for v in first.metrics["variants"]]
+
+        third = list(processor.iter_batch(sources[:1], changed, out_dir))[0]
+        assert third.skipped
+
+    def test_shared_flatten(self, tmp_path, out_dir):
+        path = str(tmp_path / "alpha.png")
+        Image.new("RGBA", (400, 300), (10, 20, 30, 100)).save(path)
+        processor = BatchProcessor()
+        settings = {"variants": [{"width": 200, "format": "JPEG"}, {"width": 100, "format": "WEBP"}]}
+        result = list(processor.iter_batch([path], settings, out_dir))[0]
+        assert result.ok
+        assert result.metrics["conversions_avoided"] == 1
+        assert processor.stats.conversions_avoided == 1
+
+    def test_profile_accumulates_stages(self, sources, out_dir):
+        processor = BatchProcessor(profile=True)
+        result = list(processor.iter_batch(sources[:1], SRCSET, out_dir))[0]
+        assert {"load", "resize", "save", "filename"} <= set(result.metrics["stages"])
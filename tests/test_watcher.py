@@ -0,0 +1,182 @@
+"""
+Test — FolderWatcher (watch-folder rejimi).
+"""
+
+import pytest
+import os
+import sys
+import threading
+import time
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.batch_processor import BatchProcessor
+from core.watcher import FolderWatcher
+
+
+SETTINGS = {"format": "PNG"}
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    return str(inbox), str(tmp_path / "out")
+
+
+def make_watcher(inbox, out, **kwargs):
+    kwargs.setdefault("interval", 0.01)
+    kwargs.setdefault("settle_time", 0.05)
+    return FolderWatcher(BatchProcessor(max_workers=2), SETTINGS, inbox, out, **kwargs)
+
+
+def poll_until(watcher, count, timeout=5.0):
+    """Poll until count results have been collected."""
+    results = []
+    deadline = time.monotonic() + timeout
+    while len(results) < count and time.monotonic() < deadline:
+        results.extend(watcher.poll())
+        time.sleep(watcher.interval)
+    return results
+
+
+def drop(inbox, name, color=(255, 0, 0)):
+    path = os.path.join(inbox, name)
+    Image.new("RGB", (32, 24), color).save(path, format="PNG")
+    return path
+
+
+class TestFolderWatcher:
+    def test_converts_new_file(self, dirs):
+        inbox, out = dirs
+        watcher = make_watcher(inbox, out)
+        watcher.start()
+        try:
+            path = drop(inbox, "a.png")
+            results = poll_until(watcher, 1)
+        finally:
+            watcher.close()
+
+        assert len(results) == 1
+        assert results[0].ok and results[0].path == path
+        assert os.path.exists(results[0].output_path)
+        assert results[0].metrics["latency"] >= 0.05
+        assert watcher.counters()["converted"] == 1
+
+    def test_waits_for_stable_size(self, dirs):
+        inbox, out = dirs
+        watcher = make_watcher(inbox, out, settle_time=0.3)
+        watcher.start()
+        try:
+            path = os.path.join(inbox, "upload.png")
+            with open(path, "wb") as f:
+                f.write(b"\x89PNG\r\n\x1a\n")  # Upload in progress
+            watcher.poll()
+            assert watcher.counters()["settling"] == 1
+
+            Image.new("RGB", (32, 24)).save(path, format="PNG")
+            results = poll_until(watcher, 1)
+        finally:
+            watcher.close()
+
+        assert len(results) == 1 and results[0].ok
+
+    def test_ignores_non_images_and_hidden(self, dirs):
+        inbox, out = dirs
+        watcher = make_watcher(inbox, out)
+        watcher.start()
+        try:
+            with open(os.path.join(inbox, "notes.txt"), "w") as f:
+                f.write("hello")
+            drop(inbox, ".hidden.png")
+            watcher.poll()
+            time.sleep(0.1)
+            watcher.poll()
+        finally:
+            watcher.close()
+
+        counters = watcher.counters()
+        assert counters["ignored"] == 1
+        assert counters["detected"] == 1
+        assert counters["backlog"] == 0
+
+    def test_modified_file_overwrites_output(self, dirs):
+        inbox, out = dirs
+        watcher = make_watcher(inbox, out)
+        watcher.start()
+        try:
+            path = drop(inbox, "a.png")
+            first = poll_until(watcher, 1)[0]
+            stat = os.stat(path)
+            drop(inbox, "a.png", color=(0, 255, 0))
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+            second = poll_until(watcher, 1)[0]
+        finally:
+            watcher.close()
+
+        assert second.output_path == first.output_path
+        assert len(os.listdir(out)) == 2  # Output + manifest
+
+    def test_restart_skips_unchanged(self, dirs):
+        inbox, out = dirs
+        drop(inbox, "a.png")
+        watcher = make_watcher(inbox, out)
+        watcher.start()
+        poll_until(watcher, 1)
+        watcher.close()
+
+        restarted = make_watcher(inbox, out)
+        restarted.start()
+        try:
+            results = poll_until(restarted, 1)
+        finally:
+            restarted.close()
+        assert results[0].skipped
+
+    def test_run_and_stop(self, dirs):
+        inbox, out = dirs
+        watcher = make_watcher(inbox, out)
+        results = []
+        thread = threading.Thread(target=watcher.run, args=(results.append,))
+        thread.start()
+        drop(inbox, "a.png")
+        deadline = time.monotonic() + 5
+        while not results and time.monotonic() < deadline:
+            time.sleep(0.01)
+        watcher.stop()
+        thread.join(5)
+
+        assert not thread.is_alive()
+        assert len(results) == 1 and results[0].ok
+
+    def test_output_inside_watched_folder(self, dirs):
+        inbox, _ = dirs
+        with pytest.raises(ValueError):
+            make_watcher(inbox, inbox)
+        with pytest.raises(ValueError):
+            make_watcher(inbox, os.path.join(inbox, "out"), recursive=True)
+        make_watcher(inbox, os.path.join(inbox, "out"))  # Subfolders are not watched
+
+    def test_latency_counters(self, dirs):
+        inbox, out = dirs
+        watcher = make_watcher(inbox, out)
+        assert watcher.counters()["latency"]["p50"] is None
+        watcher.start()
+        try:
+            for i in range(3):
+                drop(inbox, f"{i}.png")
+            poll_until(watcher, 3)
+        finally:
+            watcher.close()
+
+        latency = watcher.counters()["latency"]
+        assert latency["p50"] <= latency["p95"] <= latency["max"]
+
+    def test_latency_percentiles(self, dirs):
+        watcher = make_watcher(*dirs)
+        watcher._latencies.extend(float(i) for i in range(30, 0, -1))
+        latency = watcher.counters()["latency"]
+        assert latency["p50"] == 15.0
+        assert latency["p95"] == 29.0  # Nearest rank (28.5 -> 29th)
+        assert latency["max"] == 30.0
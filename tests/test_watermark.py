@@ -5,10 +5,11 @@ Test — WatermarkEngine klassi.
 import pytest
 import os
 import sys
-from PIL import Image
+from PIL import Image, ImageDraw
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from core import watermark
 from core.watermark import WatermarkEngine
 
 
@@ -47,6 +48,17 @@ class TestWatermark:
         result = engine.add_text_watermark(rgba_image, "RGBA Test")
         assert result.mode == "RGBA"
 
+    def test_native_modes(self, engine, sample_image):
+        gray = engine.add_text_watermark(sample_image.convert("L"), "Gray", opacity=1.0)
+        assert gray.mode == "L"
+        assert gray.getextrema()[0] < 255  # Shadow drawn
+        assert engine.add_text_watermark(sample_image.convert("P"), "P").mode == "RGBA"
+
+    def test_matches_rgba_composite(self, engine, sample_image):
+        result = engine.add_text_watermark(sample_image, "Test", opacity=0.6)
+        via_rgba = engine.add_text_watermark(sample_image.convert("RGBA"), "Test", opacity=0.6)
+        assert result.tobytes() == via_rgba.convert("RGB").tobytes()
+
     def test_empty_text(self, engine, sample_image):
         result = engine.add_text_watermark(sample_image, "")
         assert result.size == sample_image.size
@@ -58,3 +70,89 @@ class TestWatermark:
     def test_full_opacity(self, engine, sample_image):
         result = engine.add_text_watermark(sample_image, "Test", opacity=1.0)
         assert result is not None
+
+
+def reference_watermark(img, text, position="bottom-right", opacity=0.5, font_size=24):
+    """Reference: text and shadow drawn into a full-size layer per image."""
+    layer = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    font = WatermarkEngine._load_font(font_size)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    x, y = WatermarkEngine._calculate_position(
+        img.size, (bbox[2] - bbox[0], bbox[3] - bbox[1]), position
+    )
+    draw.text((x + 2, y + 2), text, fill=(0, 0, 0, int(128 * opacity)), font=font)
+    draw.text((x, y), text, fill=(255, 255, 255, int(255 * opacity)), font=font)
+    return Image.alpha_composite(img.convert("RGBA"), layer)
+
+
+class TestStampCache:
+    @pytest.fixture(autouse=True)
+    def clear_caches(self):
+        watermark._fonts.clear()
+        watermark._stamps.clear()
+
+    @pytest.mark.parametrize("position", ["top-left", "top-right", "bottom-left",
+                                          "bottom-right", "center"])
+    def test_matches_reference(self, engine, rgba_image, position):
+        result = engine.add_text_watermark(rgba_image, "Sprite Qg", position, opacity=0.7)
+        expected = reference_watermark(rgba_image, "Sprite Qg", position, opacity=0.7)
+        assert result.tobytes() == expected.tobytes()
+
+    def test_clipped_stamp(self, engine):
+        tiny = Image.new("RGBA", (30, 20), (90, 90, 90, 255))
+        result = engine.add_text_watermark(tiny, "Much wider than the image")
+        assert result.tobytes() == reference_watermark(tiny, "Much wider than the image").tobytes()
+
+    def test_hit_rate(self, engine, sample_image):
+        for _ in range(4):
+            engine.add_text_watermark(sample_image, "Cached", opacity=0.4)
+        WatermarkEngine().add_text_watermark(sample_image, "Cached", opacity=0.4)
+
+        info = WatermarkEngine.cache_info()
+        assert info["stamps"]["misses"] == 1 and info["stamps"]["hits"] == 4
+        assert info["fonts"]["misses"] == 1
+
+    def test_keyed_by_opacity_and_size(self, engine, sample_image):
+        engine.add_text_watermark(sample_image, "Key", opacity=0.4)
+        engine.add_text_watermark(sample_image, "Key", opacity=0.8)
+        engine.add_text_watermark(sample_image, "Key", opacity=0.8, font_size=40)
+        assert WatermarkEngine.cache_info()["stamps"]["entries"] == 3
+
+
+class TestRegionComposite:
+    def test_only_stamp_region_changes(self, engine):
+        img = Image.new("RGB", (800, 600), (40, 80, 120))
+        result = engine.add_text_watermark(img, "Corner", position="bottom-right")
+        changed = Image.frombytes("L", img.size, bytes(
+            a != b for a, b in zip(img.convert("L").tobytes(), result.convert("L").tobytes())
+        )).getbbox()
+        assert changed is not None
+        assert changed[0] > 600 and changed[1] > 500  # Within the bottom-right stamp
+
+    def test_composites_stamp_size(self, engine, rgba_image, monkeypatch):
+        sizes = []
+        composite = Image.alpha_composite
+
+        def recording(base, layer):
+            sizes.append(base.size)
+            return composite(base, layer)
+
+        monkeypatch.setattr(Image, "alpha_composite", recording)
+        engine.add_text_watermark(rgba_image, "Small")
+        assert len(sizes) == 1
+        assert sizes[0][0] * sizes[0][1] < rgba_image.width * rgba_image.height // 10
+
+    def test_in_place(self, engine, sample_image):
+        original = sample_image.tobytes()
+        copy = engine.add_text_watermark(sample_image, "Copy")
+        assert copy is not sample_image and sample_image.tobytes() == original
+
+        result = engine.add_text_watermark(sample_image, "Copy", in_place=True)
+        assert result is sample_image
+        assert result.tobytes() == copy.tobytes()
+
+    def test_stamp_larger_than_image(self, engine):
+        img = Image.new("RGB", (10, 10), (0, 0, 0))
+        result = engine.add_text_watermark(img, "Off", position="center", font_size=200)
+        assert result.size == img.size
@@ -8,7 +8,6 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import queue
-import time
 from PIL import Image, ImageTk
 
 from config.constants import (
@@ -345,13 +344,16 @@ class ImageConverterApp:
             messagebox.showwarning("Warning", "Processing is already in progress.")
             return
 
+        if self.main_tab.scanning:
+            messagebox.showwarning("Warning", "Still adding files from a folder, please wait.")
+            return
+
         save_dir = filedialog.askdirectory(title="Select output folder")
         if not save_dir:
             return
 
         self.output_dir = save_dir
         self.processing = True
-        self._start_time = time.time()
 
         # Lock UI
         self.main_tab.process_btn.config(state="disabled")
@@ -401,19 +403,9 @@ class ImageConverterApp:
 
                 if msg_type == "progress":
                     idx, total, filename, status = data
-                    self.main_tab.progress["value"] = idx + 1
                     self.main_tab.status_label.config(text=f"Status: {filename}")
-                    self.status_bar.set_status(f"Processing {idx+1}/{total}...")
                     self.log.info(status)
 
-                    # Time calculation
-                    elapsed = time.time() - self._start_time
-                    if idx + 1 > 0:
-                        remaining = (elapsed / (idx + 1)) * (total - idx - 1)
-                        self.main_tab.time_label.config(
-                            text=f"⏱️ Elapsed: {int(elapsed)}s | Remaining: {int(remaining)}s"
-                        )
-
                 elif msg_type == "complete":
                     self._process_complete(data)
 
@@ -425,11 +417,25 @@ class ImageConverterApp:
 
         except queue.Empty:
             if self.processing:
+                self._update_live_stats()
                 self.root.after(100, self._check_queue)
 
+    def _update_live_stats(self):
+        """Refresh progress bar, status bar and timing from live batch stats."""
+        stats = self.batch_processor.stats
+        self.main_tab.progress["value"] = stats.processed
+        self.status_bar.set_status(f"Processing {stats.live_text()}")
+
+        eta = stats.eta
+        remaining = f"{int(eta)}s" if eta is not None else "--"
+        self.main_tab.time_label.config(
+            text=f"⏱️ Elapsed: {int(stats.elapsed)}s | Remaining: {remaining}"
+        )
+
     def _process_complete(self, results):
         """Handle processing completion."""
-        elapsed = time.time() - self._start_time
+        stats = self.batch_processor.stats
+        elapsed = stats.elapsed
 
         success = results["success"]
         failed = results["failed"]
@@ -438,6 +444,8 @@ class ImageConverterApp:
             f"Done! {success} successful, {failed} failed. "
             f"Time: {elapsed:.1f}s"
         )
+        for line in stats.summary_text().splitlines():
+            self.log.info(line)
 
         if results["errors"]:
             for err in results["errors"]:
@@ -4,23 +4,35 @@ File selection, conversion settings, preview.
 """
 
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 
 from config.constants import (
     SUPPORTED_FORMATS, ROTATION_ANGLES, DEFAULT_WIDTH,
-    DEFAULT_HEIGHT, DEFAULT_QUALITY, FILE_FILTER, FONT_FAMILY
+    DEFAULT_HEIGHT, DEFAULT_QUALITY, FILE_FILTER, FONT_FAMILY,
+    ENCODER_EFFORTS, DEFAULT_EFFORT
 )
 from ui.widgets.labeled_scale import LabeledScale
+from utils.ingest import ImageIngestor
 
 
 class MainTab(ttk.Frame):
     """Main tab — file selection, conversion settings, and basic effects."""
 
+    # How often paths found by a folder scan are moved into the list (ms),
+    # and at most how many per poll
+    SCAN_POLL_MS = 100
+    SCAN_CHUNK = 500
+
     def __init__(self, parent, app, **kwargs):
         super().__init__(parent, **kwargs)
         self.app = app
+        self._scan_queue = None  # Paths from the folder scan thread (None = idle)
+        self._scan_stop = None
+        self._scan_added = 0
 
         self._create_file_section()
         self._create_conversion_section()
@@ -41,6 +53,9 @@ class MainTab(ttk.Frame):
         self.select_btn = ttk.Button(btn_frame, text="📂 Select Images", command=self._select_images)
         self.select_btn.pack(side="left", padx=3)
 
+        self.folder_btn = ttk.Button(btn_frame, text="📁 Add Folder", command=self._select_folder)
+        self.folder_btn.pack(side="left", padx=3)
+
         self.clear_btn = ttk.Button(btn_frame, text="🗑️ Clear", command=self._clear_selection)
         self.clear_btn.pack(side="left", padx=3)
 
@@ -140,6 +155,20 @@ class MainTab(ttk.Frame):
         )
         self.quality_scale.pack(fill="x", pady=3)
 
+        # Encoder effort
+        effort_frame = ttk.Frame(right)
+        effort_frame.pack(fill="x", pady=3)
+        ttk.Label(effort_frame, text="Encoder effort:").pack(side="left")
+        self.effort_var = tk.StringVar(value=DEFAULT_EFFORT)
+        ttk.OptionMenu(effort_frame, self.effort_var, DEFAULT_EFFORT, *ENCODER_EFFORTS).pack(side="right")
+
+        # Output size budget (empty = none)
+        budget_frame = ttk.Frame(right)
+        budget_frame.pack(fill="x", pady=3)
+        ttk.Label(budget_frame, text="Max size (e.g. 150K):").pack(side="left")
+        self.max_size_entry = ttk.Entry(budget_frame, width=8)
+        self.max_size_entry.pack(side="right")
+
     # ========== Basic Effects ==========
 
     def _create_basic_effects_section(self):
@@ -215,8 +244,84 @@ class MainTab(ttk.Frame):
             self._update_file_list()
             self.app.log.info(f"{len(new_paths)} image(s) selected.")
 
+    @property
+    def scanning(self):
+        """Whether a folder scan is still adding files."""
+        return self._scan_queue is not None
+
+    def _select_folder(self):
+        """Add all images under a folder (recursive, detected by content).
+
+        The folder is walked and sniffed on a worker thread; the paths it
+        finds are added to the list in chunks, so the UI stays responsive
+        on large trees.
+        """
+        if self.scanning:
+            return
+        folder = filedialog.askdirectory(title="Select image folder")
+        if not folder:
+            return
+
+        found, stop = queue.Queue(), threading.Event()
+
+        def scan():
+            try:
+                for path in ImageIngestor(folder):
+                    if stop.is_set():
+                        break
+                    found.put(path)
+            finally:
+                found.put(None)  # Scan finished
+
+        self._scan_queue, self._scan_stop, self._scan_added = found, stop, 0
+        self.folder_btn.config(state="disabled")
+        self.file_label.config(text=f"Scanning {folder}...")
+        threading.Thread(target=scan, daemon=True).start()
+        self.after(self.SCAN_POLL_MS, self._poll_scan, folder, found)
+
+    def _poll_scan(self, folder, found):
+        """Move the paths found so far by the folder scan into the list."""
+        if found is not self._scan_queue:
+            return  # Stopped by Clear
+
+        chunk, finished = [], False
+        try:
+            while len(chunk) < self.SCAN_CHUNK:
+                path = found.get_nowait()
+                if path is None:
+                    finished = True
+                    break
+                chunk.append(path)
+        except queue.Empty:
+            pass
+
+        if chunk:
+            self.app.image_paths.extend(chunk)
+            for path in chunk:
+                self.file_listbox.insert(tk.END, os.path.basename(path))
+            self._scan_added += len(chunk)
+            self._update_file_count()
+
+        if finished:
+            self._end_scan()
+            self._update_file_count()
+            self.app.log.info(f"{self._scan_added} image(s) added from {folder}.")
+        else:
+            self.file_label.config(text=f"Scanning... {len(self.app.image_paths)} file(s)")
+            # More may be waiting: come back right after the UI has redrawn
+            delay = 1 if len(chunk) == self.SCAN_CHUNK else self.SCAN_POLL_MS
+            self.after(delay, self._poll_scan, folder, found)
+
+    def _end_scan(self):
+        """Stop the folder scan thread (if running) and re-enable the button."""
+        if self._scan_stop is not None:
+            self._scan_stop.set()
+        self._scan_queue = self._scan_stop = None
+        self.folder_btn.config(state="normal")
+
     def _clear_selection(self):
         """Clear file selection."""
+        self._end_scan()
         self.app.image_paths.clear()
         self._update_file_list()
         self.app.log.info("Selection cleared.")
@@ -226,7 +331,10 @@ class MainTab(ttk.Frame):
         self.file_listbox.delete(0, tk.END)
         for path in self.app.image_paths:
             self.file_listbox.insert(tk.END, os.path.basename(path))
+        self._update_file_count()
 
+    def _update_file_count(self):
+        """Update the file count label, status bar and file buttons."""
         count = len(self.app.image_paths)
         self.file_label.config(text=f"Selected files: {count}")
         self.app.status_bar.set_file_count(count)
@@ -284,6 +392,8 @@ class MainTab(ttk.Frame):
             "maintain_ratio": self.maintain_ratio_var.get(),
             "angle": rotate_angle,
             "quality": int(self.quality_scale.get()),
+            "effort": self.effort_var.get(),
+            "max_bytes": self.max_size_entry.get().strip(),
             "brightness": self.brightness_scale.get(),
             "contrast": self.contrast_scale.get(),
         }
@@ -311,5 +421,9 @@ class MainTab(ttk.Frame):
             self.rotate_entry.insert(0, str(angle))
 
         self.quality_scale.set(settings.get("quality", DEFAULT_QUALITY))
+        self.effort_var.set(settings.get("effort", DEFAULT_EFFORT))
+        self.max_size_entry.delete(0, tk.END)
+        if settings.get("max_bytes"):
+            self.max_size_entry.insert(0, str(settings["max_bytes"]))
         self.brightness_scale.set(settings.get("brightness", 1.0))
         self.contrast_scale.set(settings.get("contrast", 1.0))
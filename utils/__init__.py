@@ -1,3 +1,5 @@
 from utils.validators import *
 from utils.file_utils import *
 from utils.logger import AppLogger
+from utils.cache import LRUCache
+from utils.ingest import ImageIngestor, sniff_image_format
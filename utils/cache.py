@@ -0,0 +1,117 @@
+"""
+Image Converter Pro — Thread-safe LRU cache.
+Bounded by entry count and (optionally) total size, with hit-rate counters.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache.
+
+    Attributes:
+        max_entries: Maximum number of cached values
+        max_bytes: Maximum total size of cached values (None = unlimited)
+        hits: Number of successful lookups
+        misses: Number of failed lookups
+    """
+
+    def __init__(self, max_entries=16, max_bytes=None, sizeof=None):
+        """Create LRUCache.
+
+        Args:
+            max_entries: Maximum number of cached values
+            max_bytes: Maximum total size in bytes (requires sizeof)
+            sizeof: Function returning the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key (marks it recently used)."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Store a value, evicting least recently used entries as needed.
+
+        Values larger than max_bytes on their own are not cached.
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for key, creating it with factory() on a miss.
+
+        The factory runs outside the lock, so two threads may build the
+        same value concurrently; the last one wins. Values must not be
+        mutated by callers.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def size_bytes(self):
+        """Total size of cached values in bytes."""
+        return self._bytes
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups served from the cache (0.0-1.0)."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def info(self):
+        """Return cache counters.
+
+        Returns:
+            dict: {"hits", "misses", "hit_rate", "entries", "bytes"}
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self._data),
+            "bytes": self._bytes,
+        }
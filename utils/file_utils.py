@@ -3,21 +3,264 @@ Image Converter Pro — File utility functions.
 Filename generation, folder operations, file info.
 """
 
+import functools
 import os
 import platform
+import re
 import subprocess
+import tempfile
+import threading
 from datetime import datetime
 
 
+# Prefix of in-progress output files (see make_temp_output)
+TEMP_OUTPUT_PREFIX = ".icp-"
+
+
+class RenamePattern:
+    """Rename pattern compiled once into literal and placeholder tokens.
+
+    Supports placeholders:
+        {num}  -> sequential number (001, 002, ...)
+        {orig} -> original filename (without extension)
+        {date} -> current date (2024-01-15)
+        {time} -> current time (14-30-00)
+        {w}    -> image width
+        {h}    -> image height
+    """
+
+    PLACEHOLDER_RE = re.compile(r"\{(num|orig|date|time|w|h)\}")
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.tokens = []  # (is_placeholder, text)
+        pos = 0
+        for match in self.PLACEHOLDER_RE.finditer(pattern):
+            if match.start() > pos:
+                self.tokens.append((False, pattern[pos:match.start()]))
+            self.tokens.append((True, match.group(1)))
+            pos = match.end()
+        if pos < len(pattern):
+            self.tokens.append((False, pattern[pos:]))
+        self.uses_clock = any(
+            is_ph and text in ("date", "time") for is_ph, text in self.tokens
+        )
+
+    def render(self, num, orig, size=None):
+        """Render the pattern for one file.
+
+        Args:
+            num: Sequential number
+            orig: Original filename (without extension)
+            size: (width, height) of the output image, for {w}/{h}
+
+        Returns:
+            str: Rendered name (without extension)
+        """
+        now = datetime.now() if self.uses_clock else None
+        width, height = size if size else ("", "")
+        values = {
+            "num": f"{num:03d}",
+            "orig": orig,
+            "date": now.strftime("%Y-%m-%d") if now else "",
+            "time": now.strftime("%H-%M-%S") if now else "",
+            "w": str(width),
+            "h": str(height),
+        }
+        return "".join(values[text] if is_ph else text for is_ph, text in self.tokens)
+
+
+@functools.lru_cache(maxsize=32)
+def compile_rename_pattern(pattern):
+    """Compile a rename pattern (cached, so each pattern is parsed once).
+
+    Returns:
+        RenamePattern: Compiled pattern
+    """
+    return RenamePattern(pattern)
+
+
+class OutputNameIndex:
+    """Hands out unique output filenames in one directory.
+
+    The directory is listed once with os.scandir; afterwards names are
+    reserved in O(1) under a lock, with a per-name counter for the _N
+    suffixes. Each reserved name is also claimed on disk atomically
+    (hard link of a finished temp file, or an O_EXCL placeholder), which
+    keeps names unique across worker processes that each hold their own
+    index.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._taken = set()
+        self._counters = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    self._taken.add(os.path.normcase(entry.name))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def for_dir(cls, directory):
+        """Return the shared index for a directory (created on first use)."""
+        key = os.path.normcase(os.path.abspath(directory))
+        with cls._registry_lock:
+            index = cls._registry.get(key)
+            if index is None:
+                index = cls._registry[key] = cls(directory)
+            return index
+
+    @classmethod
+    def reset(cls, directory=None):
+        """Forget the shared index of a directory (or all), e.g. between batches."""
+        with cls._registry_lock:
+            if directory is None:
+                cls._registry.clear()
+            else:
+                cls._registry.pop(os.path.normcase(os.path.abspath(directory)), None)
+
+    def _claim(self, filename, source=None):
+        """Try to take a filename (caller holds the lock)."""
+        key = os.path.normcase(filename)
+        if key in self._taken:
+            return False
+        self._taken.add(key)
+        target = os.path.join(self.directory, filename)
+        try:
+            if source is not None:
+                publish_file(source, target)
+            else:
+                os.close(os.open(target, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False  # Created by another process
+        except OSError:
+            self._taken.discard(key)  # Nothing was created
+            raise
+        return True
+
+    def reserve(self, name, ext, source=None):
+        """Reserve a unique filename.
+
+        Args:
+            name: Desired name (without extension)
+            ext: Extension including the dot
+            source: Finished temp file to publish under the reserved name.
+                Without it, the name is created as an empty placeholder.
+
+        Returns:
+            str: Full path of the reserved file
+        """
+        with self._lock:
+            filename = f"{name}{ext}"
+            if not self._claim(filename, source):
+                counter = self._counters.get((name, ext), 1)
+                while True:
+                    filename = f"{name}_{counter}{ext}"
+                    counter += 1
+                    if self._claim(filename, source):
+                        break
+                self._counters[(name, ext)] = counter
+            return os.path.join(self.directory, filename)
+
+    def release(self, path):
+        """Make a reserved name available again (e.g. after a failed save)."""
+        with self._lock:
+            self._taken.discard(os.path.normcase(os.path.basename(path)))
+
+
+def publish_file(source, target):
+    """Atomically move a finished file to target, failing if target exists.
+
+    Uses a hard link (atomic create-if-absent), falling back to an
+    O_EXCL placeholder plus os.replace() where hard links are not
+    supported.
+
+    Raises:
+        FileExistsError: If target already exists
+    """
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        raise
+    except OSError:
+        os.close(os.open(target, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        os.replace(source, target)
+        return
+    os.remove(source)
+
+
+def _read_umask():
+    """Current process umask (os.umask can only be read by setting it)."""
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import, while no worker threads can race the set/restore
+_UMASK = _read_umask()
+
+
+def make_temp_output(save_dir):
+    """Create a hidden temp file for writing an output before publishing.
+
+    mkstemp() creates the file owner-only (0600); it is opened up to the
+    mode a plain open() would give (0666 minus the umask), since it is
+    published as-is.
+
+    Returns:
+        tuple: (file object opened "wb", temp path)
+    """
+    fd, path = tempfile.mkstemp(dir=save_dir, prefix=TEMP_OUTPUT_PREFIX, suffix=".part")
+    if hasattr(os, "fchmod"):
+        os.fchmod(fd, 0o666 & ~_UMASK)
+    return os.fdopen(fd, "wb"), path
+
+
+def remove_temp_outputs(save_dir):
+    """Delete temp outputs left behind by an interrupted batch.
+
+    Returns:
+        int: Number of files removed
+    """
+    removed = 0
+    try:
+        with os.scandir(save_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(TEMP_OUTPUT_PREFIX) and entry.name.endswith(".part"):
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except OSError:
+                        pass
+    except FileNotFoundError:
+        pass
+    return removed
+
+
 def generate_output_filename(input_path, num, save_dir, fmt,
-                              rename=False, pattern=""):
-    """Generate output filename with optional renaming patterns.
+                              rename=False, pattern="", size=None,
+                              temp_path=None, suffix=""):
+    """Generate and reserve a unique output filename.
 
     Supports placeholders:
         {num}  -> sequential number (001, 002, ...)
         {orig} -> original filename (without extension)
         {date} -> current date (2024-01-15)
         {time} -> current time (14-30-00)
+        {w}    -> image width
+        {h}    -> image height
+
+    Names come from the shared OutputNameIndex of save_dir, so
+    concurrent workers never get the same name. With temp_path, that
+    finished file is atomically published under the name; otherwise the
+    returned file is created empty as a placeholder for the caller to
+    overwrite.
 
     Args:
         input_path: Original file path
@@ -26,6 +269,9 @@ def generate_output_filename(input_path, num, save_dir, fmt,
         fmt: Output format (JPEG, PNG, etc.)
         rename: Whether to use rename pattern
         pattern: Rename pattern string
+        size: (width, height) of the output image, for {w}/{h}
+        temp_path: Finished temp file to publish (see make_temp_output)
+        suffix: Appended to the name (e.g. "_800w" for an output variant)
 
     Returns:
         str: Full output file path
@@ -36,26 +282,11 @@ def generate_output_filename(input_path, num, save_dir, fmt,
     original_name = os.path.splitext(os.path.basename(input_path))[0]
 
     if rename and pattern:
-        now = datetime.now()
-        name = pattern.replace("{num}", f"{num:03d}")
-        name = name.replace("{orig}", original_name)
-        name = name.replace("{date}", now.strftime("%Y-%m-%d"))
-        name = name.replace("{time}", now.strftime("%H-%M-%S"))
+        name = compile_rename_pattern(pattern).render(num, original_name, size)
     else:
         name = original_name
 
-    filename = f"{name}{ext}"
-    output_path = os.path.join(save_dir, filename)
-
-    # Prevent overwriting existing files
-    counter = 1
-    base_name = name
-    while os.path.exists(output_path):
-        name = f"{base_name}_{counter}"
-        output_path = os.path.join(save_dir, f"{name}{ext}")
-        counter += 1
-
-    return output_path
+    return OutputNameIndex.for_dir(save_dir).reserve(name + suffix, ext, source=temp_path)
 
 
 def open_folder(folder_path):
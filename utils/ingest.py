@@ -0,0 +1,173 @@
+"""
+Image Converter Pro — Streaming directory ingestion.
+Walks directory trees lazily and identifies images by their magic bytes.
+"""
+
+import fnmatch
+import os
+
+
+# (offset, signature, format) — checked against the first SNIFF_BYTES bytes
+IMAGE_SIGNATURES = (
+    (0, b"\xff\xd8\xff", "JPEG"),
+    (0, b"\x89PNG\r\n\x1a\n", "PNG"),
+    (0, b"GIF87a", "GIF"),
+    (0, b"GIF89a", "GIF"),
+    (0, b"II*\x00", "TIFF"),
+    (0, b"MM\x00*", "TIFF"),
+    (8, b"WEBP", "WEBP"),       # RIFF container, checked with the RIFF tag below
+    (0, b"\x00\x00\x01\x00", "ICO"),
+    (0, b"BM", "BMP"),
+)
+SNIFF_BYTES = 16
+
+
+def sniff_header(header):
+    """Identify an image format from the leading bytes of a file.
+
+    Args:
+        header: First bytes of the file (at least SNIFF_BYTES for all formats)
+
+    Returns:
+        str or None: PIL format name, None if not a supported image
+    """
+    for offset, signature, fmt in IMAGE_SIGNATURES:
+        if header[offset:offset + len(signature)] != signature:
+            continue
+        if fmt == "WEBP" and header[:4] != b"RIFF":
+            continue
+        if fmt == "BMP" and header[6:10] != b"\x00\x00\x00\x00":
+            continue  # Reserved header fields are always zero
+        return fmt
+    return None
+
+
+def sniff_image_format(path):
+    """Identify an image file by its magic bytes (reads SNIFF_BYTES bytes).
+
+    Args:
+        path: File path
+
+    Returns:
+        str or None: PIL format name, None if not a supported image or unreadable
+    """
+    try:
+        with open(path, "rb") as f:
+            return sniff_header(f.read(SNIFF_BYTES))
+    except OSError:
+        return None
+
+
+class ImageIngestor:
+    """Lazily yields the image files under a set of files and directories.
+
+    Directories are read one at a time with os.scandir (sorted per
+    directory, depth-first), so the first paths are available after a
+    single directory listing no matter how large the tree is. Files are
+    recognised by magic bytes, not extension; anything else is skipped
+    after reading SNIFF_BYTES bytes.
+
+    Patterns without a "/" match the file or directory name, others the
+    path relative to the root, e.g. "*.jpg" or "raw/**". Excluded
+    directories are not descended into.
+
+    Attributes:
+        scanned: Directory entries examined
+        matched: Image files yielded
+        skipped: Files skipped (filtered out or not an image)
+    """
+
+    def __init__(self, roots, recursive=True, include=None, exclude=None,
+                 follow_symlinks=False, on_error=None):
+        """Create ImageIngestor.
+
+        Args:
+            roots: File and directory paths
+            recursive: Descend into subdirectories
+            include: Glob patterns a file must match (any of); None = all
+            exclude: Glob patterns of files and directories to skip
+            follow_symlinks: Follow symlinked directories (each directory
+                is visited once, so symlink loops are harmless)
+            on_error: Called with (path, OSError) for unreadable
+                directories; they are skipped silently when None
+        """
+        if isinstance(roots, (str, os.PathLike)):
+            roots = [roots]
+        self.roots = [os.fspath(root) for root in roots]
+        self.recursive = recursive
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.follow_symlinks = follow_symlinks
+        self.on_error = on_error
+        self.scanned = 0
+        self.matched = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _matches(patterns, name, relpath):
+        """Check a name / relative path against glob patterns."""
+        for pattern in patterns:
+            target = relpath if "/" in pattern else name
+            if fnmatch.fnmatch(target, pattern):
+                return True
+        return False
+
+    def _accept_file(self, path, name, relpath):
+        """Apply include/exclude filters and sniff the file."""
+        if self.include and not self._matches(self.include, name, relpath):
+            return False
+        if self.exclude and self._matches(self.exclude, name, relpath):
+            return False
+        return sniff_image_format(path) is not None
+
+    def __iter__(self):
+        visited = set()  # (st_dev, st_ino) of walked directories
+
+        for root in self.roots:
+            if not os.path.isdir(root):
+                self.scanned += 1
+                name = os.path.basename(root)
+                if self._accept_file(root, name, name):
+                    self.matched += 1
+                    yield root
+                else:
+                    self.skipped += 1
+                continue
+
+            stack = [(root, "")]
+            while stack:
+                directory, reldir = stack.pop()
+                try:
+                    stat = os.stat(directory)
+                    if (stat.st_dev, stat.st_ino) in visited:
+                        continue  # Symlink loop or directory reached twice
+                    visited.add((stat.st_dev, stat.st_ino))
+                    with os.scandir(directory) as it:
+                        entries = sorted(it, key=lambda entry: entry.name)
+                except OSError as e:
+                    if self.on_error:
+                        self.on_error(directory, e)
+                    continue
+
+                subdirs = []
+                for entry in entries:
+                    self.scanned += 1
+                    relpath = f"{reldir}/{entry.name}" if reldir else entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                        is_file = not is_dir and entry.is_file()
+                    except OSError:
+                        continue
+
+                    if is_dir:
+                        if self.recursive and not self._matches(self.exclude, entry.name, relpath):
+                            subdirs.append((entry.path, relpath))
+                    elif is_file:
+                        if self._accept_file(entry.path, entry.name, relpath):
+                            self.matched += 1
+                            yield entry.path
+                        else:
+                            self.skipped += 1
+
+                # Depth-first, in name order
+                stack.extend(reversed(subdirs))
@@ -3,6 +3,7 @@ Image Converter Pro — Input validation module.
 Comprehensive validation for dimensions, angles, quality, paths, formats.
 """
 
+import math
 import os
 
 
@@ -135,6 +136,66 @@ def validate_format(fmt):
     return fmt_upper
 
 
+def validate_effort(effort):
+    """Validate encoder effort profile name.
+
+    Args:
+        effort: Profile name (e.g., 'fastest', 'balanced', 'smallest')
+
+    Returns:
+        str: Validated profile name (lowercase)
+
+    Raises:
+        ValidationError: If the profile is unknown
+    """
+    from config.constants import ENCODER_EFFORTS
+
+    effort_lower = str(effort).strip().lower()
+
+    if effort_lower not in ENCODER_EFFORTS:
+        raise ValidationError(f"Unknown encoder effort: {effort}. Supported: {', '.join(ENCODER_EFFORTS)}")
+
+    return effort_lower
+
+
+def validate_max_bytes(max_bytes):
+    """Validate an output size budget.
+
+    Args:
+        max_bytes: Byte count (int or str), strings may carry a K/KB or
+            M/MB suffix (e.g., '150K', '1.5MB'); 0 or empty means no budget
+
+    Returns:
+        int or None: Budget in bytes, None if disabled
+
+    Raises:
+        ValidationError: If the budget is malformed or negative
+    """
+    if max_bytes is None or max_bytes == "" or max_bytes == 0:
+        return None
+
+    text = str(max_bytes).strip().upper()
+    multiplier = 1
+    for suffix, factor in (("KB", 1024), ("MB", 1024 ** 2), ("K", 1024), ("M", 1024 ** 2), ("B", 1)):
+        if text.endswith(suffix):
+            text = text[:-len(suffix)].strip()
+            multiplier = factor
+            break
+
+    try:
+        value = float(text) * multiplier
+    except ValueError:
+        value = math.nan
+    if not math.isfinite(value):
+        raise ValidationError(f"Invalid size budget: {max_bytes}. Use bytes or a K/M suffix (e.g. 150K).")
+    size = int(value)
+
+    if size < 0:
+        raise ValidationError(f"Size budget must not be negative: {max_bytes}")
+
+    return size or None
+
+
 def validate_opacity(opacity):
     """Validate opacity value.
 